@@ -0,0 +1,80 @@
+# Throughput and recall of k-NN graph construction on clustered vectors:
+# sklearn vs. the blocked exact and the approximate torch backends.
+# Recall is measured against the exact neighbors of a sample of rows.
+#
+# python benchmark/knn_graph.py --num_nodes 200000 --num_features 256
+
+import argparse
+import time
+import sys
+
+import torch
+
+sys.path.append("./")
+sys.path.append("../")
+from rllm.transforms.graph_transforms.functional import knn_graph
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--num_nodes", type=int, default=100_000)
+parser.add_argument("--num_features", type=int, default=128)
+parser.add_argument("--num_clusters", type=int, default=1_000)
+parser.add_argument("--num_neighbors", type=int, default=10)
+parser.add_argument("--metric", type=str, default="cosine",
+                    choices=["cosine", "euclidean"])
+parser.add_argument("--num_samples", type=int, default=1_000)
+parser.add_argument("--sklearn", action="store_true",
+                    help="Also run sklearn, slow beyond ~1e5 nodes.")
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+torch.manual_seed(args.seed)
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# Embedding-like data: noisy copies of random cluster centers.
+centers = torch.randn(args.num_clusters, args.num_features, device=device)
+assign = torch.randint(args.num_clusters, (args.num_nodes,), device=device)
+x = centers[assign] + 0.5 * torch.randn(
+    args.num_nodes, args.num_features, device=device
+)
+
+# Exact neighbors of a sample of rows.
+sample = torch.randperm(args.num_nodes, device=device)[:args.num_samples]
+if args.metric == "cosine":
+    feat = torch.nn.functional.normalize(x, dim=-1)
+    dist = 1.0 - feat[sample] @ feat.t()
+else:
+    dist = torch.cdist(x[sample], x)
+dist[torch.arange(sample.numel(), device=device), sample] = float("inf")
+truth = dist.topk(args.num_neighbors, dim=1, largest=False).indices
+
+
+def bench(backend):
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    adj = knn_graph(
+        x if backend != "sklearn" else x.cpu().numpy(),
+        num_neighbors=args.num_neighbors,
+        metric=args.metric,
+        backend=backend,
+    )
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+    seconds = time.perf_counter() - start
+
+    row, col = adj.to(device).coalesce().indices()
+    hits = 0
+    for i, node in enumerate(sample.tolist()):
+        found = col[row == node]
+        hits += int((found.view(-1, 1) == truth[i].view(1, -1)).any(dim=0).sum())
+    return seconds, hits / truth.numel()
+
+
+backends = ["exact", "approx"] + (["sklearn"] if args.sklearn else [])
+for backend in backends:
+    seconds, recall = bench(backend)
+    print(
+        f"{backend:>8}: {seconds:.2f} s, "
+        f"{args.num_nodes / seconds:,.0f} rows/s, recall@{args.num_neighbors} "
+        f"{recall:.4f}"
+    )
@@ -0,0 +1,82 @@
+# Throughput of one-layer neighbor sampling on a random graph:
+# the per-seed Python loop vs. the vectorized CSC sampler.
+#
+# python benchmark/neighbor_sampling.py --num_nodes 100000 --batch_size 1024
+
+import argparse
+import time
+import sys
+
+import torch
+
+sys.path.append("./")
+sys.path.append("../")
+from rllm.dataloader import sample_neighbors
+from rllm.utils import index2ptr
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--num_nodes", type=int, default=100_000)
+parser.add_argument("--avg_degree", type=int, default=20)
+parser.add_argument("--batch_size", type=int, default=1024)
+parser.add_argument("--num_neighbors", type=int, default=10)
+parser.add_argument("--replace", action="store_true")
+parser.add_argument("--runs", type=int, default=20)
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+torch.manual_seed(args.seed)
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+num_edges = args.num_nodes * args.avg_degree
+row = torch.randint(args.num_nodes, (num_edges,), device=device)
+col = torch.randint(args.num_nodes, (num_edges,), device=device).sort().values
+col_ptr = index2ptr(col, args.num_nodes)
+
+
+def loop_sample(seeds, num_neighbors):
+    # The former `NeighborLoader.sample_neighbors_one_layer`.
+    src_list, dst_list = [], []
+    for node in seeds.tolist():
+        start, end = col_ptr[node].item(), col_ptr[node + 1].item()
+        neighbors = row[start:end]
+        if neighbors.numel() == 0:
+            continue
+        elif num_neighbors < 0 or neighbors.numel() < num_neighbors:
+            sampled = neighbors
+        else:
+            perm = torch.randperm(neighbors.numel(), device=device)
+            sampled = neighbors[perm[:num_neighbors]]
+        src_list.append(sampled)
+        dst_list.append(torch.full_like(sampled, node))
+    return torch.cat(src_list), torch.cat(dst_list)
+
+
+def vectorized_sample(seeds, num_neighbors):
+    src, dst, _ = sample_neighbors(
+        col_ptr, row, seeds, num_neighbors, replace=args.replace
+    )
+    return src, dst
+
+
+def bench(fn):
+    num_samples = 0
+    times = []
+    for _ in range(args.runs):
+        seeds = torch.randperm(args.num_nodes, device=device)[: args.batch_size]
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        src, _ = fn(seeds, args.num_neighbors)
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+        times.append(time.perf_counter() - start)
+        num_samples += src.numel()
+    return num_samples / sum(times), sum(times) / len(times)
+
+
+for name, fn in [("loop", loop_sample), ("vectorized", vectorized_sample)]:
+    throughput, latency = bench(fn)
+    print(
+        f"{name:>10}: {throughput:,.0f} samples/s, "
+        f"{latency * 1000:.2f} ms/batch"
+    )
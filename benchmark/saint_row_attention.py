@@ -0,0 +1,110 @@
+# Time and peak memory of one SAINTConv training step on the datasets of
+# examples/saint.py at large batch sizes, for the full, chunked and
+# Nystrom row attention. Rows are sampled with replacement, so the small
+# tables reach the large batch sizes too.
+#
+# python benchmark/saint_row_attention.py --dataset adult --max_full_rows 8192
+
+import argparse
+import time
+import sys
+import os.path as osp
+
+import torch
+import torch.nn.functional as F
+from torch.profiler import ProfilerActivity, profile
+
+sys.path.append("./")
+sys.path.append("../")
+from rllm.datasets import Adult, Titanic
+from rllm.transforms.table_transforms import DefaultTableTransform
+from rllm.nn.conv.table_conv import SAINTConv
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--dataset", type=str, default="titanic", choices=["titanic", "adult"]
+)
+parser.add_argument("--emb_dim", type=int, default=32)
+parser.add_argument("--batch_sizes", type=int, nargs="+",
+                    default=[4096, 8192, 16384, 32768])
+parser.add_argument("--row_chunk_size", type=int, default=1024)
+parser.add_argument("--num_landmarks", type=int, default=64)
+parser.add_argument("--max_full_rows", type=int, default=8192,
+                    help="Skip the full row attention above this batch size.")
+parser.add_argument("--runs", type=int, default=5)
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+torch.manual_seed(args.seed)
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+path = osp.join(osp.dirname(osp.realpath(__file__)), "..", "data")
+dataset = Titanic if args.dataset == "titanic" else Adult
+data = dataset(cached_dir=path)[0]
+data = DefaultTableTransform(out_dim=args.emb_dim)(data).to(device)
+
+
+def cpu_peak_memory(step):
+    # Replay the CPU allocations and frees of one step in time order; the
+    # peak is relative to the memory live before the step.
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        step()
+    events = sorted(
+        (e for e in prof.profiler.kineto_results.events() if e.name() == "[memory]"),
+        key=lambda e: e.start_us(),
+    )
+    live = peak = 0
+    for e in events:
+        live += e.nbytes()
+        peak = max(peak, live)
+    return peak
+
+
+def bench(conv, head, x, y):
+    times = []
+    if device.type == "cuda":
+        torch.cuda.reset_peak_memory_stats()
+        base = torch.cuda.memory_allocated()
+    for _ in range(args.runs):
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        out = head(conv(x).mean(dim=1))
+        F.cross_entropy(out, y).backward()
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+        times.append(time.perf_counter() - start)
+    latency = sum(times[1:]) / max(len(times) - 1, 1)
+    if device.type == "cuda":
+        peak = torch.cuda.max_memory_allocated() - base
+    else:
+        peak = cpu_peak_memory(
+            lambda: F.cross_entropy(head(conv(x).mean(dim=1)), y).backward()
+        )
+    return latency, peak
+
+
+for batch_size in args.batch_sizes:
+    index = torch.randint(len(data), (batch_size,), device=device)
+    x = {col_type: feat[index] for col_type, feat in data.feat_dict.items()}
+    y = data.y[index].long()
+    for mode in ["full", "chunked", "nystrom"]:
+        if mode == "full" and batch_size > args.max_full_rows:
+            print(f"{batch_size:>6} rows {mode:>8}: skipped")
+            continue
+        torch.manual_seed(args.seed)
+        conv = SAINTConv(
+            conv_dim=args.emb_dim,
+            num_feats=data.num_cols,
+            use_pre_encoder=True,
+            metadata=data.metadata,
+            row_attention=mode,
+            row_chunk_size=args.row_chunk_size,
+            num_landmarks=args.num_landmarks,
+        ).to(device)
+        head = torch.nn.Linear(args.emb_dim, data.num_classes).to(device)
+        latency, peak = bench(conv, head, x, y)
+        print(
+            f"{batch_size:>6} rows {mode:>8}: {latency * 1000:.1f} ms/step, "
+            f"{batch_size / latency:.0f} rows/s, {peak / 2**20:.1f} MB peak"
+        )
@@ -0,0 +1,109 @@
+# Time and peak memory of the semi-permeable attention of ExcelFormer on
+# wide tables: the einsum path with an explicit (B, H, C, C) mask vs. the
+# fused scaled_dot_product_attention backend, in float32 and bfloat16.
+#
+# python benchmark/table_attention.py --batch_size 256 --dim 64
+
+import argparse
+import time
+import sys
+
+import torch
+from torch.profiler import ProfilerActivity, profile
+
+sys.path.append("./")
+sys.path.append("../")
+from rllm.nn.conv.table_conv.excelformer_conv import SemiPermeableAttention
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--batch_size", type=int, default=256)
+parser.add_argument("--dim", type=int, default=64)
+parser.add_argument("--num_heads", type=int, default=8)
+parser.add_argument("--head_dim", type=int, default=16)
+parser.add_argument("--runs", type=int, default=10)
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+torch.manual_seed(args.seed)
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+low_dtype = torch.float16 if device.type == "cuda" else torch.bfloat16
+
+
+def cpu_peak_memory(step):
+    # Replay the CPU allocations and frees of one step in time order; the
+    # peak is relative to the memory live before the step.
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        step()
+    events = sorted(
+        (e for e in prof.profiler.kineto_results.events() if e.name() == "[memory]"),
+        key=lambda e: e.start_us(),
+    )
+    live = peak = 0
+    for e in events:
+        live += e.nbytes()
+        peak = max(peak, live)
+    return peak
+
+
+def einsum_attention(attn, x):
+    # The previous implementation, with the mask repeated over batch and heads.
+    B, C, _ = x.shape
+    H = attn.num_heads
+    q, k, v = attn.to_qkv(x).chunk(3, dim=-1)
+    q, k, v = (t.reshape(B, C, H, -1).permute(0, 2, 1, 3) for t in (q, k, v))
+    sim = torch.einsum("b h i d, b h j d -> b h i j", q, k)
+    seq_ids = torch.arange(C, device=x.device)
+    mask = seq_ids[None, None, :].repeat(B, C, 1) <= seq_ids[None, :, None]
+    mask = ((1.0 - mask.float()) * -1e4).unsqueeze(1).repeat(1, H, 1, 1)
+    attn_weights = ((sim + mask) * attn.scale).softmax(dim=-1)
+    out = torch.einsum("b h i j, b h j d -> b h i d", attn_weights, v)
+    return attn.to_out(out.permute(0, 2, 1, 3).reshape(B, C, -1))
+
+
+def bench(fn, x):
+    times = []
+    if device.type == "cuda":
+        torch.cuda.reset_peak_memory_stats()
+        base = torch.cuda.memory_allocated()
+    for _ in range(args.runs):
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        out = fn(x)
+        out.sum().backward()
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+        times.append(time.perf_counter() - start)
+        x.grad = None
+    latency = sum(times[1:]) / max(len(times) - 1, 1)
+    if device.type == "cuda":
+        peak = torch.cuda.max_memory_allocated() - base
+    else:
+        peak = cpu_peak_memory(lambda: fn(x).sum().backward())
+        x.grad = None
+    return out, latency, peak
+
+
+for num_cols in [100, 300, 600]:
+    x = torch.randn(
+        args.batch_size, num_cols, args.dim, device=device, requires_grad=True
+    )
+    attn = SemiPermeableAttention(
+        args.dim, num_heads=args.num_heads, head_dim=args.head_dim
+    ).to(device)
+
+    results = {}
+    for mode in ["einsum", "sdpa", f"sdpa-{str(low_dtype)[6:]}"]:
+        if mode == "einsum":
+            fn = lambda x: einsum_attention(attn, x)  # noqa: E731
+        else:
+            attn.compute_dtype = low_dtype if mode != "sdpa" else None
+            fn = attn
+        results[mode] = bench(fn, x)
+        _, latency, peak = results[mode]
+        rows = args.batch_size / latency
+        print(
+            f"{num_cols:>4} cols {mode:>12}: {latency * 1000:.2f} ms/iter, "
+            f"{rows:.0f} rows/s, {peak / 2**20:.1f} MB peak"
+        )
+    assert torch.allclose(results["einsum"][0], results["sdpa"][0], atol=1e-4)
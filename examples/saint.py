@@ -35,6 +35,15 @@ parser.add_argument("--lr", type=float, default=1e-3)
 parser.add_argument("--epochs", type=int, default=50)
 parser.add_argument("--seed", type=int, default=0)
 parser.add_argument("--wd", type=float, default=5e-4)
+parser.add_argument(
+    "--row_attention",
+    type=str,
+    default="full",
+    choices=["full", "chunked", "nystrom"],
+    help="Row attention, chunked or nystrom for large batches.",
+)
+parser.add_argument("--row_chunk_size", type=int, default=1024)
+parser.add_argument("--num_landmarks", type=int, default=64)
 args = parser.parse_args()
 
 # Set random seed and device
@@ -65,6 +74,7 @@ class SAINT(torch.nn.Module):
         num_feats: int,
         num_layers: int,
         metadata: Dict[ColType, List[Dict[str, Any]]],
+        **row_kwargs,
     ):
         super().__init__()
 
@@ -75,10 +85,13 @@ class SAINT(torch.nn.Module):
                 num_feats=num_feats,
                 use_pre_encoder=True,
                 metadata=metadata,
+                **row_kwargs,
             )
         )
         for _ in range(num_layers - 1):
-            self.convs.append(SAINTConv(conv_dim=hidden_dim, num_feats=num_feats))
+            self.convs.append(
+                SAINTConv(conv_dim=hidden_dim, num_feats=num_feats, **row_kwargs)
+            )
 
         self.fc = torch.nn.Sequential(
             torch.nn.LayerNorm(hidden_dim),
@@ -100,6 +113,9 @@ model = SAINT(
     num_layers=args.num_layers,
     num_feats=data.num_cols,
     metadata=data.metadata,
+    row_attention=args.row_attention,
+    row_chunk_size=args.row_chunk_size,
+    num_landmarks=args.num_landmarks,
 ).to(device)
 optimizer = torch.optim.Adam(
     model.parameters(),
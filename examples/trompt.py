@@ -16,6 +16,7 @@ from tqdm import tqdm
 import torch
 from torch import Tensor
 from torch.utils.data import DataLoader
+from torch.utils.checkpoint import checkpoint
 import torch.nn.functional as F
 
 sys.path.append("./")
@@ -34,6 +35,11 @@ parser.add_argument("--epochs", type=int, default=50)
 parser.add_argument("--lr", type=float, default=1e-4)
 parser.add_argument("--wd", type=float, default=5e-4)
 parser.add_argument("--seed", type=int, default=0)
+parser.add_argument(
+    "--checkpoint",
+    action="store_true",
+    help="Recompute the TromptConv activations in backward to save memory.",
+)
 args = parser.parse_args()
 
 # Set random seed and device
@@ -65,9 +71,11 @@ class Trompt(torch.nn.Module):
         num_layers: int,
         num_prompts: int,
         metadata: Dict[ColType, List[Dict[str, Any]]],
+        checkpoint: bool = False,
     ):
         super().__init__()
         self.out_dim = out_dim
+        self.checkpoint = checkpoint
         self.x_prompt = torch.nn.Parameter(torch.empty(num_prompts, hidden_dim))
 
         self.convs = torch.nn.ModuleList()
@@ -105,9 +113,12 @@ class Trompt(torch.nn.Module):
     def forward(self, x) -> Tensor:
         outs = []
         batch_size = x[list(x.keys())[0]].size(0)
-        x_prompt = self.x_prompt.unsqueeze(0).repeat(batch_size, 1, 1)
+        x_prompt = self.x_prompt.expand(batch_size, -1, -1)
         for conv in self.convs:
-            x_prompt = conv(x, x_prompt)
+            if self.checkpoint and self.training:
+                x_prompt = checkpoint(conv, x, x_prompt, use_reentrant=False)
+            else:
+                x_prompt = conv(x, x_prompt)
             w_prompt = F.softmax(self.linear(x_prompt), dim=1)
             out = (w_prompt * x_prompt).sum(dim=1)
             out = self.mlp(out)
@@ -124,6 +135,7 @@ model = Trompt(
     num_layers=args.num_layers,
     num_prompts=args.num_prompts,
     metadata=data.metadata,
+    checkpoint=args.checkpoint,
 ).to(device)
 optimizer = torch.optim.Adam(
     model.parameters(),
@@ -1,6 +1,13 @@
 from ..datasets.dataset import Dataset  # noqa
 from .graph_data import BaseGraph, GraphData, HeteroGraphData  # noqa
 from .table_data import BaseTable, TableData, TableDataset  # noqa
+from .table_stats import TableStats  # noqa
+from .graph_builder import (  # noqa
+    fkey_to_index,
+    relation_to_edge_index,
+    build_homo_graph,
+    build_hetero_graph,
+)
 from .storage import BaseStorage, NodeStorage, EdgeStorage, recursive_apply  # noqa
 from .view import MappingView, KeysView, ValuesView, ItemsView  # noqa
 
@@ -12,10 +19,16 @@ __all__ = [
     "BaseGraph",
     "GraphData",
     "HeteroGraphData",
+    # graph_builder_functions
+    "fkey_to_index",
+    "relation_to_edge_index",
+    "build_homo_graph",
+    "build_hetero_graph",
     # table_data_classes
     "BaseTable",
     "TableData",
     "TableDataset",
+    "TableStats",
     # storage_classes
     "BaseStorage",
     "NodeStorage",
@@ -0,0 +1,213 @@
+import json
+import os
+import os.path as osp
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import torch
+from torch import Tensor
+
+from rllm.types import ColType, StatType, TableType
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+EXTRA_FILE = "extra.pt"
+
+
+def _tensor_file(key: str) -> str:
+    return f"{key}.npy"
+
+
+def _to_numpy(value: Any) -> Optional[np.ndarray]:
+    r"""The dense numpy view of a tensor, or None if numpy can not hold
+    it, e.g. sparse or bfloat16 tensors."""
+    if not isinstance(value, Tensor) or value.layout != torch.strided:
+        return None
+    try:
+        return value.detach().cpu().contiguous().numpy()
+    except TypeError:
+        return None
+
+
+def _from_numpy(path: str, mmap: bool) -> Tensor:
+    # Copy-on-write pages: processes mapping the same file share them
+    # until one writes, which never touches the file.
+    return torch.from_numpy(np.load(path, mmap_mode="c" if mmap else None))
+
+
+def _is_json(value: Any) -> bool:
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _encode_metadata(metadata: Dict[ColType, Any]) -> Any:
+    return {
+        col_type.value: [
+            {stat_type.value: stat for stat_type, stat in stats.items()}
+            for stats in stats_list
+        ]
+        for col_type, stats_list in metadata.items()
+    }
+
+
+def _decode_metadata(metadata: Dict[str, Any]) -> Dict[ColType, Any]:
+    return {
+        ColType(col_type): [
+            {StatType(stat_type): stat for stat_type, stat in stats.items()}
+            for stats in stats_list
+        ]
+        for col_type, stats_list in metadata.items()
+    }
+
+
+def save_columnar(
+    mapping: Dict[str, Any],
+    path: str,
+    save_df: bool = True,
+) -> None:
+    r"""Save the attributes of a :class:`~rllm.data.TableData` as a
+    directory of columnar files:
+
+    - one `.npy` file per tensor, e.g. `feat_dict.numerical.npy`,
+      `y.npy` or `train_mask.npy`, which :func:`load_columnar` maps
+      into memory;
+    - `meta.json` with the column types, metadata and other plain
+      attributes;
+    - `df.parquet` with the dataframe, or `df.pkl` if it can not be
+      written as Parquet, e.g. without `pyarrow`;
+    - `extra.pt` with the attributes none of the above can hold.
+
+    Args:
+        mapping (Dict[str, Any]): The attributes, see
+            :meth:`TableData.to_dict`.
+        path (str): The directory.
+        save_df (bool): Whether to save the dataframe. (default: True)
+    """
+    os.makedirs(path, exist_ok=True)
+    if osp.exists(osp.join(path, META_FILE)):
+        os.remove(osp.join(path, META_FILE))
+    meta: Dict[str, Any] = {"version": FORMAT_VERSION, "tensors": {}, "attrs": {}}
+    extra: Dict[str, Any] = {}
+
+    def save_tensor(key: str, value: Tensor) -> bool:
+        array = _to_numpy(value)
+        if array is None:
+            return False
+        np.save(osp.join(path, _tensor_file(key)), array)
+        meta["tensors"][key] = _tensor_file(key)
+        return True
+
+    num_rows = None
+    for key, value in mapping.items():
+        if key == "df":
+            if value is None or not save_df:
+                meta["df"] = None
+                continue
+            num_rows = len(value)
+            try:
+                value.to_parquet(osp.join(path, "df.parquet"))
+                meta["df"] = "df.parquet"
+            except (ImportError, ValueError, TypeError):
+                value.to_pickle(osp.join(path, "df.pkl"))
+                meta["df"] = "df.pkl"
+        elif key == "feat_dict" and value is not None:
+            meta["feat_dict"] = []
+            for col_type, feat in value.items():
+                name = f"feat_dict.{col_type.value.lower()}"
+                if not save_tensor(name, feat):
+                    break
+                meta["feat_dict"].append([col_type.value, name])
+                num_rows = feat.size(0)
+            else:
+                continue
+            del meta["feat_dict"]
+            extra[key] = value
+        elif key == "col_types":
+            meta["col_types"] = {
+                col: col_type.value for col, col_type in value.items()
+            }
+        elif key == "table_type" and isinstance(value, TableType):
+            meta["table_type"] = value.value
+        elif key == "metadata" and value is not None:
+            encoded = _encode_metadata(value)
+            if _is_json(encoded):
+                meta["metadata"] = encoded
+            else:
+                extra[key] = value
+        elif isinstance(value, Tensor):
+            if not save_tensor(key, value):
+                extra[key] = value
+        elif _is_json(value):
+            meta["attrs"][key] = value
+        else:
+            extra[key] = value
+
+    meta["num_rows"] = num_rows
+    if len(extra) > 0:
+        torch.save(extra, osp.join(path, EXTRA_FILE))
+        meta["extra"] = EXTRA_FILE
+    # Written last, so a directory with `meta.json` is complete.
+    with open(osp.join(path, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def load_columnar(
+    path: str,
+    mmap: bool = True,
+) -> Tuple[Dict[str, Any], Optional[Callable[[], pd.DataFrame]], Optional[int]]:
+    r"""Load a directory written by :func:`save_columnar`.
+
+    Tensors are memory-mapped if :obj:`mmap` is set, so opening is cheap
+    and processes share the pages, and the dataframe is not read.
+
+    Args:
+        path (str): The directory.
+        mmap (bool): Whether to memory-map the tensors. (default: True)
+
+    Returns:
+        The attributes but the dataframe, a function reading the
+        dataframe, or None if it was not saved, and the number of rows.
+    """
+    with open(osp.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    assert meta["version"] <= FORMAT_VERSION, (
+        f"Unsupported columnar format version {meta['version']}."
+    )
+
+    data: Dict[str, Any] = dict(meta["attrs"])
+    for key, file in meta["tensors"].items():
+        if not key.startswith("feat_dict."):
+            data[key] = _from_numpy(osp.join(path, file), mmap)
+    if "feat_dict" in meta:
+        data["feat_dict"] = {
+            ColType(col_type): _from_numpy(
+                osp.join(path, meta["tensors"][name]), mmap
+            )
+            for col_type, name in meta["feat_dict"]
+        }
+    if "col_types" in meta:
+        data["col_types"] = {
+            col: ColType(col_type) for col, col_type in meta["col_types"].items()
+        }
+    if "table_type" in meta:
+        data["table_type"] = TableType(meta["table_type"])
+    if "metadata" in meta:
+        data["metadata"] = _decode_metadata(meta["metadata"])
+    if meta.get("extra") is not None:
+        data.update(torch.load(osp.join(path, meta["extra"]), weights_only=False))
+
+    df_loader = None
+    if meta.get("df") is not None:
+        df_path = osp.join(path, meta["df"])
+        # A partial rather than a closure, so loaded tables still pickle,
+        # e.g. to spawned DataLoader workers.
+        if df_path.endswith(".parquet"):
+            df_loader = partial(pd.read_parquet, df_path)
+        else:
+            df_loader = partial(pd.read_pickle, df_path)
+    return data, df_loader, meta["num_rows"]
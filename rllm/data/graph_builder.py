@@ -0,0 +1,220 @@
+from typing import List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import torch
+from torch import Tensor
+
+from rllm.data.graph_data import GraphData, HeteroGraphData
+from rllm.utils import sample_per_segment, sample_edges_per_node
+
+# A relationship table, whose first two columns hold the row positions
+# of the nodes it connects, or an edge list of shape `(2, E)`.
+Relation = Union[pd.DataFrame, Tensor]
+
+
+def fkey_to_index(fkeys: Sequence, pkeys: Sequence) -> Tensor:
+    r"""Map foreign key values to the row positions of the primary keys
+    they reference, by a single hash join.
+
+    Args:
+        fkeys (Sequence): The foreign key values, e.g. `df["UserID"]`.
+        pkeys (Sequence): The unique primary key values, in row order.
+
+    Returns:
+        index: A tensor of the shape of `fkeys`, -1 for dangling keys.
+
+    Example:
+        >>> fkey_to_index([30, 10, 40], pkeys=[10, 20, 30])
+        tensor([ 2,  0, -1])
+    """
+    index = pd.Index(pkeys).get_indexer(np.asarray(fkeys))
+    return torch.from_numpy(index.astype(np.int64))
+
+
+def relation_to_edge_index(
+    relation_df: pd.DataFrame,
+    src_col: Optional[str] = None,
+    tgt_col: Optional[str] = None,
+    src_pkeys: Optional[Sequence] = None,
+    tgt_pkeys: Optional[Sequence] = None,
+) -> Tensor:
+    r"""Turn a relationship table (fkey -> pkey) into an edge list.
+
+    Args:
+        relation_df (pd.DataFrame): The relationship table.
+        src_col (str, optional): The column of the source nodes.
+            (default: the first column)
+        tgt_col (str, optional): The column of the target nodes.
+            (default: the second column)
+        src_pkeys (Sequence, optional): The primary keys of the source
+            table. If given, `src_col` holds key values, which are mapped
+            to row positions by :func:`fkey_to_index`. Otherwise it
+            already holds row positions. (default: `None`)
+        tgt_pkeys (Sequence, optional): Same as `src_pkeys`, for the
+            target table. (default: `None`)
+
+    Returns:
+        edge_index: A tensor of shape `(2, E)`. Rows referencing a
+        missing key are dropped.
+    """
+    src_col = relation_df.columns[0] if src_col is None else src_col
+    tgt_col = relation_df.columns[1] if tgt_col is None else tgt_col
+
+    def column(col, pkeys):
+        if pkeys is not None:
+            return fkey_to_index(relation_df[col].values, pkeys)
+        return torch.from_numpy(relation_df[col].to_numpy(dtype=np.int64))
+
+    edge_index = torch.stack([
+        column(src_col, src_pkeys),
+        column(tgt_col, tgt_pkeys),
+    ])
+    valid = (edge_index >= 0).all(dim=0)
+    if not bool(valid.all()):
+        edge_index = edge_index[:, valid]
+    return edge_index
+
+
+def _to_edge_index(relation: Relation) -> Tensor:
+    if isinstance(relation, pd.DataFrame):
+        return relation_to_edge_index(relation)
+    assert relation.dim() == 2 and relation.size(0) == 2, (
+        "An edge list should be of shape (2, E)."
+    )
+    return relation.long()
+
+
+def _ones_adj(edge_index: Tensor, size: Tuple[int, int]) -> Tensor:
+    values = torch.ones(edge_index.size(1), dtype=torch.float32)
+    return torch.sparse_coo_tensor(edge_index, values, size)
+
+
+def build_homo_graph(
+    relation_df: Union[Relation, Sequence[Relation]],
+    n_all: int,
+    x: Optional[Tensor] = None,
+    y: Optional[Tensor] = None,
+    edge_per_node: Optional[int] = None,
+    generator: Optional[torch.Generator] = None,
+) -> GraphData:
+    r"""Use the given relationship tables to construct a simple undirected
+    and unweighted graph with a single type of edge.
+
+    All tables are concatenated and handled in one pass, and the degree
+    cap is a segment-wise random top-k, see
+    :func:`rllm.utils.sample_edges_per_node`, so the cost is
+    `O(E log E)` for `E` relationships.
+
+    Args:
+        relation_df (Union[Relation, Sequence[Relation]]): One or more
+            relationship tables, where the first two columns hold the
+            indices (from 0) of the nodes connected by every row, or edge
+            lists of shape `(2, E)`.
+        n_all (int): Total amount of nodes.
+        x (Tensor, optional): Features of nodes. (default: `None`)
+        y (Tensor, optional): Labels of (part) nodes. (default: `None`)
+        edge_per_node (int, optional): The maximum number of relationships
+            kept for each node, randomly sampled. (default: `None`)
+        generator (torch.Generator, optional): The random generator used
+            by `edge_per_node`. (default: `None`)
+    """
+    if isinstance(relation_df, (pd.DataFrame, Tensor)):
+        relation_df = [relation_df]
+    edge_index = torch.cat([_to_edge_index(r) for r in relation_df], dim=1)
+
+    if edge_per_node is not None:
+        mask = sample_edges_per_node(
+            edge_index, edge_per_node, n_all, generator=generator
+        )
+        edge_index = edge_index[:, mask]
+
+    # src -> tgt and tgt -> src
+    indices = torch.cat([edge_index, edge_index.flip(0)], dim=1)
+    adj = _ones_adj(indices, (n_all, n_all))
+
+    graph = GraphData(x=x, y=y, adj=adj)
+    graph.num_nodes = n_all
+    return graph
+
+
+def _reverse_edge_type(edge_type: Tuple[str, ...]) -> Tuple[str, ...]:
+    if len(edge_type) == 3:
+        src, rel, tgt = edge_type
+        return (tgt, f"rev_{rel}", src)
+    return tuple(reversed(edge_type))
+
+
+def build_hetero_graph(
+    relations: Mapping[Union[str, Tuple[str, ...]], Relation],
+    num_nodes_dict: Mapping[str, int],
+    x_dict: Optional[Mapping[str, Tensor]] = None,
+    edge_per_node: Optional[int] = None,
+    add_reverse: bool = True,
+    generator: Optional[torch.Generator] = None,
+) -> HeteroGraphData:
+    r"""Use the given relationship tables to construct a heterogeneous
+    graph with one edge type per table.
+
+    The degree caps of all tables are computed in one pass, as a single
+    segment-wise random top-k over every (edge type, node) pair.
+
+    Args:
+        relations (Mapping[EdgeType, Relation]): The relationship tables
+            keyed by edge type, e.g. `("user", "rates", "movie")` or
+            `"user__movie"`. The first two columns hold the indices (from
+            0) of the source and target nodes, see
+            :func:`relation_to_edge_index` to map key values. Edge lists
+            of shape `(2, E)` are accepted as well.
+        num_nodes_dict (Mapping[str, int]): The number of nodes per type.
+        x_dict (Mapping[str, Tensor], optional): Features per node type.
+            (default: `None`)
+        edge_per_node (int, optional): The maximum number of relationships
+            of each edge type kept for each node, randomly sampled.
+            (default: `None`)
+        add_reverse (bool): Whether to add the reverse edge types, e.g.
+            `("movie", "rev_rates", "user")`. (default: `True`)
+        generator (torch.Generator, optional): The random generator used
+            by `edge_per_node`. (default: `None`)
+    """
+    edge_types: List[Tuple[str, ...]] = [
+        tuple(key.split("__")) if isinstance(key, str) else tuple(key)
+        for key in relations.keys()
+    ]
+    edge_indices = [_to_edge_index(r) for r in relations.values()]
+
+    if edge_per_node is not None:
+        # Give the source and target nodes of every edge type their own
+        # segment range, so one sort caps all of them.
+        segments, offset = [], 0
+        for edge_type, edge_index in zip(edge_types, edge_indices):
+            num_src = num_nodes_dict[edge_type[0]]
+            num_tgt = num_nodes_dict[edge_type[-1]]
+            segments.append(edge_index[0] + offset)
+            segments.append(edge_index[1] + offset + num_src)
+            offset += num_src + num_tgt
+        keep = sample_per_segment(
+            torch.cat(segments), edge_per_node, offset, generator=generator
+        )
+        sizes = [e.size(1) for e in edge_indices for _ in range(2)]
+        keep = keep.split(sizes)
+        edge_indices = [
+            edge_index[:, keep[2 * i] | keep[2 * i + 1]]
+            for i, edge_index in enumerate(edge_indices)
+        ]
+
+    data = HeteroGraphData()
+    for node_type, num_nodes in num_nodes_dict.items():
+        data[node_type].num_nodes = num_nodes
+        if x_dict is not None and node_type in x_dict:
+            data[node_type].x = x_dict[node_type]
+
+    for edge_type, edge_index in zip(edge_types, edge_indices):
+        num_src = num_nodes_dict[edge_type[0]]
+        num_tgt = num_nodes_dict[edge_type[-1]]
+        data[edge_type].adj = _ones_adj(edge_index, (num_src, num_tgt))
+        if add_reverse:
+            data[_reverse_edge_type(edge_type)].adj = _ones_adj(
+                edge_index.flip(0), (num_tgt, num_src)
+            )
+    return data
@@ -662,7 +662,7 @@ class HeteroGraphData(BaseGraph):
             edge_time = (edge_time_d or {}).get(edge_type, None)
             out = store.to_csc(
                 device=device,
-                num_nodes=self[edge_type[0]].num_nodes,
+                num_nodes=self[edge_type[-1]].num_nodes,
                 share_memory=share_memory,
                 is_sorted=is_sorted,
                 src_node_time=src_node_time,
@@ -1,21 +1,25 @@
 from __future__ import annotations
 import gc
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache, wraps
 from typing import Any, Dict, List, Union, Tuple, Callable, Optional, Sequence, overload
 from uuid import uuid4
 from warnings import warn
 import copy
+import os.path as osp
 
 import numpy as np
+import pandas as pd
 from pandas import DataFrame
-from sklearn.preprocessing import LabelEncoder
 
 import torch
 from torch import Tensor
 from torch.utils.data import Dataset, DataLoader
 
 from rllm.types import ColType, TaskType, StatType, TableType
+from rllm.data.columnar import load_columnar, save_columnar
 from rllm.data.storage import BaseStorage
+from rllm.data.table_stats import TableStats
 
 
 class BaseTable:
@@ -117,6 +121,10 @@ class TableData(BaseTable):
     """
 
     NONEPKEY = "_NonePkey"
+    FEAT_DTYPES = {
+        ColType.NUMERICAL: torch.float32,
+        ColType.CATEGORICAL: torch.int32,
+    }
     PRIVATE_PROPERTIES = ["_mapping", "_fkeys", "_inherit_feat_dict"]
 
     def __init__(
@@ -265,6 +273,9 @@ class TableData(BaseTable):
     # base functions #####################################
     @classmethod
     def load(cls, path: str) -> TableData:
+        if osp.isdir(path):
+            return cls.load_columnar(path)
+
         key_map = {
             "table_name": "name",
             "_fkeys": "fkeys",
@@ -282,7 +293,51 @@ class TableData(BaseTable):
 
         return cls(**data)
 
+    def save_columnar(self, path: str, save_df: bool = True):
+        r"""Save the table as a directory of memory-mappable columnar
+        files, see :func:`rllm.data.columnar.save_columnar`.
+
+        Args:
+            path (str): The directory.
+            save_df (bool, optional): Whether to save the dataframe.
+                (default: :obj:`True`)
+        """
+        save_columnar(self.to_dict(), path, save_df=save_df)
+
+    @classmethod
+    def load_columnar(cls, path: str, mmap: bool = True) -> TableData:
+        r"""Open a table saved by :meth:`save_columnar`.
+
+        Tensors are memory-mapped and the dataframe is read on first
+        access of `df`, so opening takes no time and does not depend on
+        the table size.
+
+        Args:
+            path (str): The directory.
+            mmap (bool, optional): Whether to memory-map the tensors.
+                (default: :obj:`True`)
+        """
+        data, df_loader, num_rows = load_columnar(path, mmap=mmap)
+        out = cls.__new__(cls)
+        for key, value in data.items():
+            setattr(out._mapping, key, value)
+        if df_loader is not None:
+            out.__dict__["_df_loader"] = df_loader
+        else:
+            out._mapping.df = None
+        out.__dict__["_inherit_feat_dict"] = data.get("feat_dict") is not None
+        if num_rows is not None:
+            out.__dict__["_len"] = num_rows
+        return out
+
+    def _load_lazy_df(self):
+        r"""Read the dataframe of a columnar table on first access."""
+        df_loader = self.__dict__.pop("_df_loader", None)
+        if df_loader is not None:
+            self._mapping.df = df_loader()
+
     def to_dict(self):
+        self._load_lazy_df()
         return self._mapping.to_dict()
 
     def apply(self, func: Callable, *args: str):
@@ -295,6 +350,9 @@ class TableData(BaseTable):
             self.__dict__["_mapping"] = BaseStorage()
             return self.__dict__["_mapping"]
 
+        if key == "df":
+            self._load_lazy_df()
+
         return getattr(self._mapping, key)
 
     def __setattr__(self, key: str, value: Any):
@@ -304,6 +362,8 @@ class TableData(BaseTable):
         elif key[:1] == "_":
             self.__dict__[key] = value
         else:
+            if key == "df":
+                self.__dict__.pop("_df_loader", None)
             setattr(self._mapping, key, value)
 
     def __delattr__(self, key: str):
@@ -556,83 +616,112 @@ class TableData(BaseTable):
     # Materialize functions, get table tensor ##################
     def _generate_feat_dict(
         self,
+        num_workers: Optional[int] = None,
     ):
-        r"""Get feat dict from single tabular dataset."""
-        # 1. Iterate each column
-        feat_dict = {}
-        for col, col_type in self.col_types.items():
-            # 2. Get column tensor
-            col_tensor = self._generate_column_tensor(col)
+        r"""Get feat dict from single tabular dataset.
 
-            # 3. Update feat dict
+        Every column is written straight into a preallocated tensor of
+        its ColType, with the dtype of `cls.FEAT_DTYPES`. Columns are
+        materialized in parallel on a thread pool.
+
+        Args:
+            num_workers (int, optional): The number of threads.
+                (default: :obj:`None`, the default of
+                :class:`ThreadPoolExecutor`)
+        """
+        # 1. Assign each feature column a slot of its ColType
+        slots = {}
+        for col, col_type in self.col_types.items():
             if col == self.target_col:
-                self.y = col_tensor
                 continue
-            if col_type not in feat_dict.keys():
-                feat_dict[col_type] = []
-            feat_dict[col_type].append(col_tensor.reshape(-1, 1))
-
-        # 4. Concat column tensors
-        for col_type, xs in feat_dict.items():
-            feat_dict[col_type] = torch.cat(xs, dim=-1)
+            slots.setdefault(col_type, []).append(col)
+
+        # 2. Preallocate one tensor per ColType
+        feat_dict = {
+            col_type: torch.empty(
+                (len(self.df), len(cols)),
+                dtype=self.FEAT_DTYPES.get(col_type, torch.float32),
+            )
+            for col_type, cols in slots.items()
+        }
 
-        # TODO: Change hard-coding here
-        if ColType.CATEGORICAL in feat_dict.keys():
-            feat_dict[ColType.CATEGORICAL] = feat_dict[ColType.CATEGORICAL].int()
+        # 3. Fill column slots in place, numpy casts while copying
+        def fill(col_type: ColType, index: int, col: str):
+            feat_dict[col_type].numpy()[:, index] = self._generate_column_array(col)
+
+        with ThreadPoolExecutor(num_workers) as executor:
+            futures = [
+                executor.submit(fill, col_type, index, col)
+                for col_type, cols in slots.items()
+                for index, col in enumerate(cols)
+            ]
+            for future in futures:
+                future.result()
+
+        if self.target_col in self.col_types:
+            self.y = self._generate_column_tensor(self.target_col)
         self.feat_dict = feat_dict
 
     @df_requisite
-    def _generate_column_tensor(self, col: str = None):
-        col_types = self.col_types[col]
-        col_copy = self.df[col].copy()
-
-        if col_types == ColType.NUMERICAL:
-            if col_copy.isnull().any():
-                col_copy.fillna(np.nan, inplace=True)
-
-        elif col_types == ColType.CATEGORICAL:
-            if col_copy.isnull().any():
-                col_copy.fillna(-1, inplace=True)
+    def _generate_column_array(self, col: str = None) -> np.ndarray:
+        r"""Get the values of column `col` as a numpy array.
 
-            col_fit = col_copy[col_copy != -1]
-            labels = LabelEncoder().fit_transform(col_fit)
-            col_copy[col_copy != -1] = labels
+        Categorical columns give sorted category codes, with -1 for NaN
+        and -1 values. Numerical columns give float32, without copying
+        if the column is float32 already.
+        """
+        series = self.df[col]
+        if self.col_types[col] == ColType.CATEGORICAL:
+            missing = series.isna().to_numpy() | (series == -1).to_numpy()
+            if missing.any():
+                series = series.where(~missing)
+            codes, _ = pd.factorize(series, sort=True)
+            return codes
+        return series.to_numpy(dtype=np.float32, na_value=np.nan)
 
-        return torch.tensor(col_copy.values.astype(float), dtype=torch.float32)
+    @df_requisite
+    def _generate_column_tensor(self, col: str = None):
+        array = self._generate_column_array(col)
+        if array.dtype != np.float32:
+            array = array.astype(np.float32)
+        elif not array.flags.writeable:
+            array = array.copy()
+        return torch.from_numpy(array)
 
     def _generate_metadata(
         self,
+        chunk_size: Optional[int] = None,
     ):
         r"""Get each column's statistical data from single tabular dataset.
         Columns with same ColType will be integrated together.
         eg: {ColType.CATEGORICAL: [{col_name: col_name1, stat1: xx, stat2: xx},
-        {col_name: col_name2, stat1: xx, stat2: xx}], ...}"""
+        {col_name: col_name2, stat1: xx, stat2: xx}], ...}
+
+        All columns of a ColType are computed at once by :class:`TableStats`.
+
+        Args:
+            chunk_size (int, optional): If set, feed the rows to
+                :class:`TableStats` in chunks of `chunk_size` to bound the
+                temporary memory. (default: :obj:`None`)
+        """
         metadata = {}
-        # 1. Iterate each column
+        # 1. Collect column names of each ColType, in feat_dict order
         col_types = self.col_types.copy()
         col_types.pop(self.target_col, None)
-        col_types_count = {}
+        col_names = {}
         for col_name, col_type in col_types.items():
-            sub_stats_list = {}
-
-            if col_type not in metadata.keys():
-                # add a new list for certain ColType
-                metadata[col_type] = []
-
-            # 2. Compute stats
-            stats_to_compute = StatType.stats_for_col_type(col_type)
-            if col_type not in col_types_count.keys():
-                col_types_count[col_type] = 0
-            current_col_index = col_types_count[col_type]
-            col_types_count[col_type] = col_types_count[col_type] + 1
-            for stat_type in stats_to_compute:
-                sub_stats_list[stat_type] = StatType.compute(
-                    self.feat_dict[col_type][:, current_col_index], stat_type
-                )
+            col_names.setdefault(col_type, []).append(col_name)
+
+        # 2. Compute stats of all columns of each ColType
+        for col_type, names in col_names.items():
+            x = self.feat_dict[col_type]
+            chunks = [x] if chunk_size is None else x.split(chunk_size)
+            stats_list = TableStats.from_chunks(chunks, col_type, len(names))
 
             # 3. Update metadata
-            sub_stats_list[StatType.COLNAME] = col_name
-            metadata[col_type].append(sub_stats_list)
+            for col_name, sub_stats_list in zip(names, stats_list):
+                sub_stats_list[StatType.COLNAME] = col_name
+            metadata[col_type] = stats_list
 
         self.metadata = metadata
         return self
@@ -0,0 +1,197 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional
+
+import torch
+from torch import Tensor
+
+from rllm.types import ColType, StatType
+
+
+class TableStats:
+    r"""A batched, streaming statistics engine for the columns of one
+    ColType, which produces the same stats as :meth:`StatType.compute`
+    for all columns at once.
+
+    Feed the column matrix, whole or in row chunks, to :meth:`update`,
+    then read the stats by :meth:`compute`.
+
+    - Numerical columns keep NaN-aware counts, sums of squared deviations
+      (merged by Chan's formula), minima and maxima, so `MEAN`, `STD`,
+      `MIN` and `MAX` are exact for any number of chunks. `QUANTILES`
+      are read from one sort of a uniform row sample of at most
+      `sample_size` rows, which is exact while all rows fit in it.
+    - Categorical columns keep one :func:`torch.bincount` of the codes
+      per column, from which `COUNT` and `MOST_FREQUENT` follow. Ties of
+      `MOST_FREQUENT` resolve to the smallest code.
+
+    .. code-block:: python
+
+        stats = TableStats(ColType.NUMERICAL, num_cols=x.size(1))
+        for chunk in x.split(100_000):
+            stats.update(chunk)
+        stat_list = stats.compute()
+
+    Args:
+        col_type (ColType): The type of the columns.
+        num_cols (int): The number of columns.
+        sample_size (int, optional): The maximum number of rows kept for
+            quantiles. (default: :obj:`1_000_000`)
+    """
+
+    QUANTILES = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+    def __init__(
+        self,
+        col_type: ColType,
+        num_cols: int,
+        sample_size: int = 1_000_000,
+    ):
+        self.col_type = col_type
+        self.num_cols = num_cols
+        self.sample_size = sample_size
+        self.stat_types = StatType.stats_for_col_type(col_type)
+
+        dtype = torch.float64
+        self.count = torch.zeros(num_cols, dtype=dtype)
+        self.mean = torch.zeros(num_cols, dtype=dtype)
+        self.m2 = torch.zeros(num_cols, dtype=dtype)
+        self.min = torch.full((num_cols,), float("inf"), dtype=dtype)
+        self.max = torch.full((num_cols,), float("-inf"), dtype=dtype)
+        self.sample: Optional[Tensor] = None
+        self.sample_key: Optional[Tensor] = None
+        self.bincounts: List[Tensor] = [
+            torch.zeros(0, dtype=torch.long) for _ in range(num_cols)
+        ]
+
+    def update(self, x: Tensor) -> TableStats:
+        r"""Accumulate a chunk of rows.
+
+        Args:
+            x (Tensor): The column matrix of shape `(N, num_cols)`, with
+                NaN (numerical) or -1 (categorical) for missing values.
+        """
+        assert x.dim() == 2 and x.size(1) == self.num_cols
+        x = x.detach().cpu()
+        if self.col_type == ColType.CATEGORICAL:
+            self._update_categorical(x)
+        else:
+            self._update_numerical(x)
+        return self
+
+    def compute(self) -> List[Dict[StatType, Any]]:
+        r"""Return the stats of every column, in column order."""
+        if self.col_type == ColType.CATEGORICAL:
+            return self._compute_categorical()
+        return self._compute_numerical()
+
+    @classmethod
+    def from_chunks(
+        cls,
+        chunks: Iterable[Tensor],
+        col_type: ColType,
+        num_cols: int,
+        **kwargs,
+    ) -> List[Dict[StatType, Any]]:
+        r"""Compute the stats over an iterable of row chunks, e.g. read
+        from a data source larger than memory."""
+        stats = cls(col_type, num_cols, **kwargs)
+        for chunk in chunks:
+            stats.update(chunk)
+        return stats.compute()
+
+    # Numerical ##########################################
+    def _update_numerical(self, raw: Tensor):
+        x = raw.double()
+        valid = ~torch.isnan(x)
+        count = valid.sum(dim=0).double()
+        mean = torch.where(valid, x, 0).sum(dim=0) / count.clamp(min=1)
+        m2 = torch.where(valid, x - mean, 0).pow(2).sum(dim=0)
+
+        # Chan's parallel merge of (count, mean, m2)
+        total = self.count + count
+        delta = mean - self.mean
+        ratio = torch.where(total > 0, count / total.clamp(min=1), 0)
+        self.mean = self.mean + delta * ratio
+        self.m2 = self.m2 + m2 + delta.pow(2) * self.count * ratio
+        self.count = total
+
+        self.min = torch.minimum(
+            self.min, torch.where(valid, x, float("inf")).amin(dim=0)
+        )
+        self.max = torch.maximum(
+            self.max, torch.where(valid, x, float("-inf")).amax(dim=0)
+        )
+
+        # Keep the rows with the smallest random keys as a uniform sample.
+        x = raw
+        key = torch.rand(x.size(0), dtype=torch.float64)
+        if self.sample is not None:
+            x = torch.cat([self.sample, x], dim=0)
+            key = torch.cat([self.sample_key, key], dim=0)
+        if x.size(0) > self.sample_size:
+            key, perm = key.topk(self.sample_size, largest=False)
+            x = x[perm]
+        self.sample, self.sample_key = x, key
+
+    def _compute_numerical(self) -> List[Dict[StatType, Any]]:
+        nan = torch.full((self.num_cols,), float("nan"), dtype=torch.float64)
+        empty = self.count == 0
+        mean = torch.where(empty, nan, self.mean)
+        std = torch.where(
+            self.count > 1, (self.m2 / (self.count - 1).clamp(min=1)).sqrt(), nan
+        )
+        min_ = torch.where(empty, nan, self.min)
+        max_ = torch.where(empty, nan, self.max)
+
+        # One sort for all quantiles of all columns, NaN sort last.
+        if self.sample is None:
+            quantiles = nan.expand(len(self.QUANTILES), -1)
+        else:
+            sorted_x = self.sample.double().sort(dim=0).values
+            num_valid = (~torch.isnan(sorted_x)).sum(dim=0)
+            q = torch.tensor(self.QUANTILES, dtype=torch.float64).view(-1, 1)
+            pos = q * (num_valid - 1).clamp(min=0)
+            lo, hi = pos.floor().long(), pos.ceil().long()
+            lo_val, hi_val = sorted_x.gather(0, lo), sorted_x.gather(0, hi)
+            quantiles = lo_val + (hi_val - lo_val) * (pos - lo)
+            quantiles = torch.where(num_valid == 0, nan, quantiles)
+
+        columns = {
+            StatType.MEAN: mean.tolist(),
+            StatType.STD: std.tolist(),
+            StatType.MIN: min_.tolist(),
+            StatType.MAX: max_.tolist(),
+            StatType.QUANTILES: quantiles.t().tolist(),
+        }
+        return [
+            {stat_type: columns[stat_type][i] for stat_type in self.stat_types}
+            for i in range(self.num_cols)
+        ]
+
+    # Categorical ########################################
+    def _update_categorical(self, x: Tensor):
+        # Shift the codes of every column into its own range of bins,
+        # so one bincount covers all columns.
+        x = x.long()
+        valid = x >= 0
+        size = (x.amax(dim=0) + 1).clamp(min=0) if x.size(0) > 0 \
+            else torch.zeros(self.num_cols, dtype=torch.long)
+        offset = size.cumsum(dim=0) - size
+        counts = torch.bincount((x + offset)[valid], minlength=int(size.sum()))
+        for i, col_counts in enumerate(counts.split(size.tolist())):
+            if col_counts.numel() > self.bincounts[i].numel():
+                col_counts, self.bincounts[i] = self.bincounts[i], col_counts.clone()
+            self.bincounts[i][: col_counts.numel()] += col_counts
+
+    def _compute_categorical(self) -> List[Dict[StatType, Any]]:
+        columns = {
+            StatType.COUNT: [counts.numel() for counts in self.bincounts],
+            StatType.MOST_FREQUENT: [
+                int(counts.argmax()) if counts.numel() > 0 else -1
+                for counts in self.bincounts
+            ],
+        }
+        return [
+            {stat_type: columns[stat_type][i] for stat_type in self.stat_types}
+            for i in range(self.num_cols)
+        ]
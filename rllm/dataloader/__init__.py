@@ -1,7 +1,13 @@
+from .neighbor_sampler import sample_neighbors
+from .graph_store import GraphStore
 from .neighbor_loader import NeighborLoader
+from .hetero_neighbor_loader import HeteroNeighborLoader
 from .bridge_loader import BRIDGELoader
 
 __all__ = [
+    "sample_neighbors",
+    "GraphStore",
     "NeighborLoader",
+    "HeteroNeighborLoader",
     "BRIDGELoader",
 ]
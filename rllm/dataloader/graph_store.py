@@ -0,0 +1,254 @@
+import os
+import os.path as osp
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import torch
+from torch import Tensor
+
+from rllm.data import GraphData, HeteroGraphData, EdgeStorage
+from rllm.utils._dataloader import be_mem_share_index_select
+
+
+NodeType = str
+EdgeType = Tuple[str, str, str]
+
+
+class GraphStore:
+    r"""A read-only CSC graph store which is built once and shared by
+    all `DataLoader` workers.
+
+    The CSC of every edge type is computed by :meth:`EdgeStorage.to_csc`
+    with `share_memory=True`, so workers receive handles of the same
+    shared memory instead of their own copies. If `path` is given, the
+    tensors are additionally dumped to raw files and memory-mapped; a
+    pickled store then only carries the file names, and every worker
+    maps the same pages again.
+
+    A homogeneous graph is stored as one node type `"node"` and one
+    edge type `("node", "to", "node")`.
+
+    Args:
+        data (Union[GraphData, HeteroGraphData]): The graph to store.
+        node_attrs (List[str], optional): Node attributes, e.g. `["x"]`,
+            to share as well. They can be gathered by :meth:`index_select`.
+            (default: `None`)
+        path (str, optional): A directory to hold the memory-mapped
+            files. If None, use shared memory only.
+            (default: `None`)
+        device (torch.device, optional): The device of the CSC tensors.
+            Sharing only applies to CPU tensors.
+            (default: `None`)
+        edge_time (str, optional): The edge attribute holding edge
+            timestamps. If set, every CSC column is sorted by time and
+            `row_time_dict` holds the timestamp of each entry, enabling
+            temporal sampling. (default: `None`)
+        node_time (str, optional): The node attribute holding node
+            timestamps. Used like `edge_time`, with the timestamp of the
+            source node of each edge. (default: `None`)
+    """
+
+    NODE_TYPE = "node"
+    EDGE_TYPE = ("node", "to", "node")
+
+    def __init__(
+        self,
+        data: Union[GraphData, HeteroGraphData],
+        node_attrs: Optional[List[str]] = None,
+        path: Optional[str] = None,
+        device: Optional[torch.device] = None,
+        edge_time: Optional[str] = None,
+        node_time: Optional[str] = None,
+    ):
+        self.path = path
+        self.is_hetero = isinstance(data, HeteroGraphData)
+        self.num_nodes_dict: Dict[NodeType, int] = {}
+        self.node_attr_dict: Dict[Tuple[NodeType, str], Tensor] = {}
+
+        if self.is_hetero:
+            edge_time_d = {}
+            for node_type, store in data.node_items():
+                self.num_nodes_dict[node_type] = store.num_nodes
+                for key in node_attrs or []:
+                    if key in store:
+                        self.node_attr_dict[(node_type, key)] = store[key]
+            for edge_type, store in data.edge_items():
+                if edge_time is not None and edge_time in store:
+                    edge_time_d[edge_type] = store[edge_time]
+                elif node_time is not None and node_time in data[edge_type[0]]:
+                    src_time = data[edge_type[0]][node_time]
+                    edge_time_d[edge_type] = src_time[store.edge_index[0]]
+            self.col_ptr_dict, self.row_dict, self.perm_dict = data.to_csc_dict(
+                device=device, share_memory=True, edge_time_d=edge_time_d
+            )
+        else:
+            self.num_nodes_dict[self.NODE_TYPE] = data.num_nodes
+            for key in node_attrs or []:
+                self.node_attr_dict[(self.NODE_TYPE, key)] = data[key]
+            edge_time_d = {}
+            if "edge_index" in data:
+                edge_store = EdgeStorage(edge_index=data.edge_index)
+            elif edge_time is not None or node_time is not None:
+                # temporal sorting needs the edge list
+                edge_store = EdgeStorage(edge_index=data.adj.coalesce().indices())
+            else:
+                edge_store = EdgeStorage(adj=data.adj)
+            if edge_time is not None:
+                edge_time_d[self.EDGE_TYPE] = data[edge_time]
+            elif node_time is not None:
+                edge_time_d[self.EDGE_TYPE] = data[node_time][edge_store.edge_index[0]]
+            col_ptr, row, perm = edge_store.to_csc(
+                device=device,
+                num_nodes=data.num_nodes,
+                share_memory=True,
+                edge_time=edge_time_d.get(self.EDGE_TYPE, None),
+            )
+            self.col_ptr_dict = {self.EDGE_TYPE: col_ptr}
+            self.row_dict = {self.EDGE_TYPE: row}
+            self.perm_dict = {self.EDGE_TYPE: perm}
+
+        # time of every CSC entry, sorted inside each column
+        self.row_time_dict: Dict[EdgeType, Optional[Tensor]] = {}
+        for edge_type in self.col_ptr_dict:
+            time = edge_time_d.get(edge_type, None)
+            if time is not None:
+                time = time.to(self.row_dict[edge_type].device)
+                time = time[self.perm_dict[edge_type]]
+                if not time.is_cuda:
+                    time.share_memory_()
+            self.row_time_dict[edge_type] = time
+
+        for value in self.node_attr_dict.values():
+            if not value.is_cuda:
+                value.share_memory_()
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self._meta = {}
+            for name, value in self._tensors():
+                self._meta[name] = (value.dtype, tuple(value.shape))
+                value.cpu().numpy().tofile(osp.join(path, name))
+            self._attach()
+
+    @property
+    def device(self) -> torch.device:
+        return next(iter(self.row_dict.values())).device
+
+    @property
+    def node_types(self) -> List[NodeType]:
+        return list(self.num_nodes_dict.keys())
+
+    @property
+    def edge_types(self) -> List[EdgeType]:
+        return list(self.col_ptr_dict.keys())
+
+    @property
+    def num_nodes(self) -> int:
+        return sum(self.num_nodes_dict.values())
+
+    @property
+    def col_ptr(self) -> Tensor:
+        return self.col_ptr_dict[self._single_edge_type()]
+
+    @property
+    def row(self) -> Tensor:
+        return self.row_dict[self._single_edge_type()]
+
+    @property
+    def perm(self) -> Optional[Tensor]:
+        return self.perm_dict[self._single_edge_type()]
+
+    @property
+    def row_time(self) -> Optional[Tensor]:
+        return self.row_time_dict[self._single_edge_type()]
+
+    def index_select(
+        self,
+        key: str,
+        index: Tensor,
+        node_type: Optional[NodeType] = None,
+    ) -> Tensor:
+        r"""Gather the node attribute `key` at `index`. Inside a worker,
+        the result is written to shared memory, so handing it back to
+        the main process does not copy it again.
+
+        Args:
+            key (str): The node attribute, which must be listed in
+                `node_attrs`.
+            index (Tensor): The node indices.
+            node_type (str, optional): The node type of a heterogeneous
+                graph. (default: `None`)
+        """
+        node_type = self.NODE_TYPE if node_type is None else node_type
+        value = self.node_attr_dict[(node_type, key)]
+        return be_mem_share_index_select(value, index.to(value.device))
+
+    # Utility functions #######################################
+    def _single_edge_type(self) -> EdgeType:
+        if len(self.col_ptr_dict) != 1:
+            raise ValueError(
+                "The store holds multiple edge types, "
+                "use `col_ptr_dict`, `row_dict` and `perm_dict` instead."
+            )
+        return next(iter(self.col_ptr_dict.keys()))
+
+    def _tensors(self):
+        r"""Yield `(file name, tensor)` pairs of all stored tensors."""
+        for prefix, value_d in [
+            ("col_ptr", self.col_ptr_dict),
+            ("row", self.row_dict),
+            ("perm", self.perm_dict),
+            ("row_time", self.row_time_dict),
+        ]:
+            for edge_type, value in value_d.items():
+                if value is not None:
+                    yield f"{prefix}__{'__'.join(edge_type)}", value
+        for (node_type, key), value in self.node_attr_dict.items():
+            yield f"{key}__{node_type}", value
+
+    def _attach(self):
+        r"""Memory-map all tensors from the files under `self.path`."""
+        mapped = {
+            name: torch.from_file(
+                osp.join(self.path, name),
+                shared=True,
+                size=int(np.prod(shape)),
+                dtype=dtype,
+            ).view(shape)
+            for name, (dtype, shape) in self._meta.items()
+        }
+        for prefix, value_d in [
+            ("col_ptr", self.col_ptr_dict),
+            ("row", self.row_dict),
+            ("perm", self.perm_dict),
+            ("row_time", self.row_time_dict),
+        ]:
+            for edge_type in value_d:
+                name = f"{prefix}__{'__'.join(edge_type)}"
+                value_d[edge_type] = mapped.get(name, None)
+        for node_type, key in self.node_attr_dict:
+            self.node_attr_dict[(node_type, key)] = mapped[f"{key}__{node_type}"]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.path is not None:
+            # Only ship file names, workers map the files themselves.
+            state["col_ptr_dict"] = dict.fromkeys(self.col_ptr_dict)
+            state["row_dict"] = dict.fromkeys(self.row_dict)
+            state["perm_dict"] = dict.fromkeys(self.perm_dict)
+            state["row_time_dict"] = dict.fromkeys(self.row_time_dict)
+            state["node_attr_dict"] = dict.fromkeys(self.node_attr_dict)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.path is not None:
+            self._attach()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"node_types={self.node_types}, "
+            f"edge_types={self.edge_types}, "
+            f"path={self.path})"
+        )
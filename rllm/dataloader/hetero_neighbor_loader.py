@@ -0,0 +1,208 @@
+from typing import Dict, List, Optional, Tuple, Union
+
+import torch
+from torch import Tensor
+
+from rllm.data import HeteroGraphData
+from rllm.dataloader.graph_store import GraphStore
+from rllm.dataloader.neighbor_sampler import sample_neighbors, unique_first_seen
+
+NodeType = str
+EdgeType = Tuple[str, ...]
+
+
+class HeteroNeighborLoader(torch.utils.data.DataLoader):
+    r"""The neighbor sampler for heterogeneous graphs, which allows
+    mini-batch training of heterogeneous GNNs such as
+    :class:`~rllm.nn.conv.graph_conv.HGTConv` and
+    :class:`~rllm.nn.conv.graph_conv.HANConv`.
+
+    Starting from seed nodes of `seed_type`, every hop samples all edge
+    types whose destination type has been reached, each with its own
+    fanout, on the CSC built by :meth:`HeteroGraphData.to_csc_dict`.
+    Only nodes newly reached in a hop are expanded in the next one.
+
+    Every batch is a tuple `(batch_size, n_id_dict, x_dict,
+    edge_index_dict)`:
+
+    - `n_id_dict` maps each node type to the global indices of its
+      sampled nodes, in first-seen order. The seeds are the first
+      `batch_size` entries of `n_id_dict[seed_type]`.
+    - `x_dict` holds the node features `x` of the sampled nodes.
+    - `edge_index_dict` maps each edge type between sampled node types
+      to the sampled edges as a `(2, |E|)` tensor of local indices into
+      `n_id_dict`, possibly empty.
+
+    `x_dict` and `edge_index_dict` can be passed to
+    `HGTConv.forward(x_dict, edge_index_dict)` directly.
+
+    Args:
+        data (Union[HeteroGraphData, GraphStore]): The graph data to be
+            sampled. A :class:`GraphStore` must hold the node attribute
+            `x`.
+        num_neighbors (Union[List[int], Dict[EdgeType, List[int]]]): The
+            number of neighbors to sample in each hop, either shared by
+            all edge types or given per edge type.
+        seed_type (str): The node type of the seed nodes.
+        seeds (Optional[Tensor]): The nodes of `seed_type` to sample from.
+            If None, all nodes of `seed_type` will be used.
+        replace (bool, optional): Whether to sample with replacement.
+            Default is False.
+        shuffle (bool, optional): Whether to shuffle the data at every
+            epoch. Default is False.
+        batch_size (int, optional): How many samples per batch to load.
+            Default is 1.
+        num_workers (int, optional): How many subprocesses to use for
+            data loading. Default is 0.
+        **kwargs: Additional keyword arguments to be passed to the
+            `torch.utils.data.DataLoader` class.
+    """
+    def __init__(
+        self,
+        data: Union[HeteroGraphData, GraphStore],
+        num_neighbors: Union[List[int], Dict[EdgeType, List[int]]],
+        seed_type: NodeType,
+        seeds: Optional[Tensor] = None,
+        replace: bool = False,
+        shuffle: bool = False,
+        batch_size: int = 1,
+        num_workers: int = 0,
+        **kwargs,
+    ):
+        kwargs.pop("dataset", None)
+        kwargs.pop("collate_fn", None)
+
+        # prepare csc for sampling, shared among workers
+        if isinstance(data, GraphStore):
+            self.store = data
+        else:
+            self.store = GraphStore(data, node_attrs=["x"])
+
+        self.device = self.store.device
+        self.seed_type = seed_type
+        self.replace = replace
+
+        if not isinstance(num_neighbors, dict):
+            num_neighbors = {
+                edge_type: num_neighbors for edge_type in self.store.edge_types
+            }
+        self.num_neighbors = num_neighbors
+        self.num_hops = max(len(v) for v in num_neighbors.values())
+
+        if seeds is None:
+            seeds = torch.arange(
+                self.store.num_nodes_dict[seed_type], dtype=torch.long
+            )
+        elif not isinstance(seeds, Tensor):
+            seeds = torch.tensor(seeds, dtype=torch.long)
+        elif seeds.dtype == torch.bool:
+            seeds = seeds.nonzero(as_tuple=False).flatten()
+
+        super().__init__(
+            dataset=seeds,
+            batch_size=batch_size,
+            shuffle=shuffle,
+            num_workers=num_workers,
+            collate_fn=self.collate_fn,
+            **kwargs,
+        )
+
+    def sample_one_hop(
+        self,
+        n_id_dict: Dict[NodeType, Tensor],
+        seed_dict: Dict[NodeType, Tensor],
+        hop: int,
+    ) -> Dict[EdgeType, Tuple[Tensor, Tensor]]:
+        r"""Sample one hop for all edge types.
+
+        Args:
+            n_id_dict (Dict[NodeType, Tensor]): The sampled nodes so far.
+            seed_dict (Dict[NodeType, Tensor]): The local indices of the
+                nodes to expand for each node type.
+            hop (int): The index of the current hop.
+
+        Returns:
+            Dict[EdgeType, Tuple[Tensor, Tensor]]: The sampled global
+            source and destination nodes of each edge type.
+        """
+        out = {}
+        for edge_type in self.store.edge_types:
+            dst_type = edge_type[-1]
+            fanouts = self.num_neighbors.get(edge_type, [])
+            if dst_type not in seed_dict or hop >= len(fanouts):
+                continue
+            src, dst, _ = sample_neighbors(
+                self.store.col_ptr_dict[edge_type],
+                self.store.row_dict[edge_type],
+                n_id_dict[dst_type][seed_dict[dst_type]],
+                fanouts[hop],
+                replace=self.replace,
+            )
+            out[edge_type] = (src, dst)
+        return out
+
+    def collate_fn(
+        self,
+        batch: List[Tensor],
+    ) -> Tuple[
+        int, Dict[NodeType, Tensor], Dict[NodeType, Tensor], Dict[EdgeType, Tensor]
+    ]:
+        r"""Collate function for the HeteroNeighborLoader, which samples
+        the heterogeneous neighborhood of the batch and relabels it.
+        """
+        batch = torch.tensor(batch, dtype=torch.long).to(self.device)
+        n_id_dict = {self.seed_type: batch}
+        seed_dict = {self.seed_type: torch.arange(batch.numel(), device=self.device)}
+        edges_dict = {edge_type: [] for edge_type in self.store.edge_types}
+
+        for hop in range(self.num_hops):
+            sampled = self.sample_one_hop(n_id_dict, seed_dict, hop)
+
+            # Relabel all edge types touching a node type at once.
+            seed_dict = {}
+            for node_type in self.store.node_types:
+                # (edge type, 0 for src / 1 for dst, global nodes)
+                pieces = [
+                    (edge_type, i, nodes[i])
+                    for edge_type, nodes in sampled.items()
+                    for i, end_type in enumerate((edge_type[0], edge_type[-1]))
+                    if end_type == node_type
+                ]
+                if len(pieces) == 0:
+                    continue
+                n_id = n_id_dict.get(
+                    node_type, torch.empty(0, dtype=torch.long, device=self.device)
+                )
+                num_old = n_id.numel()
+                n_id, local = unique_first_seen(
+                    torch.cat([n_id] + [nodes for _, _, nodes in pieces])
+                )
+                n_id_dict[node_type] = n_id
+                seed_dict[node_type] = torch.arange(
+                    num_old, n_id.numel(), device=self.device
+                )
+
+                local = local[num_old:].split([nodes.numel() for _, _, nodes in pieces])
+                for (edge_type, i, _), nodes in zip(pieces, local):
+                    sampled[edge_type] = (
+                        (nodes, sampled[edge_type][1]) if i == 0
+                        else (sampled[edge_type][0], nodes)
+                    )
+
+            for edge_type, (src, dst) in sampled.items():
+                edges_dict[edge_type].append(torch.stack([src, dst], dim=0))
+
+        x_dict = {
+            node_type: self.store.index_select("x", n_id, node_type)
+            for node_type, n_id in n_id_dict.items()
+            if (node_type, "x") in self.store.node_attr_dict
+        }
+        edge_index_dict = {
+            edge_type: (
+                torch.cat(edges, dim=1) if len(edges) > 0
+                else torch.empty((2, 0), dtype=torch.long, device=self.device)
+            )
+            for edge_type, edges in edges_dict.items()
+            if edge_type[0] in n_id_dict and edge_type[-1] in n_id_dict
+        }
+        return batch.numel(), n_id_dict, x_dict, edge_index_dict
@@ -1,9 +1,16 @@
-from typing import Optional, List, Tuple, Callable
+from typing import Optional, List, Tuple, Callable, Union
 
 import torch
 from torch import Tensor
 
 from rllm.data import GraphData
+from rllm.dataloader.graph_store import GraphStore
+from rllm.dataloader.neighbor_sampler import (
+    csc_sample,
+    sample_neighbors,
+    unique_first_seen,
+)
+from rllm.utils import index2ptr
 
 
 class NeighborLoader(torch.utils.data.DataLoader):
@@ -13,7 +20,9 @@ class NeighborLoader(torch.utils.data.DataLoader):
     training is not feasible.
 
     Args:
-        data (GraphData): The graph data to be sampled.
+        data (Union[GraphData, GraphStore]): The graph data to be sampled.
+            A :class:`GraphStore` can be passed to share one CSC among
+            several loaders and their workers.
         num_neighbors (List[int]): The number of neighbors to sample
             for each node in each layer.
         seeds (Optional[Tensor]): The nodes to sample from. If None,
@@ -24,6 +33,26 @@ class NeighborLoader(torch.utils.data.DataLoader):
             returning it.
         replace (bool, optional): Whether to sample with replacement.
             Default is False.
+        block (bool, optional): If set to `True`, every hop samples
+            neighbors for all nodes collected so far and returns a
+            bipartite sparse CSC block of shape `(num_src, num_dst)`,
+            whose destination nodes are the first `num_dst` entries of
+            `n_id`. Otherwise, every hop returns a square sparse COO
+            adjacency of shape `(len(n_id), len(n_id))`.
+            Default is False.
+        seed_time (Optional[Tensor]): The timestamp of each seed, which
+            enables temporal sampling: a seed and every node sampled for
+            it only see edges at or before the seed timestamp. Each seed
+            grows its own subgraph, so `n_id` may hold a node once per
+            seed. Requires `edge_time` or `node_time`.
+        edge_time (Optional[str]): The edge attribute of `data` holding
+            edge timestamps for temporal sampling.
+        node_time (Optional[str]): The node attribute of `data` holding
+            node timestamps for temporal sampling. An edge takes the
+            timestamp of its source node.
+        temporal_strategy (str, optional): `"uniform"` samples uniformly
+            from the past, `"last"` takes the most recent neighbors.
+            Default is "uniform".
         shuffle (bool, optional): Whether to shuffle the data at every
             epoch. Default is False.
         batch_size (int, optional): How many samples per batch to load.
@@ -35,11 +64,16 @@ class NeighborLoader(torch.utils.data.DataLoader):
     """
     def __init__(
         self,
-        data: GraphData,
+        data: Union[GraphData, GraphStore],
         num_neighbors: List[int],
         seeds: Optional[Tensor] = None,
         transform: Optional[Callable] = None,
         replace: bool = False,
+        block: bool = False,
+        seed_time: Optional[Tensor] = None,
+        edge_time: Optional[str] = None,
+        node_time: Optional[str] = None,
+        temporal_strategy: str = "uniform",
         shuffle: bool = False,
         batch_size: int = 1,
         num_workers: int = 0,
@@ -48,12 +82,22 @@ class NeighborLoader(torch.utils.data.DataLoader):
         kwargs.pop("dataset", None)
         kwargs.pop("collate_fn", None)
 
-        self.device = data.device
+        # prepare csc for sampling, shared among workers
+        if isinstance(data, GraphStore):
+            self.store = data
+        else:
+            self.store = GraphStore(
+                data, device=data.device, edge_time=edge_time, node_time=node_time
+            )
+
+        self.device = self.store.device
         self.num_neighbors = num_neighbors
         self.replace = replace
+        self.block = block
+        self.temporal_strategy = temporal_strategy
         self.transform = transform
 
-        self.num_nodes = data.num_nodes
+        self.num_nodes = self.store.num_nodes
 
         if seeds is None:
             seeds = torch.arange(self.num_nodes, dtype=torch.long)
@@ -62,8 +106,17 @@ class NeighborLoader(torch.utils.data.DataLoader):
         elif seeds.dtype == torch.bool:
             seeds = seeds.nonzero(as_tuple=False).flatten()
 
-        # prepare csc for sampling
-        self._build_csc(data)
+        self.seeds = seeds.to(self.device)
+        self.seed_time = None
+        if seed_time is not None:
+            assert self.store.row_time is not None, (
+                "Temporal sampling needs a time-sorted CSC, "
+                "please set `edge_time` or `node_time`."
+            )
+            assert seed_time.numel() == seeds.numel()
+            self.seed_time = seed_time.to(self.device)
+            # Seeds may repeat with different times, so iterate positions.
+            seeds = torch.arange(seeds.numel(), dtype=torch.long)
 
         super().__init__(
             dataset=seeds,
@@ -74,23 +127,13 @@ class NeighborLoader(torch.utils.data.DataLoader):
             **kwargs,
         )
 
-    def _build_csc(self, data: GraphData):
-        r"""Build a compressed sparse column (CSC) representation of the graph
-        for efficient neighbor sampling.
-        """
-        if hasattr(data, "edge_index"):
-            edge_index = data.edge_index
-        elif hasattr(data, "adj"):
-            edge_index = data.adj.coalesce().indices()
-        order = torch.argsort(edge_index[1])
-        self.dst_sorted = edge_index[1][order]
-        self.src_sorted = edge_index[0][order]
-        cnts = torch.bincount(self.dst_sorted, minlength=self.num_nodes)
-        self.col_ptr = torch.empty(
-            self.num_nodes + 1, dtype=torch.long, device=self.device
-        )
-        self.col_ptr[0] = 0
-        self.col_ptr[1:] = torch.cumsum(cnts, dim=0)
+    @property
+    def col_ptr(self) -> Tensor:
+        return self.store.col_ptr
+
+    @property
+    def src_sorted(self) -> Tensor:
+        return self.store.row
 
     def get_in_neighbors(self, node: int) -> torch.Tensor:
         r"""Get the in-neighbors of a given node in the graph.
@@ -103,12 +146,16 @@ class NeighborLoader(torch.utils.data.DataLoader):
         return self.src_sorted[start:end]
 
     def sample_neighbors_one_layer(
-        self, seed_nodes: List[int], num_neighbor: int
+        self, seed_nodes: Union[List[int], Tensor], num_neighbor: int
     ) -> Tuple[Tensor, Tensor]:
         r"""Sample neighbors for a given set of seed nodes.
 
+        All seed nodes are sampled at once by
+        :func:`~rllm.dataloader.neighbor_sampler.sample_neighbors`.
+
         Args:
-            seed_nodes (List[int]): The nodes to sample neighbors from.
+            seed_nodes (Union[List[int], Tensor]): The nodes to sample
+                neighbors from.
             num_neighbor (int): The number of neighbors to sample for
                 each node.
 
@@ -116,32 +163,18 @@ class NeighborLoader(torch.utils.data.DataLoader):
             Tuple[Tensor, Tensor]: A tuple containing the sampled source
             nodes and destination nodes.
         """
-        sampled_src_list = []
-        dst_list = []
-        for i, node in enumerate(seed_nodes):
-            neighbors = self.get_in_neighbors(node)
-            n_neighbors = neighbors.numel()
-            if n_neighbors == 0:
-                continue
-            elif num_neighbor < 0 or n_neighbors < num_neighbor:
-                sampled = neighbors
-            else:
-                perm = torch.randperm(n_neighbors, device=self.device)[:num_neighbor]
-                sampled = neighbors[perm]
-
-            sampled_src_list.append(sampled)
-            dst_list.append(
-                torch.full(
-                    (sampled.numel(),), node, dtype=torch.long, device=self.device
-                )
-            )
-        if sampled_src_list:
-            return torch.cat(sampled_src_list), torch.cat(dst_list)
-        else:
-            return (
-                torch.empty((0,), dtype=torch.long, device=self.device),
-                torch.empty((0,), dtype=torch.long, device=self.device),
+        if not isinstance(seed_nodes, Tensor):
+            seed_nodes = torch.tensor(
+                seed_nodes, dtype=torch.long, device=self.device
             )
+        src, dst, _ = sample_neighbors(
+            self.col_ptr,
+            self.src_sorted,
+            seed_nodes,
+            num_neighbor,
+            replace=self.replace,
+        )
+        return src, dst
 
     def collate_fn(
         self,
@@ -151,41 +184,74 @@ class NeighborLoader(torch.utils.data.DataLoader):
         is responsible for sampling neighbors for each node in the
         batch and returning the sampled nodes and their corresponding
         adjacency lists.
+
+        `n_id` keeps nodes in first-seen order, i.e. the batch nodes come
+        first, followed by the nodes newly reached at each hop. Sampling
+        and relabeling stay on `self.device` from the first hop to the
+        returned adjacencies.
         """
-        batch = torch.tensor(batch, dtype=torch.long).tolist()
+        batch = torch.tensor(batch, dtype=torch.long).to(self.device)
+        temporal = self.seed_time is not None
+        if temporal:
+            batch_time = self.seed_time[batch]
+            batch = self.seeds[batch]
+
+        # In temporal mode, nodes are keyed by `(seed, node)` so that each
+        # seed keeps its own subgraph, sampled with its own timestamp.
+        N = self.num_nodes
+        if temporal:
+            n_key = torch.arange(batch.numel(), device=self.device) * N + batch
+        else:
+            n_key = batch
+        n_id = batch
+        seeds = torch.arange(batch.numel(), device=self.device)
         raw_adjs = []
-        seed_nodes = batch
-        n_id = batch.copy()
-        seen = set(n_id)
         for num_neighbor in self.num_neighbors:
-            sampled_src, dst = self.sample_neighbors_one_layer(seed_nodes, num_neighbor)
-            raw_adjs.append((sampled_src, dst))
-
-            for node in sampled_src.tolist():
-                if node not in seen:
-                    seen.add(node)
-                    n_id.append(node)
-            seed_nodes = sampled_src.unique().tolist()
+            num_dst = n_key.numel()
+            eid, seg = csc_sample(
+                self.col_ptr,
+                n_id[seeds],
+                num_neighbor,
+                replace=self.replace,
+                seed_time=batch_time[n_key[seeds] // N] if temporal else None,
+                row_time=self.store.row_time,
+                temporal_strategy=self.temporal_strategy,
+            )
+            src = self.src_sorted[eid]
+            dst = seeds[seg]
+            if temporal:
+                src = (n_key[dst] // N) * N + src
+            n_key, local = unique_first_seen(torch.cat([n_key, src]))
+            n_id = n_key % N if temporal else n_key
+            src = local[num_dst:]
+            raw_adjs.append((src, dst, n_key.numel(), num_dst))
 
-        n_id = torch.tensor(n_id, dtype=torch.long, device=self.device)
-        sorted_, perm = torch.sort(n_id)
+            if self.block:
+                seeds = torch.arange(n_key.numel(), device=self.device)
+            else:
+                seeds = src.unique()
 
         adjs = []
-        for i, (src, dst) in enumerate(raw_adjs):
-            if src.numel() == 0:
-                adjs.append(torch.empty((0,), dtype=torch.long, device=self.device))
-                continue
-            src_ = perm[torch.searchsorted(sorted_, src)]
-            dst_ = perm[torch.searchsorted(sorted_, dst)]
-            edge_index = torch.stack([src_, dst_], dim=0)
-            size = edge_index.max() + 1
-            adj = torch.sparse_coo_tensor(
-                indices=edge_index,
-                values=torch.ones(edge_index.shape[1], device=self.device),
-                size=(size, size),
-                device=self.device,
-            )
+        for src, dst, num_src, num_dst in raw_adjs:
+            values = torch.ones(src.numel(), device=self.device)
+            if self.block:
+                # Seeds are visited in ascending local order, so `dst` is
+                # already sorted and directly gives the CSC layout.
+                adj = torch.sparse_csc_tensor(
+                    ccol_indices=index2ptr(dst, num_dst),
+                    row_indices=src,
+                    values=values,
+                    size=(num_src, num_dst),
+                    device=self.device,
+                )
+            else:
+                adj = torch.sparse_coo_tensor(
+                    indices=torch.stack([src, dst], dim=0),
+                    values=values,
+                    size=(n_key.numel(), n_key.numel()),
+                    device=self.device,
+                )
             if self.transform is not None:
                 adj = self.transform(adj)
             adjs.append(adj)
-        return len(batch), n_id, adjs
+        return batch.numel(), n_id, adjs
@@ -0,0 +1,189 @@
+from typing import Optional, Tuple
+
+import torch
+from torch import Tensor
+
+
+def sample_neighbors(
+    col_ptr: Tensor,
+    row: Tensor,
+    seeds: Tensor,
+    num_neighbors: int,
+    replace: bool = False,
+    seed_time: Optional[Tensor] = None,
+    row_time: Optional[Tensor] = None,
+    temporal_strategy: str = "uniform",
+) -> Tuple[Tensor, Tensor, Tensor]:
+    r"""Sample in-neighbors of all `seeds` at once from a CSC graph.
+
+    Every seed owns the segment `row[col_ptr[seed]:col_ptr[seed + 1]]`.
+    Instead of looping over seeds, all segments are expanded into one flat
+    tensor, each entry gets a random key, and a single sort by
+    `(segment, key)` yields a random permutation inside every segment.
+    Keeping the first `num_neighbors` entries of each segment is then a
+    plain mask.
+
+    If `seed_time` is given, every segment must be sorted by `row_time`
+    and each seed only sees the edges with `row_time <= seed_time`, found
+    by a binary search inside its segment. Edges from the future are
+    never sampled.
+
+    Args:
+        col_ptr (Tensor): The column pointers of the CSC graph.
+        row (Tensor): The row (source node) indices of the CSC graph.
+        seeds (Tensor): The destination nodes to sample neighbors for.
+        num_neighbors (int): The number of neighbors to sample for each
+            seed. If negative, all neighbors are kept.
+        replace (bool, optional): If set to `True`, sample with
+            replacement, i.e. every seed with at least one neighbor gets
+            exactly `num_neighbors` samples.
+            (default: `False`)
+        seed_time (Tensor, optional): The timestamp of each seed.
+            (default: `None`)
+        row_time (Tensor, optional): The timestamp of each entry of `row`,
+            sorted inside every segment. Required if `seed_time` is given.
+            (default: `None`)
+        temporal_strategy (str, optional): `"uniform"` samples uniformly
+            from the past edges, `"last"` keeps the most recent
+            `num_neighbors` ones.
+            (default: `"uniform"`)
+
+    Returns:
+        Tuple[Tensor, Tensor, Tensor]: The sampled source nodes, their
+        destination seeds and the positions of the sampled edges in `row`.
+        Edges are grouped by seed, following the order of `seeds`.
+
+    Example:
+        >>> col_ptr = torch.tensor([0, 0, 1, 3])
+        >>> row = torch.tensor([0, 0, 1])
+        >>> sample_neighbors(col_ptr, row, torch.tensor([2, 1]), -1)
+        (tensor([0, 1, 0]), tensor([2, 2, 1]), tensor([1, 2, 0]))
+    """
+    seeds = seeds.to(device=row.device, dtype=torch.long)
+    eid, seg = csc_sample(
+        col_ptr,
+        seeds,
+        num_neighbors,
+        replace=replace,
+        seed_time=seed_time,
+        row_time=row_time,
+        temporal_strategy=temporal_strategy,
+    )
+    return row[eid], seeds[seg], eid
+
+
+def csc_sample(
+    col_ptr: Tensor,
+    seeds: Tensor,
+    num_neighbors: int,
+    replace: bool = False,
+    seed_time: Optional[Tensor] = None,
+    row_time: Optional[Tensor] = None,
+    temporal_strategy: str = "uniform",
+) -> Tuple[Tensor, Tensor]:
+    r"""The kernel of :func:`sample_neighbors`, working on positions only.
+
+    Returns:
+        Tuple[Tensor, Tensor]: The positions of the sampled edges in the
+        CSC row array and, for each of them, the index of its seed in
+        `seeds`.
+    """
+    device = col_ptr.device
+    start = col_ptr[seeds]
+    end = col_ptr[seeds + 1]
+
+    if seed_time is not None:
+        if temporal_strategy not in ("uniform", "last"):
+            raise ValueError(
+                f"Unknown temporal strategy `{temporal_strategy}`, "
+                "expect `uniform` or `last`."
+            )
+        assert row_time is not None, "`row_time` is required by `seed_time`."
+        end = segment_searchsorted(row_time, start, end, seed_time.to(device))
+        if temporal_strategy == "last" and num_neighbors >= 0:
+            start = torch.maximum(start, end - num_neighbors)
+            num_neighbors = -1
+    deg = end - start
+
+    if replace and num_neighbors >= 0:
+        # Draw `num_neighbors` offsets per non-isolated seed.
+        seg = (deg > 0).nonzero(as_tuple=False).view(-1)
+        rand = torch.rand((seg.numel(), num_neighbors), device=device)
+        offset = (rand * deg[seg].view(-1, 1)).long()
+        eid = (start[seg].view(-1, 1) + offset).view(-1)
+        return eid, seg.repeat_interleave(num_neighbors)
+
+    # Expand every segment into a flat edge list.
+    seg = torch.arange(seeds.numel(), device=device).repeat_interleave(deg)
+    seg_ptr = torch.zeros(seeds.numel() + 1, dtype=torch.long, device=device)
+    seg_ptr[1:] = deg.cumsum(0)
+    rank = torch.arange(seg.numel(), device=device) - seg_ptr[seg]
+
+    if num_neighbors >= 0 and bool((deg > num_neighbors).any()):
+        # Shuffle inside segments: `seg` is integral and keys lie in [0, 1),
+        # so sorting `seg + key` keeps segments contiguous and in order.
+        key = seg.to(torch.float64) + torch.rand(seg.numel(), device=device,
+                                                 dtype=torch.float64)
+        perm = key.argsort()
+        eid = start[seg] + rank[perm]
+        mask = rank < num_neighbors
+        eid, seg = eid[mask], seg[mask]
+    else:
+        eid = start[seg] + rank
+
+    return eid, seg
+
+
+def segment_searchsorted(
+    values: Tensor,
+    start: Tensor,
+    end: Tensor,
+    target: Tensor,
+) -> Tensor:
+    r"""Batched binary search: for every `i`, find the first position `p`
+    in `values[start[i]:end[i]]` (sorted ascending) with
+    `values[p] > target[i]`, i.e. the end of the entries `<= target[i]`.
+
+    Example:
+        >>> values = torch.tensor([1, 3, 5, 2, 4])
+        >>> segment_searchsorted(values, torch.tensor([0, 3]),
+        ...                      torch.tensor([3, 5]), torch.tensor([3, 1]))
+        tensor([2, 3])
+    """
+    lo, hi = start.clone(), end.clone()
+    if lo.numel() == 0:
+        return hi
+    num_steps = int((end - start).max().item()).bit_length()
+    for _ in range(num_steps):
+        active = lo < hi
+        mid = (lo + hi) // 2
+        go_right = values[mid.clamp(max=values.numel() - 1)] <= target
+        lo = torch.where(active & go_right, mid + 1, lo)
+        hi = torch.where(active & ~go_right, mid, hi)
+    return lo
+
+
+def unique_first_seen(nodes: Tensor) -> Tuple[Tensor, Tensor]:
+    r"""Deduplicate `nodes` while keeping the order of first appearance.
+
+    Args:
+        nodes (Tensor): The (global) node indices, possibly duplicated.
+
+    Returns:
+        Tuple[Tensor, Tensor]: The unique nodes ordered by their first
+        appearance in `nodes`, and the position of every entry of `nodes`
+        in it, i.e. its local index.
+
+    Example:
+        >>> unique_first_seen(torch.tensor([5, 2, 5, 7, 2]))
+        (tensor([5, 2, 7]), tensor([0, 1, 0, 2, 1]))
+    """
+    uniq, inverse = torch.unique(nodes, return_inverse=True)
+    first = torch.full_like(uniq, nodes.numel())
+    first.scatter_reduce_(
+        0, inverse, torch.arange(nodes.numel(), device=nodes.device), "amin"
+    )
+    order = first.argsort()
+    local = torch.empty_like(order)
+    local[order] = torch.arange(order.numel(), device=order.device)
+    return uniq[order], local[inverse]
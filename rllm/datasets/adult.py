@@ -71,7 +71,7 @@ class Adult(Dataset):
 
     @property
     def processed_filenames(self):
-        return ["data.pt"]
+        return ["data"]
 
     def process(self):
         r"""
@@ -108,7 +108,7 @@ class Adult(Dataset):
             target_col="income",
         )
 
-        data.save(self.processed_paths[0])
+        data.save_columnar(self.processed_paths[0])
 
     def download(self):
         os.makedirs(self.raw_dir, exist_ok=True)
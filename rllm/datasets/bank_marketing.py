@@ -77,7 +77,7 @@ class BankMarketing(Dataset):
 
     @property
     def processed_filenames(self):
-        return ["data.pt"]
+        return ["data"]
 
     def process(self):
         r"""
@@ -115,7 +115,7 @@ class BankMarketing(Dataset):
             target_col="y",
         )
 
-        data.save(self.processed_paths[0])
+        data.save_columnar(self.processed_paths[0])
 
     def download(self):
         os.makedirs(self.raw_dir, exist_ok=True)
@@ -73,7 +73,7 @@ class ChurnModelling(Dataset):
 
     @property
     def processed_filenames(self):
-        return ["data.pt"]
+        return ["data"]
 
     def process(self):
         r"""
@@ -105,7 +105,7 @@ class ChurnModelling(Dataset):
             target_col="Exited",
         )
 
-        data.save(self.processed_paths[0])
+        data.save_columnar(self.processed_paths[0])
 
     def download(self):
         os.makedirs(self.raw_dir, exist_ok=True)
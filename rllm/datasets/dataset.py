@@ -4,6 +4,16 @@ import os.path as osp
 
 import torch
 
+from rllm.data.columnar import META_FILE
+
+
+def _is_processed(path: str) -> bool:
+    # A columnar directory is complete only once `meta.json` is written,
+    # so an interrupted `process()` is redone.
+    if osp.isdir(path):
+        return osp.exists(osp.join(path, META_FILE))
+    return osp.exists(path)
+
 
 class Dataset(torch.utils.data.Dataset, ABC):
     r"""An abstract class for creating graph and table datasets.
@@ -56,7 +66,7 @@ class Dataset(torch.utils.data.Dataset, ABC):
     def has_process(self):
         r"""check whether data has been processed"""
         file_exist = all(
-            osp.exists(osp.join(self.processed_dir, file))
+            _is_processed(osp.join(self.processed_dir, file))
             for file in self.processed_filenames
         )
         return file_exist and not self.force_reload
@@ -78,8 +78,12 @@ class TACM12KDataset(Dataset):
             TableData.load(self.processed_paths[1]),
             TableData.load(self.processed_paths[2]),
             TableData.load(self.processed_paths[3]),
-            torch.from_numpy(np.load(osp.join(self.raw_dir, "paper_embeddings.npy"))),
-            torch.from_numpy(np.load(osp.join(self.raw_dir, "author_embeddings.npy"))),
+            torch.from_numpy(
+                np.load(osp.join(self.raw_dir, "paper_embeddings.npy"), mmap_mode="c")
+            ),
+            torch.from_numpy(
+                np.load(osp.join(self.raw_dir, "author_embeddings.npy"), mmap_mode="c")
+            ),
         ]
 
     @property
@@ -95,10 +99,10 @@ class TACM12KDataset(Dataset):
     @property
     def processed_filenames(self):
         return [
-            "paper_data.pt",
-            "authors_data.pt",
-            "citations_data.pt",
-            "writings_data.pt",
+            "paper_data",
+            "authors_data",
+            "citations_data",
+            "writings_data",
         ]
 
     def process(self):
@@ -126,7 +130,7 @@ class TACM12KDataset(Dataset):
             train_mask=masks["train_mask"],
             val_mask=masks["val_mask"],
             test_mask=masks["test_mask"],
-        ).save(self.processed_paths[0])
+        ).save_columnar(self.processed_paths[0])
 
         # authors Data
         path = osp.join(self.raw_dir, self.raw_filenames[1])
@@ -135,7 +139,9 @@ class TACM12KDataset(Dataset):
             "name": ColType.CATEGORICAL,
             "firm": ColType.CATEGORICAL,
         }
-        TableData(df=author_df, col_types=col_types).save(self.processed_paths[1])
+        TableData(df=author_df, col_types=col_types).save_columnar(
+            self.processed_paths[1]
+        )
 
         # cite Data
         path = osp.join(self.raw_dir, self.raw_filenames[2])
@@ -144,7 +150,9 @@ class TACM12KDataset(Dataset):
             "paper_id": ColType.NUMERICAL,
             "paper_id_cited": ColType.NUMERICAL,
         }
-        TableData(df=cite_df, col_types=col_types).save(self.processed_paths[2])
+        TableData(df=cite_df, col_types=col_types).save_columnar(
+            self.processed_paths[2]
+        )
 
         # cite Data
         path = osp.join(self.raw_dir, self.raw_filenames[3])
@@ -153,7 +161,9 @@ class TACM12KDataset(Dataset):
             "paper_id": ColType.NUMERICAL,
             "author_id": ColType.NUMERICAL,
         }
-        TableData(df=pa_df, col_types=col_types).save(self.processed_paths[3])
+        TableData(df=pa_df, col_types=col_types).save_columnar(
+            self.processed_paths[3]
+        )
 
     def download(self):
         os.makedirs(self.raw_dir, exist_ok=True)
@@ -74,7 +74,7 @@ class TLF2KDataset(Dataset):
 
     @property
     def processed_filenames(self):
-        return ["artists_data.pt", "user_artists_data.pt", "user_friends_data.pt"]
+        return ["artists_data", "user_artists_data", "user_friends_data"]
 
     def process(self):
         r"""
@@ -104,7 +104,7 @@ class TLF2KDataset(Dataset):
             train_mask=masks["train_mask"],
             val_mask=masks["val_mask"],
             test_mask=masks["test_mask"],
-        ).save(self.processed_paths[0])
+        ).save_columnar(self.processed_paths[0])
 
         # User-Artist Relationship
         path = osp.join(self.raw_dir, self.raw_filenames[1])
@@ -113,7 +113,9 @@ class TLF2KDataset(Dataset):
             "userID": ColType.NUMERICAL,
             "artistID": ColType.NUMERICAL,
         }
-        TableData(df=ua_df, col_types=col_types).save(self.processed_paths[1])
+        TableData(df=ua_df, col_types=col_types).save_columnar(
+            self.processed_paths[1]
+        )
 
         # User-user Relationship
         path = osp.join(self.raw_dir, self.raw_filenames[2])
@@ -122,7 +124,9 @@ class TLF2KDataset(Dataset):
             "userID": ColType.NUMERICAL,
             "friendID": ColType.NUMERICAL,
         }
-        TableData(df=uu_df, col_types=col_types).save(self.processed_paths[2])
+        TableData(df=uu_df, col_types=col_types).save_columnar(
+            self.processed_paths[2]
+        )
 
     def download(self):
         os.makedirs(self.raw_dir, exist_ok=True)
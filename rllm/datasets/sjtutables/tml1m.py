@@ -74,7 +74,9 @@ class TML1MDataset(Dataset):
             TableData.load(self.processed_paths[1]),
             TableData.load(self.processed_paths[2]),
             # TODO: Get this movie embedding from movie TableData
-            torch.from_numpy(np.load(osp.join(self.raw_dir, "embeddings.npy"))),
+            torch.from_numpy(
+                np.load(osp.join(self.raw_dir, "embeddings.npy"), mmap_mode="c")
+            ),
         ]
 
         self.transform = transform
@@ -87,7 +89,7 @@ class TML1MDataset(Dataset):
 
     @property
     def processed_filenames(self):
-        return ["user_data.pt", "movie_data.pt", "rating_data.pt"]
+        return ["user_data", "movie_data", "rating_data"]
 
     def process(self):
         r"""
@@ -113,7 +115,7 @@ class TML1MDataset(Dataset):
             train_mask=masks["train_mask"],
             val_mask=masks["val_mask"],
             test_mask=masks["test_mask"],
-        ).save(self.processed_paths[0])
+        ).save_columnar(self.processed_paths[0])
 
         # Movies Data
         path = osp.join(self.raw_dir, self.raw_filenames[1])
@@ -122,7 +124,9 @@ class TML1MDataset(Dataset):
         col_types = {
             "Year": ColType.NUMERICAL,
         }
-        TableData(df=movie_df, col_types=col_types).save(self.processed_paths[1])
+        TableData(df=movie_df, col_types=col_types).save_columnar(
+            self.processed_paths[1]
+        )
 
         # Ratings Data
         path = osp.join(self.raw_dir, self.raw_filenames[2])
@@ -132,7 +136,9 @@ class TML1MDataset(Dataset):
             "MovieID": ColType.NUMERICAL,
             "Rating": ColType.NUMERICAL,
         }
-        TableData(df=rating_df, col_types=col_types).save(self.processed_paths[2])
+        TableData(df=rating_df, col_types=col_types).save_columnar(
+            self.processed_paths[2]
+        )
 
     def download(self):
         os.makedirs(self.raw_dir, exist_ok=True)
@@ -65,7 +65,7 @@ class Titanic(Dataset):
 
     @property
     def processed_filenames(self):
-        return ["data.pt"]
+        return ["data"]
 
     def process(self):
         r"""
@@ -90,7 +90,7 @@ class Titanic(Dataset):
         }
         data = TableData(df=df, col_types=col_types, target_col="Survived")
 
-        data.save(self.processed_paths[0])
+        data.save_columnar(self.processed_paths[0])
 
     def download(self):
         os.makedirs(self.raw_dir, exist_ok=True)
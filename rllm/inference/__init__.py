@@ -0,0 +1,23 @@
+from .runner import (
+    load_model,
+    postprocess,
+    LatencyTracker,
+    InferenceRunner,
+    TableRunner,
+    GraphRunner,
+    BRIDGERunner,
+)
+from .server import serve_jsonl, make_http_server, serve_http
+
+__all__ = [
+    "load_model",
+    "postprocess",
+    "LatencyTracker",
+    "InferenceRunner",
+    "TableRunner",
+    "GraphRunner",
+    "BRIDGERunner",
+    "serve_jsonl",
+    "make_http_server",
+    "serve_http",
+]
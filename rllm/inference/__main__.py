@@ -0,0 +1,64 @@
+# Serve a saved model over stdin JSON lines or local HTTP, e.g.
+#   python -m rllm.inference --model model.pt --table data/table
+#   python -m rllm.inference --model bridge.pt --table data/table \
+#       --graph data/graph.pt --num_neighbors 10 5 --http 127.0.0.1:8000
+# The model is saved whole with `torch.save(model, path)`, and the data
+# with `save`, after the transforms used in training.
+
+import argparse
+
+import torch
+
+from rllm.data import GraphData, TableData
+from rllm.inference import (
+    BRIDGERunner,
+    GraphRunner,
+    TableRunner,
+    load_model,
+    serve_http,
+    serve_jsonl,
+)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--model", type=str, required=True, help="Saved model")
+parser.add_argument("--table", type=str, default=None, help="Saved TableData")
+parser.add_argument("--graph", type=str, default=None, help="Saved GraphData")
+parser.add_argument(
+    "--non_table", type=str, default=None, help="Saved non-table features"
+)
+parser.add_argument(
+    "--num_neighbors", type=int, nargs="+", default=None,
+    help="Neighbors sampled per hop, full graph if not set",
+)
+parser.add_argument("--batch_size", type=int, default=1024)
+parser.add_argument("--device", type=str, default="cpu")
+parser.add_argument(
+    "--http", type=str, default=None,
+    help="Serve HTTP on HOST:PORT instead of stdin",
+)
+args = parser.parse_args()
+
+model = load_model(args.model, map_location=args.device)
+table = TableData.load(args.table) if args.table is not None else None
+graph = GraphData.load(args.graph) if args.graph is not None else None
+kwargs = dict(batch_size=args.batch_size, device=args.device)
+
+if table is not None and graph is not None:
+    non_table = None
+    if args.non_table is not None:
+        non_table = torch.load(args.non_table, weights_only=False)
+    runner = BRIDGERunner(
+        model, table, graph, non_table, args.num_neighbors, **kwargs
+    )
+elif graph is not None:
+    runner = GraphRunner(model, graph, args.num_neighbors, **kwargs)
+elif table is not None:
+    runner = TableRunner(model, table, **kwargs)
+else:
+    parser.error("Please pass --table, --graph or both.")
+
+if args.http is not None:
+    host, port = args.http.rsplit(":", 1)
+    serve_http(runner, host, int(port))
+else:
+    serve_jsonl(runner)
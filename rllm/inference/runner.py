@@ -0,0 +1,489 @@
+import time
+from collections import deque
+from itertools import chain
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+from torch import Tensor
+
+from rllm.data import GraphData, TableData
+from rllm.dataloader import BRIDGELoader, NeighborLoader
+
+IndexLike = Union[Tensor, Sequence[int], np.ndarray]
+
+
+def load_model(
+    path: str,
+    model: Optional[torch.nn.Module] = None,
+    map_location: Union[str, torch.device] = "cpu",
+) -> torch.nn.Module:
+    r"""Load a model saved by :func:`torch.save`, either as a whole module
+    or as a state dict.
+
+    Args:
+        path (str): The saved file.
+        model (torch.nn.Module, optional): The model the state dict is
+            loaded into. Required if the file holds a state dict.
+            (default: :obj:`None`)
+        map_location (str or torch.device): See :func:`torch.load`.
+            (default: :obj:`"cpu"`)
+    """
+    obj = torch.load(path, map_location=map_location, weights_only=False)
+    if isinstance(obj, torch.nn.Module):
+        return obj
+    if model is None:
+        raise ValueError(
+            f"'{path}' holds a state dict, please pass the `model` to "
+            f"load it into."
+        )
+    model.load_state_dict(obj)
+    return model
+
+
+def _fingerprint(model: torch.nn.Module) -> Tuple:
+    # In-place updates bump `_version`, `.to()` changes `data_ptr`.
+    return tuple(
+        (id(t), t._version, t.data_ptr())
+        for t in chain(model.parameters(), model.buffers())
+    )
+
+
+def _as_index(ids: IndexLike) -> Tensor:
+    if isinstance(ids, Tensor):
+        if ids.dtype == torch.bool:
+            return ids.nonzero(as_tuple=False).flatten().cpu()
+        return ids.long().flatten().cpu()
+    return torch.as_tensor(np.asarray(ids, dtype=np.int64)).flatten()
+
+
+def _to_device(obj: Any, device: torch.device) -> Any:
+    if isinstance(obj, Tensor):
+        return obj.to(device)
+    if isinstance(obj, dict):
+        return {key: _to_device(value, device) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_to_device(value, device) for value in obj)
+    if isinstance(obj, TableData):
+        return obj.to(device)
+    return obj
+
+
+def postprocess(out: Tensor, output: str = "logits") -> Tensor:
+    r"""Turn model outputs into the scores returned to the client.
+
+    Args:
+        out (Tensor): The model outputs of shape `(N, C)` or `(N,)`.
+        output (str): `"logits"` returns :obj:`out` unchanged, `"proba"`
+            the softmax over classes, or the sigmoid of a single logit,
+            and `"label"` the predicted class. (default: :obj:`"logits"`)
+    """
+    binary = out.dim() == 1 or out.size(-1) == 1
+    if output == "logits":
+        return out
+    if output == "proba":
+        return out.sigmoid() if binary else out.softmax(dim=-1)
+    if output == "label":
+        return (out > 0).long().flatten() if binary else out.argmax(dim=-1)
+    raise ValueError(
+        f"Unknown output '{output}', expected 'logits', 'proba' or 'label'."
+    )
+
+
+class LatencyTracker:
+    r"""Keeps the latencies of the most recent requests and summarizes
+    them as percentiles.
+
+    Args:
+        window (int): The number of latest requests kept.
+            (default: :obj:`10000`)
+    """
+
+    def __init__(self, window: int = 10000):
+        self._latencies = deque(maxlen=window)
+        self.num_requests = 0
+        self.num_rows = 0
+
+    def record(self, seconds: float, num_rows: int) -> None:
+        self._latencies.append(seconds)
+        self.num_requests += 1
+        self.num_rows += num_rows
+
+    def reset(self) -> None:
+        self._latencies.clear()
+        self.num_requests = 0
+        self.num_rows = 0
+
+    def summary(self) -> Dict[str, float]:
+        r"""The request and row counts, and the mean, p50, p90, p99 and
+        max latencies in milliseconds over the window."""
+        stats = {"requests": self.num_requests, "rows": self.num_rows}
+        if len(self._latencies) == 0:
+            return stats
+        ms = np.fromiter(self._latencies, dtype=np.float64) * 1e3
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+        stats.update(
+            mean_ms=float(ms.mean()),
+            p50_ms=float(p50),
+            p90_ms=float(p90),
+            p99_ms=float(p99),
+            max_ms=float(ms.max()),
+        )
+        return stats
+
+
+class InferenceRunner:
+    r"""The base class of the inference runners, which score arbitrary
+    sets of row or node ids of a trained model.
+
+    The model is put in eval mode and every call runs under
+    :attr:`grad_mode`, :func:`torch.inference_mode` by default, in
+    micro-batches of :obj:`batch_size` ids. Data transforms are applied on the first call and kept, see
+    :meth:`clear_cache`. Runners are not thread-safe, front ends should
+    serialize their calls.
+
+    Args:
+        model (torch.nn.Module): The trained model.
+        batch_size (int): The number of ids per micro-batch.
+            (default: :obj:`1024`)
+        device (torch.device, optional): The device the model runs on.
+            (default: the device of the model parameters)
+        window (int): The number of requests kept for latency statistics.
+            (default: :obj:`10000`)
+    """
+
+    grad_mode: Callable = torch.inference_mode
+
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        batch_size: int = 1024,
+        device: Optional[Union[str, torch.device]] = None,
+        window: int = 10000,
+    ):
+        if device is None:
+            param = next(chain(model.parameters(), model.buffers()), None)
+            device = param.device if param is not None else "cpu"
+        self.device = torch.device(device)
+        self.model = model.to(self.device).eval()
+        self.batch_size = batch_size
+        self.latency = LatencyTracker(window)
+        self._prepared = False
+        self._full_out = None
+        self._full_key = None
+
+    @property
+    def num_items(self) -> int:
+        r"""The number of rows or nodes that can be scored."""
+        raise NotImplementedError
+
+    def _prepare(self) -> None:
+        r"""Apply the transforms, called once before the first batch."""
+        pass
+
+    def _forward_batch(self, ids: Tensor) -> Tensor:
+        r"""The model outputs of a micro-batch of ids."""
+        raise NotImplementedError
+
+    def _forward_full(self) -> Optional[Tensor]:
+        r"""The model outputs of all ids in one pass, or None if the
+        runner scores micro-batches."""
+        return None
+
+    def clear_cache(self) -> None:
+        r"""Drop the transformed data and cached outputs, e.g. after the
+        underlying data changed."""
+        self._prepared = False
+        self._full_out = None
+        self._full_key = None
+
+    def _full_output(self) -> Optional[Tensor]:
+        # Reuse the full pass until the parameters change.
+        key = _fingerprint(self.model)
+        if self._full_out is None or self._full_key != key:
+            self._full_out = self._forward_full()
+            self._full_key = key
+        return self._full_out
+
+    def score(self, ids: IndexLike, output: str = "logits") -> Tensor:
+        r"""Score the given ids.
+
+        Args:
+            ids (Tensor or Sequence[int]): The row or node ids, or a
+                boolean mask over them.
+            output (str): See :func:`postprocess`. (default: :obj:`"logits"`)
+
+        Returns:
+            The scores on CPU, in the order of :obj:`ids`.
+        """
+        start = time.perf_counter()
+        ids = _as_index(ids)
+        if ids.numel() > 0 and (
+            int(ids.min()) < 0 or int(ids.max()) >= self.num_items
+        ):
+            raise IndexError(f"Ids must be in [0, {self.num_items}).")
+
+        with self.grad_mode():
+            if not self._prepared:
+                self._prepare()
+                self._prepared = True
+            full = self._full_output()
+            if full is not None:
+                out = full[ids.to(full.device)]
+            else:
+                outs = [
+                    self._forward_batch(batch)
+                    for batch in ids.split(self.batch_size)
+                ]
+                out = torch.cat(outs, dim=0) if len(outs) > 0 else None
+            if out is None:
+                out = torch.empty(0)
+            else:
+                out = postprocess(out, output).cpu()
+
+        self.latency.record(time.perf_counter() - start, ids.numel())
+        return out
+
+    def stats(self) -> Dict[str, float]:
+        r"""See :meth:`LatencyTracker.summary`."""
+        return self.latency.summary()
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        r"""Answer a JSON request `{"ids": [...], "output": "proba"}` with
+        `{"ids": [...], "scores": [...]}`, or `{"stats": true}` with
+        :meth:`stats`."""
+        if request.get("stats", False):
+            return {"stats": self.stats()}
+        if "ids" not in request:
+            raise ValueError("The request has no 'ids'.")
+        ids = _as_index(request["ids"])
+        scores = self.score(ids, output=request.get("output", "logits"))
+        return {"ids": ids.tolist(), "scores": scores.tolist()}
+
+
+def _feat_dict_batch(table: TableData, ids: Tensor) -> Dict:
+    return {col_type: feat[ids] for col_type, feat in table.feat_dict.items()}
+
+
+class TableRunner(InferenceRunner):
+    r"""Scores the rows of a :class:`~rllm.data.TableData` with a table
+    model, e.g. :class:`~rllm.nn.models.TabNet` or a model built on the
+    table convolutions.
+
+    Rows are gathered per micro-batch on CPU, so a memory-mapped table
+    saved in the columnar format is never loaded whole.
+
+    Args:
+        model (torch.nn.Module): The trained model.
+        table (TableData): The table, materialized.
+        transform (Callable, optional): A table transform, applied once.
+            (default: :obj:`None`)
+        input_fn (Callable, optional): Builds the model input from the
+            (transformed) table and a micro-batch of row ids.
+            (default: the `feat_dict` rows of the ids)
+        **kwargs: See :class:`InferenceRunner`.
+    """
+
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        table: TableData,
+        transform: Optional[Callable] = None,
+        input_fn: Optional[Callable[[TableData, Tensor], Any]] = None,
+        **kwargs,
+    ):
+        super().__init__(model, **kwargs)
+        self.raw_table = table
+        self.table = table
+        self.transform = transform
+        self.input_fn = _feat_dict_batch if input_fn is None else input_fn
+
+    @property
+    def num_items(self) -> int:
+        return len(self.raw_table)
+
+    def _prepare(self) -> None:
+        table = self.raw_table
+        if self.transform is not None:
+            table = self.transform(data=table)
+        self.table = table
+
+    def _forward_batch(self, ids: Tensor) -> Tensor:
+        x = _to_device(self.input_fn(self.table, ids), self.device)
+        return self.model(x)
+
+
+class GraphRunner(InferenceRunner):
+    r"""Scores the nodes of a :class:`~rllm.data.GraphData` with a GNN.
+
+    Without :obj:`num_neighbors`, the full graph goes through the model
+    once and later calls index the cached outputs. With it, each
+    micro-batch samples its k-hop neighborhood as
+    :class:`~rllm.dataloader.NeighborLoader` does, so the cost grows with
+    the number of scored nodes instead of the graph size.
+
+    Args:
+        model (torch.nn.Module): The trained model.
+        graph (GraphData): The graph.
+        num_neighbors (List[int], optional): The number of neighbors
+            sampled per hop. (default: :obj:`None`)
+        transform (Callable, optional): A graph transform, applied once.
+            (default: :obj:`None`)
+        adj_transform (Callable, optional): A transform applied to the
+            sampled adjacencies, see
+            :class:`~rllm.dataloader.NeighborLoader`. (default: :obj:`None`)
+        forward_fn (Callable, optional): Runs the model on node features
+            and the adjacency, a sparse tensor for the full graph or the
+            list of sampled ones. (default: `model(x, adj)`)
+        **kwargs: See :class:`InferenceRunner`.
+    """
+
+    # Sparse ops such as `adj.t()` fail on inference tensors in
+    # torch<=2.3, so graph models run under no_grad instead.
+    grad_mode = torch.no_grad
+
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        graph: GraphData,
+        num_neighbors: Optional[List[int]] = None,
+        transform: Optional[Callable] = None,
+        adj_transform: Optional[Callable] = None,
+        forward_fn: Optional[Callable] = None,
+        **kwargs,
+    ):
+        super().__init__(model, **kwargs)
+        self.raw_graph = graph
+        self.graph = graph
+        self.num_neighbors = num_neighbors
+        self.transform = transform
+        self.adj_transform = adj_transform
+        self.forward_fn = forward_fn
+        self.loader = None
+
+    @property
+    def num_items(self) -> int:
+        return self.raw_graph.num_nodes
+
+    def _forward(self, x: Tensor, adj: Union[Tensor, List[Tensor]]) -> Tensor:
+        if self.forward_fn is not None:
+            return self.forward_fn(self.model, x, adj)
+        return self.model(x, adj)
+
+    def _prepare(self) -> None:
+        graph = self.raw_graph
+        if self.transform is not None:
+            graph = self.transform(data=graph)
+        self.graph = graph
+        if self.num_neighbors is not None:
+            self.loader = NeighborLoader(
+                graph,
+                num_neighbors=self.num_neighbors,
+                transform=self.adj_transform,
+                batch_size=self.batch_size,
+            )
+
+    def _forward_full(self) -> Optional[Tensor]:
+        if self.num_neighbors is not None:
+            return None
+        x = self.graph.x.to(self.device)
+        adj = self.graph.adj.to(self.device)
+        return self._forward(x, adj)
+
+    def _forward_batch(self, ids: Tensor) -> Tensor:
+        batch_size, n_id, adjs = self.loader.collate_fn(ids.tolist())
+        x = self.graph.x[n_id.to(self.graph.x.device)].to(self.device)
+        adjs = _to_device(adjs, self.device)
+        return self._forward(x, adjs)[:batch_size]
+
+
+class BRIDGERunner(InferenceRunner):
+    r"""Scores the target table rows of a
+    :class:`~rllm.nn.models.BRIDGE` model.
+
+    Without :obj:`num_neighbors`, the whole table and graph go through
+    the model once and later calls index the cached outputs. With it,
+    each micro-batch samples its k-hop neighborhood as
+    :class:`~rllm.dataloader.BRIDGELoader` does.
+
+    Args:
+        model (torch.nn.Module): The trained model.
+        table (TableData): The target table, whose rows are the first
+            nodes of the graph.
+        graph (GraphData): The graph.
+        non_table (Tensor, optional): The features of the other nodes.
+            (default: :obj:`None`)
+        num_neighbors (List[int], optional): The number of neighbors
+            sampled per hop. (default: :obj:`None`)
+        table_transform (Callable, optional): A table transform, applied
+            once. (default: :obj:`None`)
+        graph_transform (Callable, optional): A graph transform, applied
+            once. (default: :obj:`None`)
+        **kwargs: See :class:`InferenceRunner`.
+    """
+
+    # Sparse ops such as `adj.t()` fail on inference tensors in
+    # torch<=2.3, so graph models run under no_grad instead.
+    grad_mode = torch.no_grad
+
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        table: TableData,
+        graph: GraphData,
+        non_table: Optional[Tensor] = None,
+        num_neighbors: Optional[List[int]] = None,
+        table_transform: Optional[Callable] = None,
+        graph_transform: Optional[Callable] = None,
+        **kwargs,
+    ):
+        super().__init__(model, **kwargs)
+        self.raw_table = table
+        self.raw_graph = graph
+        self.table = table
+        self.graph = graph
+        self.non_table = non_table
+        self.num_neighbors = num_neighbors
+        self.table_transform = table_transform
+        self.graph_transform = graph_transform
+        self.loader = None
+
+    @property
+    def num_items(self) -> int:
+        return len(self.raw_table)
+
+    def _prepare(self) -> None:
+        table, graph = self.raw_table, self.raw_graph
+        if self.table_transform is not None:
+            table = self.table_transform(data=table)
+        if self.graph_transform is not None:
+            graph = self.graph_transform(data=graph)
+        self.table, self.graph = table, graph
+        if self.num_neighbors is not None:
+            self.loader = BRIDGELoader(
+                table,
+                self.non_table,
+                graph,
+                num_samples=self.num_neighbors,
+                batch_size=self.batch_size,
+            )
+
+    def _forward_full(self) -> Optional[Tensor]:
+        if self.num_neighbors is not None:
+            return None
+        return self.model(
+            table=_to_device(self.table, self.device),
+            non_table=_to_device(self.non_table, self.device),
+            adj=self.graph.adj.to(self.device),
+        )
+
+    def _forward_batch(self, ids: Tensor) -> Tensor:
+        batch_size, _, adjs, table_data, non_table_data = self.loader.collate_fn(
+            ids.tolist()
+        )
+        out = self.model(
+            table=_to_device(table_data, self.device),
+            non_table=_to_device(non_table_data, self.device),
+            adj=_to_device(adjs, self.device),
+        )
+        return out[:batch_size]
@@ -0,0 +1,133 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, TextIO, Tuple
+
+from rllm.inference.runner import InferenceRunner
+
+
+# Raised by malformed requests, e.g. missing or out-of-range ids.
+_CLIENT_ERRORS = (ValueError, IndexError, TypeError, KeyError)
+
+
+def _answer(runner: InferenceRunner, request: Any) -> Tuple[int, Dict[str, Any]]:
+    r"""The HTTP status and the response of a request. Failures of the
+    model or the sampling are reported too, so one bad request never
+    stops the server."""
+    try:
+        if not isinstance(request, dict):
+            raise ValueError("A request should be a JSON object.")
+        return 200, runner.handle(request)
+    except _CLIENT_ERRORS as e:
+        return 400, {"error": str(e)}
+    except Exception as e:
+        return 500, {"error": f"{type(e).__name__}: {e}"}
+
+
+def serve_jsonl(
+    runner: InferenceRunner,
+    input: Optional[TextIO] = None,
+    output: Optional[TextIO] = None,
+) -> None:
+    r"""Serve a runner over JSON lines: every input line holds one request,
+    see :meth:`InferenceRunner.handle`, and gets one response line, or
+    `{"error": ...}` if it is malformed or the model fails. Returns at
+    the end of the input.
+
+    Args:
+        runner (InferenceRunner): The runner.
+        input (TextIO, optional): The requests. (default: `sys.stdin`)
+        output (TextIO, optional): The responses. (default: `sys.stdout`)
+    """
+    input = sys.stdin if input is None else input
+    output = sys.stdout if output is None else output
+    for line in input:
+        line = line.strip()
+        if len(line) == 0:
+            continue
+        try:
+            _, response = _answer(runner, json.loads(line))
+        except json.JSONDecodeError as e:
+            response = {"error": f"Invalid JSON: {e}"}
+        output.write(json.dumps(response) + "\n")
+        output.flush()
+
+
+def make_http_server(
+    runner: InferenceRunner,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+) -> ThreadingHTTPServer:
+    r"""Build a local HTTP server around a runner, with the endpoints:
+
+    - `POST /score`: a JSON request, see :meth:`InferenceRunner.handle`;
+    - `GET /stats`: the latency statistics;
+    - `GET /health`: `{"status": "ok"}`.
+
+    Malformed requests get status 400 and failures of the model status
+    500, both with a JSON `{"error": ...}` body.
+
+    Connections are handled in threads, but runner calls are serialized.
+
+    Args:
+        runner (InferenceRunner): The runner.
+        host (str): The address to bind. (default: :obj:`"127.0.0.1"`)
+        port (int): The port to bind, 0 for any free port.
+            (default: :obj:`8000`)
+    """
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, body: Dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "ok"})
+            elif self.path == "/stats":
+                with lock:
+                    self._send(200, runner.stats())
+            else:
+                self._send(404, {"error": f"Unknown path '{self.path}'."})
+
+        def do_POST(self):
+            if self.path != "/score":
+                self._send(404, {"error": f"Unknown path '{self.path}'."})
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                request = json.loads(self.rfile.read(length))
+            except json.JSONDecodeError as e:
+                self._send(400, {"error": f"Invalid JSON: {e}"})
+                return
+            with lock:
+                code, response = _answer(runner, request)
+            self._send(code, response)
+
+        def log_message(self, format, *args):
+            # Keep stdout and stderr free for the scores and real errors.
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def serve_http(
+    runner: InferenceRunner,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+) -> None:
+    r"""Serve a runner over HTTP until interrupted, see
+    :func:`make_http_server`."""
+    server = make_http_server(runner, host, port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -2,6 +2,9 @@ from .predictor import Predictor
 from .enhancer import Enhancer
 from .prompt.base import PromptTemplate, ChatPromptTemplate
 from .llm_module.langchain_llm import LangChainLLM
+from .llm_module.executor import BatchExecutor, TokenBucket
+from .llm_module.cache import BaseCache, InMemoryCache, SQLiteCache
+from .embedding import EmbeddingStore, embed_texts, texts_fingerprint
 from .parser.base import BaseOutputParser
 
 
@@ -11,5 +14,13 @@ __all__ = [
     'PromptTemplate',
     'ChatPromptTemplate',
     'LangChainLLM',
+    'BatchExecutor',
+    'TokenBucket',
+    'BaseCache',
+    'InMemoryCache',
+    'SQLiteCache',
+    'EmbeddingStore',
+    'embed_texts',
+    'texts_fingerprint',
     'BaseOutputParser'
 ]
@@ -0,0 +1,252 @@
+import asyncio
+import hashlib
+import json
+import os
+import os.path as osp
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from rllm.llm.llm_module.executor import BatchExecutor, estimate_tokens
+
+
+class EmbeddingStore:
+    r"""A resumable on-disk embedding matrix, stored as a memory-mapped
+    `.npy` file of shape `(num_rows, dim)`.
+
+    Rows are written as they arrive. A sidecar `<path>.done.npy` marks
+    the finished rows, so a crashed run resumes from where it stopped,
+    and is removed by :meth:`finalize`. The result is a plain `.npy`
+    file, e.g. the `embeddings.npy` read by
+    :class:`~rllm.datasets.TML1MDataset`.
+
+    With a `fingerprint` of the inputs, see :func:`texts_fingerprint`,
+    a sidecar `<path>.meta.json` records it, and a store built from other
+    inputs, finished or not, is discarded and rebuilt rather than reused.
+
+    Args:
+        path (str): The `.npy` file.
+        num_rows (int): The number of rows.
+        dtype (np.dtype): `np.float32` or `np.float16`.
+            Default is `np.float32`.
+        fingerprint (Optional[str]): Identifies the inputs of the rows.
+            Default is None, which trusts any existing store.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        num_rows: int,
+        dtype: Any = np.float32,
+        fingerprint: Optional[str] = None,
+    ):
+        self.path = path
+        self.done_path = path + ".done.npy"
+        self.meta_path = path + ".meta.json"
+        self.num_rows = num_rows
+        self.dtype = np.dtype(dtype)
+        self.data: Optional[np.memmap] = None
+
+        if fingerprint is not None and self._stale(num_rows, fingerprint):
+            # Embeddings of other texts or another model, start over.
+            for file in (self.path, self.done_path, self.meta_path):
+                if osp.exists(file):
+                    os.remove(file)
+
+        if osp.exists(self.done_path):
+            # Resume an unfinished run.
+            self.done = np.lib.format.open_memmap(self.done_path, mode="r+")
+            assert self.done.shape[0] == num_rows
+            if osp.exists(path):
+                self.data = np.lib.format.open_memmap(path, mode="r+")
+                assert self.data.dtype == self.dtype
+        elif osp.exists(path):
+            # A finished run.
+            self.data = np.load(path, mmap_mode="r")
+            assert self.data.shape[0] == num_rows
+            self.done = np.ones(num_rows, dtype=bool)
+        else:
+            os.makedirs(osp.dirname(osp.abspath(path)), exist_ok=True)
+            if fingerprint is not None:
+                with open(self.meta_path, "w") as f:
+                    json.dump({"num_rows": num_rows, "fingerprint": fingerprint}, f)
+            self.done = np.lib.format.open_memmap(
+                self.done_path, mode="w+", dtype=bool, shape=(num_rows,)
+            )
+
+    def _stale(self, num_rows: int, fingerprint: str) -> bool:
+        r"""Whether an existing store was built from other inputs. Stores
+        without a recorded fingerprint are trusted."""
+        if not osp.exists(self.meta_path):
+            return False
+        with open(self.meta_path) as f:
+            meta = json.load(f)
+        return (
+            meta.get("fingerprint") != fingerprint
+            or meta.get("num_rows") != num_rows
+        )
+
+    @property
+    def pending(self) -> np.ndarray:
+        r"""The rows not written yet."""
+        return np.flatnonzero(~self.done)
+
+    def write(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        r"""Write `vectors` of shape `(len(rows), dim)` to `rows`."""
+        vectors = np.asarray(vectors, dtype=self.dtype)
+        if self.data is None:
+            # The dimension is known from the first batch.
+            self.data = np.lib.format.open_memmap(
+                self.path,
+                mode="w+",
+                dtype=self.dtype,
+                shape=(self.num_rows, vectors.shape[1]),
+            )
+        self.data[rows] = vectors
+        self.done[rows] = True
+
+    def flush(self) -> None:
+        for array in (self.data, self.done):
+            if isinstance(array, np.memmap) and array.mode != "r":
+                array.flush()
+
+    def finalize(self) -> np.ndarray:
+        r"""Finish the store and return the embeddings, memory-mapped."""
+        assert self.done.all(), f"{(~self.done).sum()} rows are missing."
+        self.flush()
+        if self.data is None:
+            # No rows at all.
+            np.save(self.path, np.zeros((0, 0), dtype=self.dtype))
+        self.data = self.done = None
+        if osp.exists(self.done_path):
+            os.remove(self.done_path)
+        return np.load(self.path, mmap_mode="r")
+
+
+def texts_fingerprint(texts: Sequence[str], model: Any = None) -> str:
+    r"""A SHA-256 digest of `texts`, in order, and of `model`, e.g. the
+    `cache_namespace` of the embedding llm, so that
+    :class:`EmbeddingStore` only resumes runs over the same inputs."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(model, sort_keys=True, default=str).encode("utf-8"))
+    for text in texts:
+        data = text.encode("utf-8")
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def embed_texts(
+    llm_embed: Any,
+    texts: Sequence[str],
+    path: Optional[str] = None,
+    batch_size: int = 256,
+    executor: Optional[BatchExecutor] = None,
+    dtype: Any = np.float32,
+) -> np.ndarray:
+    r"""Embed `texts` in batches with an embedding llm, e.g.
+    :class:`~rllm.llm.LangChainLLM` over LangChain embeddings.
+
+    Identical texts are embedded once. Batches of `batch_size` unique
+    texts are sent concurrently by `executor`, and each result is written
+    to every row holding that text as soon as it arrives. With `path`,
+    rows go to a resumable :class:`EmbeddingStore`, so a rerun after a
+    crash only embeds the missing rows. A store built from other texts
+    or another model is rebuilt, see :func:`texts_fingerprint`.
+
+    Args:
+        llm_embed (Any): The embedding llm, with `embedding` and
+            optionally `aembedding` methods.
+        texts (Sequence[str]): The texts, one per row.
+        path (Optional[str]): The `.npy` file to write. If None, keep
+            the embeddings in memory.
+        batch_size (int): The number of unique texts per request.
+            Default is 256.
+        executor (Optional[BatchExecutor]): The scheduler handling
+            concurrency, rate limits and retries.
+        dtype (np.dtype): `np.float32` or `np.float16`.
+            Default is `np.float32`.
+
+    Returns:
+        np.ndarray: The embeddings of shape `(len(texts), dim)`.
+    """
+    executor = executor or BatchExecutor(max_concurrency=4)
+
+    # Dedup texts, keeping first-seen order.
+    index: Dict[str, int] = {}
+    inverse = np.fromiter(
+        (index.setdefault(text, len(index)) for text in texts),
+        dtype=np.int64,
+        count=len(texts),
+    )
+    uniq_texts = list(index.keys())
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.searchsorted(inverse[order], np.arange(len(uniq_texts) + 1))
+
+    if path is None:
+        store = _InMemoryStore(len(texts), dtype)
+    else:
+        fingerprint = texts_fingerprint(
+            texts, getattr(llm_embed, "cache_namespace", None)
+        )
+        store = EmbeddingStore(
+            path, len(texts), dtype=dtype, fingerprint=fingerprint
+        )
+
+    # A unique text is pending if its first row is.
+    first_rows = order[bounds[:-1]]
+    pending = np.flatnonzero(~store.done[first_rows])
+    batches = [
+        pending[i:i + batch_size] for i in range(0, len(pending), batch_size)
+    ]
+
+    aembedding = getattr(llm_embed, "aembedding", None)
+
+    async def embed_batch(batch: np.ndarray) -> None:
+        inputs = [uniq_texts[i] for i in batch]
+        if aembedding is not None:
+            vectors = await aembedding(inputs)
+        else:
+            vectors = await asyncio.to_thread(llm_embed.embedding, inputs)
+        vectors = np.asarray(vectors)
+        rows: List[np.ndarray] = []
+        repeats: List[int] = []
+        for i in batch:
+            rows.append(order[bounds[i]:bounds[i + 1]])
+            repeats.append(bounds[i + 1] - bounds[i])
+        store.write(np.concatenate(rows), np.repeat(vectors, repeats, axis=0))
+
+    try:
+        executor.run(
+            embed_batch,
+            batches,
+            cost_fn=lambda batch: sum(estimate_tokens(uniq_texts[i]) for i in batch),
+        )
+    finally:
+        store.flush()
+    return store.finalize()
+
+
+class _InMemoryStore:
+    r"""The in-memory counterpart of :class:`EmbeddingStore`."""
+
+    def __init__(self, num_rows: int, dtype: Any):
+        self.num_rows = num_rows
+        self.dtype = np.dtype(dtype)
+        self.data: Optional[np.ndarray] = None
+        self.done = np.zeros(num_rows, dtype=bool)
+
+    def write(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        if self.data is None:
+            self.data = np.empty((self.num_rows, vectors.shape[1]), dtype=self.dtype)
+        self.data[rows] = vectors
+        self.done[rows] = True
+
+    def flush(self) -> None:
+        pass
+
+    def finalize(self) -> np.ndarray:
+        assert self.done.all(), f"{(~self.done).sum()} rows are missing."
+        if self.data is None:
+            return np.zeros((0, 0), dtype=self.dtype)
+        return self.data
@@ -1,8 +1,8 @@
+import os.path as osp
 from typing import Any, List, Literal, Optional
 
 import numpy as np
 import pandas as pd
-from tqdm import tqdm
 
 from rllm.llm.prompt.default_prompt import DEFAULT_SCENARIO_EXPLANATION_TMPL
 from rllm.llm.prompt.utils import (
@@ -11,6 +11,8 @@ from rllm.llm.prompt.utils import (
 )
 
 from rllm.llm.llm_module.general_llm import LLM
+from rllm.llm.llm_module.executor import BatchExecutor
+from rllm.llm.embedding import embed_texts
 from rllm.llm.prompt.base import BasePromptTemplate
 
 
@@ -33,6 +35,22 @@ class Enhancer:
                 Literal['explanation|embedding', 'explanation', 'embedding']
             ]):
             Task type, default type is 'explanation|embedding'.
+        max_concurrency (int):
+            Maximum number of llm calls in flight, by default 8.
+        batch_size (int):
+            Maximum number of rows formatted ahead of the running calls,
+            by default 64.
+        executor (Optional[:class:`rllm.llm.BatchExecutor`]):
+            Scheduler with rate limits and retries. If given,
+            `max_concurrency` and `batch_size` are ignored.
+        embed_batch_size (int):
+            Number of unique texts per embedding request, by default 256.
+        embed_dir (Optional[str]):
+            Directory of resumable `<column>.npy` embedding files, see
+            :class:`rllm.llm.EmbeddingStore`. If None, embeddings are
+            kept in memory.
+        embed_dtype (np.dtype):
+            `np.float32` or `np.float16`, by default `np.float32`.
 
     Explanation|Embedding:
     .. code-block:: python
@@ -87,6 +105,12 @@ class Enhancer:
         type: Optional[
             Literal['explanation|embedding', 'explanation', 'embedding']
         ] = 'explanation|embedding',
+        max_concurrency: int = 8,
+        batch_size: int = 64,
+        executor: Optional[BatchExecutor] = None,
+        embed_batch_size: int = 256,
+        embed_dir: Optional[str] = None,
+        embed_dtype: Any = np.float32,
     ) -> None:
         # NOTE: Only support `PromptTemplate` so far!
         # NOTE: Only support `explanation` so far!
@@ -98,6 +122,14 @@ class Enhancer:
         assert type in ['explanation|embedding', 'explanation', 'embedding'], \
             "type error!"
         self.type = type
+        self.executor = executor or BatchExecutor(
+            max_concurrency=max_concurrency,
+            batch_size=batch_size,
+            show_progress=True,
+        )
+        self.embed_batch_size = embed_batch_size
+        self.embed_dir = embed_dir
+        self.embed_dtype = embed_dtype
 
         if 'explanation' in self.type:
             from rllm.llm.prompt.base import PromptTemplate
@@ -130,26 +162,34 @@ class Enhancer:
                     f"Variable '{var}' not found in input variables."
 
             # Make explanation, remeber `row` is a default argument.
-            outputs = []
-            for index, row in tqdm(df.iterrows(), total=len(df)):
-                outputs.append(
-                    self._llm.predict(self.prompt, row=row, **kwargs)
-                )
+            outputs = self._llm.batch_predict_table(
+                self.prompt, df, executor=self.executor, **kwargs
+            )
 
         if 'embedding' in self.type:
             if 'explanation' in self.type:
-                inputs = [outputs]
+                inputs = {'explanation': outputs}
             else:
                 # default target column is 'text'.
                 cols = kwargs['cols'] if 'cols' in kwargs else ['text']
-                inputs = [
-                    col.values.tolist() for col_name, col in df[cols].items()
-                ]
+                inputs = {
+                    col_name: col.tolist()
+                    for col_name, col in df[cols].items()
+                }
 
             outputs = []
-            for input in inputs:
-                embed = self._llm_embed.embedding(input)
-                outputs.append(np.array(embed))
+            for col_name, input in inputs.items():
+                path = None
+                if self.embed_dir is not None:
+                    path = osp.join(self.embed_dir, f"{col_name}.npy")
+                outputs.append(embed_texts(
+                    self._llm_embed,
+                    input,
+                    path=path,
+                    batch_size=self.embed_batch_size,
+                    executor=self.executor,
+                    dtype=self.embed_dtype,
+                ))
             outputs = outputs[0] if len(outputs) == 1 else outputs
 
         return outputs
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Sequence
 
@@ -74,3 +75,46 @@ class BaseLLM(ABC):
             ```
         """
         raise NotImplementedError
+
+    async def achat(
+        self, messages: Sequence[ChatMessage], **kwargs
+    ) -> ChatResponse:
+        """Async chat endpoint for LLM.
+
+        By default, runs :meth:`chat` in a worker thread. Subclasses with
+        a native async client should override it.
+
+        Args:
+            messages (Sequence[ChatMessage]):
+                Sequence of chat messages.
+            kwargs (Any):
+                Additional keyword arguments to pass to the LLM.
+
+        Returns:
+            ChatResponse: Chat response from the LLM.
+        """
+        return await asyncio.to_thread(self.chat, messages, **kwargs)
+
+    async def acomplete(
+        self, prompt: str, formatted: bool = False, **kwargs
+    ) -> CompletionResponse:
+        """Async completion endpoint for LLM.
+
+        By default, runs :meth:`complete` in a worker thread. Subclasses
+        with a native async client should override it.
+
+        Args:
+            prompt (str):
+                Prompt to send to the LLM.
+            formatted (bool, optional):
+                Whether the prompt is already formatted for the LLM,
+                by default False.
+            kwargs (Any):
+                Additional keyword arguments to pass to the LLM.
+
+        Returns:
+            CompletionResponse: Completion response from the LLM.
+        """
+        return await asyncio.to_thread(
+            self.complete, prompt, formatted=formatted, **kwargs
+        )
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def make_cache_key(namespace: Dict[str, Any], kind: str, inputs: Any, **params) -> str:
+    """Hash everything that determines an LLM response into a key.
+
+    Args:
+        namespace (Dict[str, Any]):
+            The model identity, e.g. model name and decoding params.
+        kind (str):
+            The endpoint, e.g. `"chat"`, `"complete"` or `"embedding"`.
+        inputs (Any):
+            The fully formatted prompt, messages or text.
+        params (Any):
+            The call-time keyword arguments.
+    """
+    payload = json.dumps(
+        {"namespace": namespace, "kind": kind, "inputs": inputs, "params": params},
+        sort_keys=True,
+        default=str,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BaseCache(ABC):
+    """Key-value cache of LLM responses with hit/miss counters.
+
+    Values must be JSON-serializable.
+
+    Args:
+        max_size (Optional[int]):
+            Maximum number of entries, the least recently used are evicted
+            first, by default None (unbounded).
+        ttl (Optional[float]):
+            Seconds an entry stays valid, by default None (forever).
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss."""
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._set(key, value)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class InMemoryCache(BaseCache):
+    """In-process LRU cache.
+
+    Examples:
+        ```python
+        llm = LangChainLLM(OpenAI(...), cache=InMemoryCache(max_size=10000))
+        ```
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[float] = None):
+        super().__init__(max_size=max_size, ttl=ttl)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, created = item
+            if self._expired(created):
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            if self.max_size is not None:
+                while len(self._data) > self.max_size:
+                    self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache(BaseCache):
+    """On-disk cache in a SQLite file, which survives reruns and crashes.
+
+    Args:
+        path (str):
+            The database file, created if missing.
+        max_size (Optional[int]):
+            Maximum number of entries, by default None (unbounded).
+        ttl (Optional[float]):
+            Seconds an entry stays valid, by default None (forever).
+
+    Examples:
+        ```python
+        llm = LangChainLLM(OpenAI(...), cache=SQLiteCache("llm_cache.db"))
+        ```
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        super().__init__(max_size=max_size, ttl=ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        # Async LLM calls may hit the cache from worker threads.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT, "
+                "created REAL, accessed REAL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)"
+            )
+
+    def _get(self, key: str) -> Optional[Any]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1]):
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE cache SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+        return json.loads(row[0])
+
+    def _set(self, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            if self.max_size is not None:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache "
+                    "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_size,),
+                )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
@@ -0,0 +1,228 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from tqdm import tqdm
+
+from rllm.llm.types import ChatMessage
+
+
+def estimate_tokens(inputs: Union[str, Sequence[ChatMessage]]) -> int:
+    """Roughly estimate the number of tokens of a prompt or messages,
+    with about four characters per token."""
+    if not isinstance(inputs, str):
+        inputs = "\n".join(str(message.content or "") for message in inputs)
+    return len(inputs) // 4 + 1
+
+
+class TokenBucket:
+    """An asyncio token bucket.
+
+    The bucket refills at `rate` units per second up to `capacity`. A
+    request waits until the bucket holds `min(amount, capacity)` units,
+    then takes all `amount`, possibly going into debt, so that requests
+    larger than the bucket still pass and are paid back by later ones.
+
+    Args:
+        rate (float):
+            Refill rate, in units per second.
+        capacity (Optional[float]):
+            Maximum burst size, by default one second of refill.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        assert rate > 0, "rate must be positive."
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    @classmethod
+    def per_minute(cls, limit: Optional[float]) -> Optional["TokenBucket"]:
+        return None if limit is None else cls(limit / 60.0)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(
+            self.capacity, self.level + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        need = min(amount, self.capacity)
+        while True:
+            self._refill()
+            # No await between the check and the update, so concurrent
+            # tasks on one event loop cannot overdraw the bucket.
+            if self.level >= need:
+                self.level -= amount
+                return
+            await asyncio.sleep((need - self.level) / self.rate)
+
+
+class BatchExecutor:
+    """Bounded-concurrency scheduler for LLM calls.
+
+    Runs an async function over many items with at most
+    `max_concurrency` calls in flight, optional token-bucket limits on
+    requests and tokens per minute, and retries with exponential
+    backoff. Results are returned in input order.
+
+    Args:
+        max_concurrency (int):
+            Maximum number of calls in flight, by default 8.
+        batch_size (int):
+            Maximum number of items taken from the input and scheduled
+            ahead of the running calls, by default 64. Bounds the memory
+            of prepared prompts when the input is a generator.
+        requests_per_minute (Optional[float]):
+            Request rate limit, by default None (unlimited).
+        tokens_per_minute (Optional[float]):
+            Token rate limit, by default None (unlimited). The cost of an
+            item is given by `cost_fn` of :meth:`arun`.
+        max_retries (int):
+            Number of retries of a failed call, by default 3.
+        backoff (float):
+            Initial retry delay in seconds, doubled on every retry,
+            by default 1.0.
+        max_backoff (float):
+            Maximum retry delay in seconds, by default 60.0.
+        retry_on (Tuple[Type[BaseException], ...]):
+            Exceptions to retry on, by default all exceptions.
+        show_progress (bool):
+            Whether to show a progress bar, by default False.
+
+    Examples:
+        ```python
+        executor = BatchExecutor(max_concurrency=16, requests_per_minute=500)
+        outputs = executor.run(llm.acomplete, prompts)
+        ```
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        batch_size: int = 64,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+        show_progress: bool = False,
+    ):
+        assert max_concurrency > 0 and batch_size > 0
+        self.max_concurrency = max_concurrency
+        self.batch_size = max(batch_size, max_concurrency)
+        self.request_bucket = TokenBucket.per_minute(requests_per_minute)
+        self.token_bucket = TokenBucket.per_minute(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_on = retry_on
+        self.show_progress = show_progress
+
+    async def _call(
+        self,
+        fn: Callable[[Any], Awaitable[Any]],
+        item: Any,
+        cost: int,
+        semaphore: asyncio.Semaphore,
+    ) -> Any:
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                if self.request_bucket is not None:
+                    await self.request_bucket.acquire(1)
+                if self.token_bucket is not None:
+                    await self.token_bucket.acquire(cost)
+                try:
+                    return await fn(item)
+                except self.retry_on:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+                    await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    async def arun(
+        self,
+        fn: Callable[[Any], Awaitable[Any]],
+        items: Iterable[Any],
+        cost_fn: Optional[Callable[[Any], int]] = None,
+        total: Optional[int] = None,
+    ) -> List[Any]:
+        """Run `fn` over `items` and return the results in order.
+
+        Args:
+            fn (Callable[[Any], Awaitable[Any]]):
+                The async function to call on each item.
+            items (Iterable[Any]):
+                The inputs, consumed lazily.
+            cost_fn (Optional[Callable[[Any], int]]):
+                The token cost of an item for `tokens_per_minute`,
+                by default :func:`estimate_tokens` of the item.
+            total (Optional[int]):
+                The number of items, for the progress bar.
+        """
+        cost_fn = cost_fn or estimate_tokens
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = {}
+        pending = {}
+
+        if total is None and hasattr(items, "__len__"):
+            total = len(items)
+        pbar = tqdm(total=total, disable=not self.show_progress)
+
+        async def drain(return_when):
+            done, _ = await asyncio.wait(pending, return_when=return_when)
+            for task in done:
+                # Raise the first error, cancelling the other calls.
+                results[pending.pop(task)] = task.result()
+            pbar.update(len(done))
+
+        try:
+            for index, item in enumerate(items):
+                cost = cost_fn(item) if self.token_bucket is not None else 0
+                task = asyncio.ensure_future(
+                    self._call(fn, item, cost, semaphore)
+                )
+                pending[task] = index
+                if len(pending) >= self.batch_size:
+                    await drain(asyncio.FIRST_COMPLETED)
+            if pending:
+                await drain(asyncio.ALL_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+            pbar.close()
+
+        return [results[index] for index in range(len(results))]
+
+    def run(
+        self,
+        fn: Callable[[Any], Awaitable[Any]],
+        items: Iterable[Any],
+        cost_fn: Optional[Callable[[Any], int]] = None,
+        total: Optional[int] = None,
+    ) -> List[Any]:
+        """Synchronous :meth:`arun`. Inside a running event loop,
+        e.g. a notebook, the work runs on a fresh loop in a thread."""
+        coro = self.arun(fn, items, cost_fn=cost_fn, total=total)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, coro).result()
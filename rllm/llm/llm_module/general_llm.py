@@ -1,19 +1,27 @@
 from typing import (
     Any,
+    Dict,
+    Iterable,
     List,
     Optional,
     Protocol,
     Sequence,
+    Tuple,
+    Union,
     runtime_checkable
 )
 
+from pandas import DataFrame
+
 from rllm.llm.types import (
     ChatMessage,
     MessageRole,
 )
-from rllm.llm.prompt.base import BasePromptTemplate
-from rllm.llm.prompt.utils import messages_to_prompt
+from rllm.llm.prompt.base import BasePromptTemplate, PromptTemplate
+from rllm.llm.prompt.utils import messages_to_prompt, prompt_to_messages
 from rllm.llm.llm_module.base import BaseLLM
+from rllm.llm.llm_module.cache import BaseCache, make_cache_key
+from rllm.llm.llm_module.executor import BatchExecutor
 from rllm.llm.parser.base import BaseOutputParser
 
 
@@ -51,6 +59,9 @@ class LLM(BaseLLM):
         output_parser (Optional[BaseOutputParser]):
             Output parser to parse, validate,
             and correct errors programmatically.
+        cache (Optional[BaseCache]):
+            Response cache, keyed by :attr:`cache_namespace`, the formatted
+            prompt or messages and the call arguments.
     """
     def __init__(
         self,
@@ -58,6 +69,7 @@ class LLM(BaseLLM):
         messages_to_prompt: Optional[MessagesToPromptType] = None,
         completion_to_prompt: Optional[CompletionToPromptType] = None,
         output_parser: Optional[BaseOutputParser] = None,
+        cache: Optional[BaseCache] = None,
     ):
         super().__init__()
         self.system_prompt = system_prompt
@@ -66,6 +78,34 @@ class LLM(BaseLLM):
         self.completion_to_prompt = \
             completion_to_prompt or default_completion_to_prompt
         self.output_parser = output_parser
+        self.cache = cache
+
+    @property
+    def cache_namespace(self) -> Dict[str, Any]:
+        """The identity of the model in cache keys."""
+        return {"class": self.__class__.__name__, **vars(self.metadata)}
+
+    def _cache_lookup(
+        self,
+        kind: str,
+        inputs: Union[str, Sequence[str], Sequence[ChatMessage]],
+        params: Dict[str, Any],
+    ) -> Tuple[Optional[str], Optional[Any]]:
+        """Return the cache key and the cached value, if any."""
+        if self.cache is None:
+            return None, None
+        if not isinstance(inputs, str):
+            inputs = [
+                [m.role.value, m.content, m.additional_kwargs]
+                if isinstance(m, ChatMessage) else m
+                for m in inputs
+            ]
+        key = make_cache_key(self.cache_namespace, kind, inputs, **params)
+        return key, self.cache.get(key)
+
+    def _cache_store(self, key: Optional[str], value: Any) -> None:
+        if key is not None:
+            self.cache.set(key, value)
 
     def _get_prompt(
         self,
@@ -78,16 +118,20 @@ class LLM(BaseLLM):
             completion_to_prompt=self.completion_to_prompt,
             **prompt_args,
         )
-        if self.output_parser is not None:
-            formatted_prompt = self.output_parser.format(formatted_prompt)
-        # print(self._extend_prompt(formatted_prompt))
-        # exit(0)
-        return self._extend_prompt(formatted_prompt)
+        return self._finish_prompt(formatted_prompt)
 
     def _get_messages(
         self, prompt: BasePromptTemplate, **prompt_args: Any
     ) -> List[ChatMessage]:
         messages = prompt.format_messages(llm=self, **prompt_args)
+        return self._finish_messages(messages)
+
+    def _finish_prompt(self, formatted_prompt: str) -> str:
+        if self.output_parser is not None:
+            formatted_prompt = self.output_parser.format(formatted_prompt)
+        return self._extend_prompt(formatted_prompt)
+
+    def _finish_messages(self, messages: List[ChatMessage]) -> List[ChatMessage]:
         if self.output_parser is not None:
             messages = self.output_parser.format_messages(messages)
         return self._extend_messages(messages)
@@ -126,6 +170,17 @@ class LLM(BaseLLM):
         return messages
 
     # -- Prompt Predict --
+    def _prepare(
+        self,
+        prompt: BasePromptTemplate,
+        **prompt_args: Any,
+    ) -> Union[str, List[ChatMessage]]:
+        """Format the messages of a chat model,
+        or the prompt of a completion model."""
+        if self.metadata.is_chat_model:
+            return self._get_messages(prompt, **prompt_args)
+        return self._get_prompt(prompt, **prompt_args)
+
     def predict(
         self,
         prompt: BasePromptTemplate,
@@ -153,13 +208,121 @@ class LLM(BaseLLM):
             print(output)
             ```
         """
-        if self.metadata.is_chat_model:
-            messages = self._get_messages(prompt, **prompt_args)
-            chat_response = self.chat(messages)
-            output = chat_response.message.content or ""
-        else:
-            formatted_prompt = self._get_prompt(prompt, **prompt_args)
-            response = self.complete(formatted_prompt, formatted=True)
+        inputs = self._prepare(prompt, **prompt_args)
+        if isinstance(inputs, str):
+            response = self.complete(inputs, formatted=True)
             output = response.text
+        else:
+            chat_response = self.chat(inputs)
+            output = chat_response.message.content or ""
         parsed_output = self._parse_output(output)
         return parsed_output
+
+    async def _apredict_prepared(
+        self,
+        inputs: Union[str, List[ChatMessage]],
+    ) -> str:
+        if isinstance(inputs, str):
+            response = await self.acomplete(inputs, formatted=True)
+            output = response.text
+        else:
+            chat_response = await self.achat(inputs)
+            output = chat_response.message.content or ""
+        return self._parse_output(output)
+
+    async def apredict(
+        self,
+        prompt: BasePromptTemplate,
+        **prompt_args: Any,
+    ) -> str:
+        """Async version of :meth:`predict`."""
+        return await self._apredict_prepared(self._prepare(prompt, **prompt_args))
+
+    def batch_predict(
+        self,
+        prompt: BasePromptTemplate,
+        prompt_args_list: Iterable[Dict[str, Any]],
+        executor: Optional[BatchExecutor] = None,
+        total: Optional[int] = None,
+    ) -> List[str]:
+        """Predict for many sets of prompt arguments concurrently.
+
+        Prompts are formatted lazily, at most `executor.batch_size` ahead
+        of the running calls, and outputs are returned in input order.
+
+        Args:
+            prompt (BasePromptTemplate):
+                The prompt to use for prediction.
+            prompt_args_list (Iterable[Dict[str, Any]]):
+                The arguments to format the prompt with, one per call.
+            executor (Optional[BatchExecutor]):
+                The scheduler handling concurrency, rate limits and
+                retries, by default `BatchExecutor()`.
+            total (Optional[int]):
+                The number of calls, for the progress bar.
+
+        Returns:
+            List[str]: The prediction outputs.
+
+        Examples:
+            ```python
+            executor = BatchExecutor(max_concurrency=16)
+            outputs = llm.batch_predict(
+                prompt, [{"topic": "cats"}, {"topic": "dogs"}], executor
+            )
+            ```
+        """
+        executor = executor or BatchExecutor()
+        inputs = (self._prepare(prompt, **args) for args in prompt_args_list)
+        return executor.run(self._apredict_prepared, inputs, total=total)
+
+    def batch_predict_table(
+        self,
+        prompt: BasePromptTemplate,
+        df: DataFrame,
+        executor: Optional[BatchExecutor] = None,
+        **prompt_args: Any,
+    ) -> List[str]:
+        """Predict for every row of `df`, formatting the prompt with
+        `row=row` and `prompt_args`.
+
+        A :class:`PromptTemplate` renders the rows column-wise by
+        :meth:`PromptTemplate.format_batch`, as a stream consumed by the
+        executor. Other templates fall back to :meth:`batch_predict`.
+
+        Args:
+            prompt (BasePromptTemplate):
+                The prompt to use for prediction.
+            df (DataFrame):
+                The table, one call per row.
+            executor (Optional[BatchExecutor]):
+                The scheduler, by default `BatchExecutor()`.
+            prompt_args (Any):
+                Additional arguments to format the prompt with.
+
+        Returns:
+            List[str]: The prediction outputs, in row order.
+        """
+        if not isinstance(prompt, PromptTemplate):
+            return self.batch_predict(
+                prompt,
+                ({"row": row, **prompt_args} for _, row in df.iterrows()),
+                executor=executor,
+                total=len(df),
+            )
+
+        executor = executor or BatchExecutor()
+        is_chat_model = self.metadata.is_chat_model
+        texts = prompt.format_batch(
+            df,
+            batch_size=executor.batch_size,
+            completion_to_prompt=(
+                None if is_chat_model else self.completion_to_prompt
+            ),
+            **prompt_args,
+        )
+        if is_chat_model:
+            inputs = (self._finish_messages(prompt_to_messages(t)) for t in texts)
+        else:
+            inputs = (self._finish_prompt(t) for t in texts)
+        return executor.run(self._apredict_prepared, inputs, total=len(df))
@@ -1,4 +1,4 @@
-from typing import Callable, Optional, Sequence
+from typing import Any, Callable, Dict, Optional, Sequence
 
 from rllm.llm.types import (
     LLMMetadata,
@@ -6,6 +6,7 @@ from rllm.llm.types import (
     ChatResponse,
     CompletionResponse,
 )
+from rllm.llm.llm_module.cache import BaseCache
 from rllm.llm.llm_module.general_llm import LLM
 from rllm.llm.parser.base import BaseOutputParser
 from rllm.llm.prompt.utils import completion_response_to_chat_response
@@ -37,6 +38,7 @@ class LangChainLLM(LLM):
         messages_to_prompt: Optional[Callable[[Sequence[ChatMessage]], str]] = None,
         completion_to_prompt: Optional[Callable[[str], str]] = None,
         output_parser: Optional[BaseOutputParser] = None,
+        cache: Optional[BaseCache] = None,
     ) -> None:
         self._llm = llm
         super().__init__(
@@ -44,6 +46,7 @@ class LangChainLLM(LLM):
             messages_to_prompt=messages_to_prompt,
             completion_to_prompt=completion_to_prompt,
             output_parser=output_parser,
+            cache=cache,
         )
 
     @classmethod
@@ -60,6 +63,18 @@ class LangChainLLM(LLM):
 
         return get_llm_metadata(self._llm)
 
+    @property
+    def cache_namespace(self) -> Dict[str, Any]:
+        # Embedding models have no metadata, use the LangChain params.
+        params = getattr(self._llm, "_identifying_params", None)
+        if params is None:
+            params = {
+                key: getattr(self._llm, key)
+                for key in ("model", "model_name")
+                if hasattr(self._llm, key)
+            }
+        return {"class": type(self._llm).__name__, **params}
+
     def chat(self, messages: Sequence[ChatMessage], **kwargs) -> ChatResponse:
         from rllm.llm.llm_module.langchain_utils import (
             from_lc_messages,
@@ -71,9 +86,14 @@ class LangChainLLM(LLM):
             completion_response = self.complete(prompt, formatted=True, **kwargs)
             return completion_response_to_chat_response(completion_response)
 
+        key, cached = self._cache_lookup("chat", messages, kwargs)
+        if cached is not None:
+            return ChatResponse(message=ChatMessage(**cached))
+
         lc_messages = to_lc_messages(messages)
         lc_message = self._llm.predict_messages(messages=lc_messages, **kwargs)
         message = from_lc_messages([lc_message])[0]
+        self._cache_store(key, _message_to_dict(message))
         return ChatResponse(message=message)
 
     def complete(
@@ -82,7 +102,53 @@ class LangChainLLM(LLM):
         if not formatted:
             prompt = self.completion_to_prompt(prompt)
 
+        key, cached = self._cache_lookup("complete", prompt, kwargs)
+        if cached is not None:
+            return CompletionResponse(text=cached)
+
         output_str = self._llm.predict(prompt, **kwargs)
+        self._cache_store(key, output_str)
+        return CompletionResponse(text=output_str)
+
+    async def achat(
+        self, messages: Sequence[ChatMessage], **kwargs
+    ) -> ChatResponse:
+        from rllm.llm.llm_module.langchain_utils import (
+            from_lc_messages,
+            to_lc_messages,
+        )
+
+        if not self.metadata.is_chat_model:
+            prompt = self.messages_to_prompt(messages)
+            completion_response = await self.acomplete(
+                prompt, formatted=True, **kwargs
+            )
+            return completion_response_to_chat_response(completion_response)
+
+        key, cached = self._cache_lookup("chat", messages, kwargs)
+        if cached is not None:
+            return ChatResponse(message=ChatMessage(**cached))
+
+        lc_messages = to_lc_messages(messages)
+        lc_message = await self._llm.apredict_messages(
+            messages=lc_messages, **kwargs
+        )
+        message = from_lc_messages([lc_message])[0]
+        self._cache_store(key, _message_to_dict(message))
+        return ChatResponse(message=message)
+
+    async def acomplete(
+        self, prompt: str, formatted: bool = False, **kwargs
+    ) -> CompletionResponse:
+        if not formatted:
+            prompt = self.completion_to_prompt(prompt)
+
+        key, cached = self._cache_lookup("complete", prompt, kwargs)
+        if cached is not None:
+            return CompletionResponse(text=cached)
+
+        output_str = await self._llm.apredict(prompt, **kwargs)
+        self._cache_store(key, output_str)
         return CompletionResponse(text=output_str)
 
     def embedding(self, inputs):
@@ -92,4 +158,41 @@ class LangChainLLM(LLM):
         )  # noqa
         if isinstance(inputs, str):
             inputs = [inputs]
-        return self._llm.embed_documents(inputs)
+        lookups, outputs, missing = self._embedding_lookup(inputs)
+        if len(missing) > 0:
+            embeds = self._llm.embed_documents([inputs[i] for i in missing])
+            self._embedding_store(lookups, outputs, missing, embeds)
+        return outputs
+
+    async def aembedding(self, inputs):
+        assert hasattr(self._llm, "aembed_documents"), (
+            "An embedding model should be provided!"
+            "See https://python.langchain.com/v0.1/docs/integrations/text_embedding/"
+        )  # noqa
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        lookups, outputs, missing = self._embedding_lookup(inputs)
+        if len(missing) > 0:
+            embeds = await self._llm.aembed_documents([inputs[i] for i in missing])
+            self._embedding_store(lookups, outputs, missing, embeds)
+        return outputs
+
+    def _embedding_lookup(self, inputs):
+        # Only embed the texts missing from the cache.
+        lookups = [self._cache_lookup("embedding", text, {}) for text in inputs]
+        outputs = [cached for _, cached in lookups]
+        missing = [i for i, cached in enumerate(outputs) if cached is None]
+        return lookups, outputs, missing
+
+    def _embedding_store(self, lookups, outputs, missing, embeds):
+        for i, embed in zip(missing, embeds):
+            outputs[i] = list(embed)
+            self._cache_store(lookups[i][0], outputs[i])
+
+
+def _message_to_dict(message: ChatMessage) -> Dict[str, Any]:
+    return {
+        "role": message.role.value,
+        "content": message.content,
+        "additional_kwargs": message.additional_kwargs,
+    }
@@ -1,7 +1,6 @@
 from typing import Any, List, Literal, Optional
 
 import pandas as pd
-from tqdm import tqdm
 
 from rllm.llm.prompt.default_prompt import (
     DEFAULT_SCENARIO_CLASSIFICATION_TMPL,
@@ -14,6 +13,7 @@ from rllm.llm.prompt.utils import (
 
 
 from rllm.llm.llm_module.general_llm import LLM
+from rllm.llm.llm_module.executor import BatchExecutor
 from rllm.llm.prompt.base import BasePromptTemplate
 from rllm.llm.prompt.base import PromptTemplate
 
@@ -31,6 +31,14 @@ class Predictor:
             to be initialized with LangChain.
         type (Optional[Literal['classification', 'regression']] ):
             Task type.
+        max_concurrency (int):
+            Maximum number of llm calls in flight, by default 8.
+        batch_size (int):
+            Maximum number of rows formatted ahead of the running calls,
+            by default 64.
+        executor (Optional[:class:`rllm.llm.BatchExecutor`]):
+            Scheduler with rate limits and retries. If given,
+            `max_concurrency` and `batch_size` are ignored.
 
     .. code-block:: python
 
@@ -52,9 +60,17 @@ class Predictor:
         prompt: Optional[BasePromptTemplate] = None,
         llm: LLM = None,
         type: Optional[Literal['classification', 'regression']] = None,
+        max_concurrency: int = 8,
+        batch_size: int = 64,
+        executor: Optional[BatchExecutor] = None,
     ) -> None:
         # NOTE: Only support `PromptTemplate` so far
         self._llm = llm
+        self.executor = executor or BatchExecutor(
+            max_concurrency=max_concurrency,
+            batch_size=batch_size,
+            show_progress=True,
+        )
 
         if prompt is None:
             assert type in ['classification', 'regression'], \
@@ -91,11 +107,9 @@ class Predictor:
                 f"Variable '{var}' not found in input variables."
 
         # Make prediction, remeber `row` is a default argument.
-        outputs = []
-        for index, row in tqdm(df.iterrows(), total=len(df)):
-            outputs.append(self._llm.predict(self.prompt, row=row, **kwargs))
-
-        return outputs
+        return self._llm.batch_predict_table(
+            self.prompt, df, executor=self.executor, **kwargs
+        )
 
     def __call__(
         self,
@@ -1,11 +1,18 @@
 from abc import ABC, abstractmethod
 from copy import deepcopy
-from typing import Any, List, Dict, Union, Tuple, Sequence, Callable, Optional
+from string import Formatter
+from typing import (
+    Any, List, Dict, Union, Tuple, Sequence, Callable, Optional, Iterator
+)
+
+import numpy as np
+from pandas import DataFrame
 
 from rllm.llm.types import ChatMessage
 from rllm.llm.parser.base import BaseOutputParser
 from rllm.llm.prompt.utils import (
     get_template_vars,
+    parse_template,
     prompt_to_messages,
     messages_to_prompt,
 )
@@ -16,6 +23,10 @@ from rllm.llm.llm_module.base import BaseLLM
 default_messages_to_prompt = messages_to_prompt
 
 
+class _RowValues(list):
+    """Values of a template variable, one per row."""
+
+
 class BasePromptTemplate(ABC):
     def __init__(
         self,
@@ -160,6 +171,89 @@ class PromptTemplate(BasePromptTemplate):
 
         return prompt
 
+    def format_batch(
+        self,
+        df: DataFrame,
+        batch_size: int = 1024,
+        completion_to_prompt: Optional[Callable[[str], str]] = None,
+        **kwargs,
+    ) -> Iterator[str]:
+        """Format the prompt for every row of `df`, as
+        `format(row=row, **kwargs)` would, and yield the prompts in order.
+
+        The template is parsed once, fixed variables are rendered once,
+        and rows are rendered column-wise, `batch_size` rows at a time.
+        A function in `function_mappings` is called once per chunk if it
+        has a `batch` attribute taking the chunk and the kwargs and
+        returning one value per row, e.g.
+        :func:`~rllm.llm.prompt.utils.generate_sample_description`.
+        Otherwise it is called once per row.
+        """
+        all_kwargs = {
+            **self.kwargs,
+            **kwargs,
+        }
+        formatter = Formatter()
+        for start in range(0, len(df), batch_size):
+            chunk = df.iloc[start:start + batch_size]
+            mapped_kwargs = self._map_template_vars(
+                self._map_batch_function_vars(chunk, all_kwargs)
+            )
+
+            prompts = np.full(len(chunk), "", dtype=object)
+            literal = ""
+            for literal_text, field_name, format_spec, conversion in \
+                    parse_template(self.template):
+                literal += literal_text
+                if field_name is None:
+                    continue
+                root = field_name.split(".", 1)[0].split("[", 1)[0]
+                value = mapped_kwargs[root]
+
+                def render(v: Any) -> str:
+                    v = formatter.get_field(field_name, (), {root: v})[0]
+                    v = formatter.convert_field(v, conversion)
+                    return formatter.format_field(v, format_spec or "")
+
+                if isinstance(value, _RowValues):
+                    # Per-row values, concatenated as object arrays.
+                    if field_name == root and not format_spec and not conversion:
+                        values = [str(v) for v in value]
+                    else:
+                        values = [render(v) for v in value]
+                    prompts = prompts + literal + np.array(values, dtype=object)
+                    literal = ""
+                else:
+                    literal += render(value)
+            prompts = prompts + literal
+
+            for prompt in prompts:
+                if self.output_parser is not None:
+                    prompt = self.output_parser.format(prompt)
+                if completion_to_prompt is not None:
+                    prompt = completion_to_prompt(prompt)
+                yield prompt
+
+    def _map_batch_function_vars(
+        self, df: DataFrame, kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Chunk version of `_map_function_vars`, where function values
+        are `_RowValues` with one value per row of `df`."""
+        new_kwargs = {}
+        for k, v in (self.function_mappings or {}).items():
+            batch_fn = getattr(v, "batch", None)
+            if batch_fn is not None:
+                values = batch_fn(df, **kwargs)
+            else:
+                values = [v(row=row, **kwargs) for _, row in df.iterrows()]
+            new_kwargs[k] = _RowValues(values)
+
+        for k, v in kwargs.items():
+            if k not in new_kwargs:
+                new_kwargs[k] = v
+
+        return new_kwargs
+
     def format_messages(
         self, llm: Optional[BaseLLM] = None, **kwargs
     ) -> List[ChatMessage]:
@@ -8,6 +8,7 @@ import torch.nn.init as init
 
 from rllm.transforms.graph_transforms import GCNNorm
 from rllm.nn.conv.graph_conv import MessagePassing
+from rllm.utils.sparse import is_torch_sparse_tensor
 
 
 class GCNConv(MessagePassing):
@@ -79,7 +80,7 @@ class GCNConv(MessagePassing):
         dim_size: Optional[int] = None,
     ) -> Tensor:
         if self.normalize:
-            assert edge_index.is_sparse, (
+            assert is_torch_sparse_tensor(edge_index), (
                 "GCNorm only support sparse adj matrix as input. "
                 "Please set `normalize=False` to use dense adj matrix."
             )
@@ -149,6 +149,9 @@ class HGTConv(MessagePassing):
 
             # meta-relation attention
             edge_index, _ = self.__unify_edgeindex__(edge_index)
+            if edge_index.size(1) == 0:
+                # e.g. an empty relation of a sampled subgraph
+                continue
             src_index, dst_index = edge_index
 
             # q, k, v
@@ -173,8 +176,14 @@ class HGTConv(MessagePassing):
         # out
         for node_type, outs in out_dict.items():
             # node type aggregation
-            outs = torch.stack(outs)  # (k, N, out_dim)
-            out = torch.sum(outs, dim=0, keepdim=False)  # (N, out_dim)
+            if len(outs) == 0:
+                # no messages, sum aggregation of an empty set
+                out = out_node_dict[node_type].new_zeros(
+                    (out_node_dict[node_type].size(0), self.out_dim)
+                )
+            else:
+                outs = torch.stack(outs)  # (k, N, out_dim)
+                out = torch.sum(outs, dim=0, keepdim=False)  # (N, out_dim)
 
             # FFN
             out = self.a_lin[node_type](out)
@@ -191,7 +200,7 @@ class HGTConv(MessagePassing):
         # alpha: (E, H)
         alpha = (k_src * q_dst).sum(dim=-1) * rel
         alpha = alpha / math.sqrt(q_dst.size(-1))
-        alpha = self.dropout(seg_softmax(alpha, edge_index[1], edge_index[1].max().item() + 1))
+        alpha = self.dropout(seg_softmax(alpha, edge_index[1], dim_size))
         # out: (E, H, D)
         out = v_src * alpha.unsqueeze(-1)
         out = out.view(-1, self.out_dim)  # (E, out_dim[H*D])
@@ -105,11 +105,14 @@ class LGCConv(MessagePassing):
         if edge_weight is None and ew is not None:
             edge_weight = ew
 
-        src_index = edge_index[0, :]
-        gcn_msgs = x.index_select(dim=0, index=src_index)
-        if edge_weight is not None:
-            gcn_msgs = gcn_msgs * edge_weight.view(-1, 1)
-        gcn_msgs = self.aggr_module(gcn_msgs, edge_index[1, :].squeeze(), dim=dim, dim_size=x.size(0))
+        if self.if_fuse and self.__fusable__(x, {'edge_weight': edge_weight, 'dim': dim}):
+            gcn_msgs = self.spmm_aggregate(x, edge_index, edge_weight, dim_size=x.size(0))
+        else:
+            src_index = edge_index[0, :]
+            gcn_msgs = x.index_select(dim=0, index=src_index)
+            if edge_weight is not None:
+                gcn_msgs = gcn_msgs * edge_weight.view(-1, 1)
+            gcn_msgs = self.aggr_module(gcn_msgs, edge_index[1, :].squeeze(), dim=dim, dim_size=x.size(0))
         return self.beta * gcn_msgs + (1 - self.beta) * x
 
     def __repr__(self) -> str:
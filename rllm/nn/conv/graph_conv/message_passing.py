@@ -1,14 +1,24 @@
 from abc import ABC
 import inspect
-from collections import OrderedDict
-from functools import lru_cache
 from typing import Tuple, Callable, Dict, Any, Union, Optional, overload
 
 import torch
 from torch import Tensor
 from torch.sparse import Tensor as SparseTensor
 
-from rllm.nn.conv.graph_conv.aggrs import Aggregator
+from rllm.nn.conv.graph_conv.aggrs import (
+    Aggregator,
+    SumAggregator,
+    AddAggregator,
+    GCNAggregator,
+    MeanAggregator,
+)
+from rllm.utils import index2ptr
+from rllm.utils._cache import EdgeFormatCache
+
+
+# Shared by all layers, so stacked layers convert the same adj only once.
+_edge_format_cache = EdgeFormatCache()
 
 
 class MessagePassing(torch.nn.Module, ABC):
@@ -29,13 +39,21 @@ class MessagePassing(torch.nn.Module, ABC):
             (default: :obj:`"sum"`)
         aggr_kwargs (Optional[Dict[str, Any]]): Additional arguments for the aggregator.
             (default: :obj:`None`)
+        fuse (bool): If set to `True` and neither :meth:`message` nor
+            :meth:`aggregate` is overridden, sum/mean aggregation is computed
+            by one sparse-dense matrix product (see :meth:`spmm_aggregate`)
+            instead of materializing the :math:`(|E|, F)` messages.
+            (default: :obj:`True`)
     """
 
+    FUSABLE_AGGRS = (SumAggregator, AddAggregator, GCNAggregator, MeanAggregator)
+
     def __init__(
         self,
         aggr: Optional[Union[str, Aggregator]] = 'sum',
         *,
-        aggr_kwargs: Optional[Dict[str, Any]] = None
+        aggr_kwargs: Optional[Dict[str, Any]] = None,
+        fuse: bool = True,
     ):
         super().__init__()
 
@@ -43,6 +61,12 @@ class MessagePassing(torch.nn.Module, ABC):
         self.__msg_aggr__ = self.__is_overrided__(self.message_and_aggregate)
 
         self.aggr_module = self.aggr_revoler(aggr, **(aggr_kwargs or {}))
+        self.__fuse__ = (
+            fuse
+            and not self.__is_overrided__(self.message)
+            and not self.__is_overrided__(self.aggregate)
+            and type(self.aggr_module) in self.FUSABLE_AGGRS
+        )
 
     def propagate(
             self,
@@ -79,6 +103,13 @@ class MessagePassing(torch.nn.Module, ABC):
                 self.message_and_aggregate, x, edge_index, kwargs
             )
             out = self.message_and_aggregate(**msg_aggr_kwargs)
+        elif self.__fuse__ and self.__fusable__(x, kwargs):
+            out = self.spmm_aggregate(
+                x,
+                edge_index,
+                edge_weight=kwargs.get('edge_weight', None),
+                dim_size=kwargs['dim_size'],
+            )
         else:
             msg_kwargs = self.__collect__(
                 self.message, x, edge_index, kwargs
@@ -143,6 +174,50 @@ class MessagePassing(torch.nn.Module, ABC):
         edge_index, _ = self.__unify_edgeindex__(edge_index)
         return self.aggr_module(msgs, edge_index[1, :], dim=dim, dim_size=dim_size)
 
+    def spmm_aggregate(
+        self,
+        x: Tensor,
+        edge_index: Union[Tensor, SparseTensor],
+        edge_weight: Optional[Tensor] = None,
+        dim_size: Optional[int] = None,
+    ) -> Tensor:
+        r"""
+        Fused :meth:`message` and sum/mean :meth:`aggregate`, computed as
+        :math:`\mathbf{A}^{\top} \mathbf{X}` with a CSR adjacency of shape
+        :math:`(|V_{dst}|, |V_{src}|)`. The CSR structure is cached per
+        `edge_index`, only the values are rebuilt on every call.
+
+        Args:
+            x (Tensor): The source node features. :math:`(|V_{src}|, ...)`
+            edge_index (Union[Tensor, SparseTensor]): The edge indices or adj.
+            edge_weight (Tensor): The edge weights.
+            dim_size (Optional[int]): The number of destination nodes.
+                If None, use :obj:`x.size(0)`.
+        """
+        dim_size = x.size(0) if dim_size is None else dim_size
+        edge_index, edge_weight_ = self.__unify_edgeindex__(edge_index)
+        edge_weight = edge_weight if edge_weight_ is None else edge_weight_
+
+        crow, col, perm, deg = _edge_format_cache.get(
+            edge_index,
+            lambda t: self.__edges2csr__(t, dim_size),
+            tag=('csr', dim_size),
+        )
+        if edge_weight is None:
+            values = torch.ones(col.numel(), dtype=x.dtype, device=x.device)
+        else:
+            values = edge_weight.view(-1)[perm].to(x.dtype)
+        adj = torch.sparse_csr_tensor(
+            crow, col, values, size=(dim_size, x.size(0)), device=x.device
+        )
+        out = torch.sparse.mm(adj, x.reshape(x.size(0), -1))
+        out = out.view((dim_size,) + tuple(x.shape[1:]))
+
+        if isinstance(self.aggr_module, MeanAggregator):
+            deg = deg.clamp(min=1).to(out.dtype)
+            out = out / deg.view((-1,) + (1,) * (out.dim() - 1))
+        return out
+
     def message_and_aggregate(self, edge_index: Union[Tensor, SparseTensor]) -> Tensor:
         r"""The message and aggregation interface to be overridden by subclasses."""
         return NotImplemented
@@ -152,6 +227,15 @@ class MessagePassing(torch.nn.Module, ABC):
         return output
 
     # Properties
+    @property
+    def if_fuse(self) -> bool:
+        r"""Whether sum/mean aggregation may use :meth:`spmm_aggregate`."""
+        return self.__fuse__
+
+    @if_fuse.setter
+    def if_fuse(self, fuse: bool) -> None:
+        self.__fuse__ = fuse
+
     @property
     def if_message_and_aggregate(self) -> bool:
         return self.__msg_aggr__
@@ -161,36 +245,50 @@ class MessagePassing(torch.nn.Module, ABC):
         self.__msg_aggr__ = msg_aggr
 
     # Utility functions
+    @classmethod
+    def __arg_plan__(cls, func_name: str) -> Tuple[Tuple[str, Any], ...]:
+        r"""The `(name, default)` pairs of the arguments of `func_name`.
+
+        Signatures are inspected once per class and stored on the class,
+        so :meth:`propagate` only walks a precomputed tuple.
+        """
+        plans = cls.__dict__.get("_arg_plans", None)
+        if plans is None:
+            plans = {}
+            setattr(cls, "_arg_plans", plans)
+        plan = plans.get(func_name, None)
+        if plan is None:
+            params = list(inspect.signature(getattr(cls, func_name)).parameters.values())
+            params = params[1:]  # self
+            if func_name in ['aggregate', 'update']:
+                params = params[1:]  # msgs / output
+            plan = tuple(
+                (p.name, p.default) for p in params
+                if p.kind not in (p.VAR_POSITIONAL, p.VAR_KEYWORD)
+            )
+            plans[func_name] = plan
+        return plan
+
     def __collect__(self, func: Callable, x, edge_index, kwargs) -> Dict[str, Any]:
         r"""Collects the arguments funcs.
         """
-        func_params = OrderedDict(self.__func_params__(func))
-        if func.__name__ in ['aggregate', 'update']:
-            func_params.popitem(last=False)
-
-        coll = OrderedDict()
-        for k, v in func_params.items():
+        coll = {}
+        for k, default in self.__arg_plan__(func.__name__):
             if k in kwargs:
                 coll[k] = kwargs[k]
             elif k == 'x':
                 coll[k] = x
             elif k == 'edge_index':
                 coll[k] = edge_index
+            elif default is not inspect.Parameter.empty:
+                coll[k] = default
             else:
-                if v.default != inspect.Parameter.empty:
-                    coll[k] = v.default
-                else:
-                    raise ValueError(f"Missing required parameter {k}.")
+                raise ValueError(f"Missing required parameter {k}.")
         return coll
 
-    @lru_cache
-    def __func_params__(self, func: Callable) -> OrderedDict:
-        return inspect.signature(func).parameters
-
-    @lru_cache
     def __unify_edgeindex__(self, edge_index: Tensor) -> Tuple[Tensor, Optional[Tensor]]:
         r"""Unify the edge index to a 2D tensor."""
-        if edge_index.is_sparse:
+        if edge_index.layout != torch.strided:
             return self.__adj2edges__(edge_index)
         elif edge_index.size(0) != 2:
             try:
@@ -200,18 +298,42 @@ class MessagePassing(torch.nn.Module, ABC):
         else:
             return edge_index, None
 
-    @lru_cache
     def __adj2edges__(self, adj: SparseTensor) -> Tuple[Tensor, Tensor]:
         r"""Converts a sparse adjacency matrix to edge indices."""
-        if adj.is_sparse:
-            coo_adj = adj.to_sparse_coo().coalesce()
-            s, d, vs = coo_adj.indices()[0], coo_adj.indices()[1], coo_adj.values()
-            vs = None if torch.all(vs == 1) else vs
-            return torch.stack([s, d]), vs
+        if adj.layout != torch.strided:
+            return _edge_format_cache.get(adj, self.__sparse2edges__)
         else:
             raise TypeError(f"Expect adj to be a SparseTensor, got {type(adj)}.")
 
-    @lru_cache
+    def __fusable__(self, x: Any, kwargs: Dict[str, Any]) -> bool:
+        r"""Runtime conditions of the fused sum/mean path."""
+        if not isinstance(x, Tensor) or x.dim() < 2:
+            return False
+        if kwargs.get('dim', 0) != 0:
+            return False
+        # `torch.sparse.mm` does not differentiate w.r.t. CSR values.
+        edge_weight = kwargs.get('edge_weight', None)
+        if edge_weight is not None and edge_weight.requires_grad:
+            return False
+        return x.is_cuda or x.dtype in (torch.float32, torch.float64)
+
+    @staticmethod
+    def __edges2csr__(
+        edge_index: Tensor, dim_size: int
+    ) -> Tuple[Tensor, Tensor, Tensor, Tensor]:
+        r"""Sort edges by destination into CSR `(crow, col, perm, deg)`."""
+        perm = torch.argsort(edge_index[1], stable=True)
+        dst = edge_index[1][perm]
+        crow = index2ptr(dst, dim_size)
+        return crow, edge_index[0][perm], perm, crow[1:] - crow[:-1]
+
+    @staticmethod
+    def __sparse2edges__(adj: SparseTensor) -> Tuple[Tensor, Tensor]:
+        coo_adj = adj.to_sparse_coo().coalesce()
+        s, d, vs = coo_adj.indices()[0], coo_adj.indices()[1], coo_adj.values()
+        vs = None if torch.all(vs == 1) else vs
+        return torch.stack([s, d]), vs
+
     def __is_overrided__(self, func: Callable) -> bool:
         r"""Check if the function is overridden. If so, return True."""
         return getattr(self.__class__, func.__name__, None) \
@@ -0,0 +1,202 @@
+from functools import lru_cache
+from typing import Optional
+
+import torch
+import torch.nn.functional as F
+from torch import Tensor
+
+
+@lru_cache(maxsize=32)
+def causal_mask(seq_len: int, device: torch.device) -> Tensor:
+    r"""The boolean mask of shape `(seq_len, seq_len)` letting column `i`
+    attend to columns `j <= i`. Built once per length and device and
+    broadcast over batches and heads, so it must not be modified.
+    """
+    ones = torch.ones(seq_len, seq_len, dtype=torch.bool, device=device)
+    return ones.tril_()
+
+
+def split_heads(x: Tensor, num_heads: int) -> Tensor:
+    r"""Reshape `(B, N, H * D)` to `(B, H, N, D)`."""
+    B, N, _ = x.shape
+    return x.view(B, N, num_heads, -1).transpose(1, 2)
+
+
+def merge_heads(x: Tensor) -> Tensor:
+    r"""Reshape `(B, H, N, D)` to `(B, N, H * D)`."""
+    B, _, N, _ = x.shape
+    return x.transpose(1, 2).reshape(B, N, -1)
+
+
+def scaled_dot_product_attention(
+    q: Tensor,
+    k: Tensor,
+    v: Tensor,
+    attn_mask: Optional[Tensor] = None,
+    is_causal: bool = False,
+    dropout_p: float = 0.0,
+    compute_dtype: Optional[torch.dtype] = None,
+) -> Tensor:
+    r"""The attention backend of the table convolutions.
+
+    Routes to :func:`torch.nn.functional.scaled_dot_product_attention`,
+    which picks a flash or memory-efficient kernel when one applies, so
+    the `(B, H, N, N)` attention matrix is never materialized.
+
+    Args:
+        q, k, v (Tensor): Queries, keys and values of shape `(B, H, N, D)`.
+        attn_mask (Tensor, optional): A boolean mask broadcastable to
+            `(B, H, N, N)`, True where attention is allowed.
+            (default: :obj:`None`)
+        is_causal (bool): Whether to apply :func:`causal_mask`, which
+            lets the kernels skip the masked blocks. (default: :obj:`False`)
+        dropout_p (float): The attention dropout. (default: :obj:`0.0`)
+        compute_dtype (torch.dtype, optional): Compute the attention in
+            this dtype, e.g. :obj:`torch.bfloat16` on CPU or
+            :obj:`torch.float16` on GPU. The output keeps the dtype of
+            :obj:`v`. (default: :obj:`None`)
+    """
+    dtype = v.dtype
+    if compute_dtype is not None and compute_dtype != dtype:
+        q, k, v = q.to(compute_dtype), k.to(compute_dtype), v.to(compute_dtype)
+    out = F.scaled_dot_product_attention(
+        q, k, v, attn_mask=attn_mask, dropout_p=dropout_p, is_causal=is_causal
+    )
+    return out.to(dtype)
+
+
+def _landmarks(x: Tensor, num_landmarks: int) -> Tensor:
+    r"""The means of `num_landmarks` contiguous segments of `(B, H, N, D)`."""
+    N = x.size(-2)
+    seg = torch.arange(N, device=x.device) * num_landmarks // N
+    out = x.new_zeros(x.shape[:-2] + (num_landmarks, x.size(-1)))
+    out = out.index_add(x.dim() - 2, seg, x)
+    count = torch.bincount(seg, minlength=num_landmarks).to(x.dtype)
+    return out / count.view(-1, 1)
+
+
+def _iterative_pinv(a: Tensor, num_iters: int = 6) -> Tensor:
+    r"""The Moore-Penrose inverse of the softmax kernels `(..., m, m)` by
+    Newton-Schulz iterations, which only needs matmuls and has stable
+    gradients, unlike an SVD."""
+    eye = torch.eye(a.size(-1), dtype=a.dtype, device=a.device)
+    abs_a = a.abs()
+    norm = abs_a.sum(-1).amax(-1) * abs_a.sum(-2).amax(-1)
+    z = a.transpose(-1, -2) / norm[..., None, None]
+    for _ in range(num_iters):
+        az = a @ z
+        z = 0.25 * z @ (13 * eye - az @ (15 * eye - az @ (7 * eye - az)))
+    return z
+
+
+def nystrom_attention(
+    q: Tensor,
+    k: Tensor,
+    v: Tensor,
+    num_landmarks: int,
+    compute_dtype: Optional[torch.dtype] = None,
+) -> Tensor:
+    r"""The Nystrom approximation of softmax attention, as in the
+    `"Nystromformer: A Nystrom-Based Algorithm for Approximating
+    Self-Attention" <https://arxiv.org/abs/2102.03902>`_ paper.
+
+    Queries and keys are summarized by the means of `num_landmarks`
+    contiguous segments, and the `(N, N)` attention is replaced by three
+    softmax kernels of shapes `(N, m)`, `(m, m)` and `(m, N)`, so time and
+    memory are linear in `N`.
+
+    Args:
+        q, k, v (Tensor): Queries, keys and values of shape `(B, H, N, D)`.
+        num_landmarks (int): The number of landmarks `m`.
+        compute_dtype (torch.dtype, optional): Compute the kernels in
+            this dtype. The inverse is always computed in float32.
+            (default: :obj:`None`)
+    """
+    dtype = v.dtype
+    if compute_dtype is not None and compute_dtype != dtype:
+        q, k, v = q.to(compute_dtype), k.to(compute_dtype), v.to(compute_dtype)
+    q = q * q.size(-1) ** -0.5
+    q_land = _landmarks(q, num_landmarks)
+    k_land = _landmarks(k, num_landmarks)
+
+    kernel_1 = (q @ k_land.transpose(-1, -2)).softmax(dim=-1)
+    kernel_2 = (q_land @ k_land.transpose(-1, -2)).softmax(dim=-1)
+    kernel_3 = (q_land @ k.transpose(-1, -2)).softmax(dim=-1)
+    kernel_2_inv = _iterative_pinv(kernel_2.float()).to(kernel_1.dtype)
+    out = kernel_1 @ (kernel_2_inv @ (kernel_3 @ v))
+    return out.to(dtype)
+
+
+class TableTransformerEncoderLayer(torch.nn.TransformerEncoderLayer):
+    r""":class:`torch.nn.TransformerEncoderLayer` whose self-attention runs
+    on :func:`scaled_dot_product_attention`, optionally in a lower
+    precision. Parameters are those of the parent class, so state dicts
+    are interchangeable.
+
+    Inference without autograd may still take the native fused encoder
+    kernel of PyTorch, in the dtype of the parameters, unless
+    :obj:`num_landmarks` is set.
+
+    Args:
+        *args: See :class:`torch.nn.TransformerEncoderLayer`.
+        compute_dtype (torch.dtype, optional): The attention compute
+            dtype. (default: :obj:`None`)
+        num_landmarks (int, optional): If set, sequences longer than
+            this use :func:`nystrom_attention`, without attention
+            dropout. (default: :obj:`None`)
+        **kwargs: See :class:`torch.nn.TransformerEncoderLayer`.
+    """
+
+    def __init__(
+        self,
+        *args,
+        compute_dtype: Optional[torch.dtype] = None,
+        num_landmarks: Optional[int] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.compute_dtype = compute_dtype
+        self.num_landmarks = num_landmarks
+        if num_landmarks is not None:
+            # The native fused path would run exact attention.
+            self.activation_relu_or_gelu = 0
+
+    def _sa_block(
+        self,
+        x: Tensor,
+        attn_mask: Optional[Tensor],
+        key_padding_mask: Optional[Tensor],
+        is_causal: bool = False,
+    ) -> Tensor:
+        if attn_mask is not None or key_padding_mask is not None:
+            # Table convolutions never pass masks, keep the reference path.
+            return super()._sa_block(x, attn_mask, key_padding_mask, is_causal)
+
+        attn = self.self_attn
+        if not attn.batch_first:
+            x = x.transpose(0, 1)
+        q, k, v = F.linear(x, attn.in_proj_weight, attn.in_proj_bias).chunk(3, -1)
+        q = split_heads(q, attn.num_heads)
+        k = split_heads(k, attn.num_heads)
+        v = split_heads(v, attn.num_heads)
+        if (
+            self.num_landmarks is not None
+            and not is_causal
+            and q.size(-2) > self.num_landmarks
+        ):
+            out = nystrom_attention(
+                q, k, v, self.num_landmarks, compute_dtype=self.compute_dtype
+            )
+        else:
+            out = scaled_dot_product_attention(
+                q,
+                k,
+                v,
+                is_causal=is_causal,
+                dropout_p=attn.dropout if self.training else 0.0,
+                compute_dtype=self.compute_dtype,
+            )
+        out = attn.out_proj(merge_heads(out))
+        if not attn.batch_first:
+            out = out.transpose(0, 1)
+        return self.dropout1(out)
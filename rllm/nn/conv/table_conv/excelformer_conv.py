@@ -1,11 +1,17 @@
 from __future__ import annotations
-from typing import Tuple, Union, Dict, List, Any
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import torch
 from torch import Tensor
 
 from rllm.types import ColType
 from rllm.nn.pre_encoder import FTTransformerPreEncoder
+from rllm.nn.conv.table_conv._attention import (
+    causal_mask,
+    merge_heads,
+    scaled_dot_product_attention,
+    split_heads,
+)
 
 
 class GLULayer(torch.nn.Module):
@@ -32,62 +38,58 @@ class SemiPermeableAttention(torch.nn.Module):
     `"ExcelFormer: A neural network surpassing GBDTs on tabular data"`
     <https://arxiv.org/abs/2301.02819>`_ paper.
 
+    Column `i` attends to columns `j <= i` only, which is a causal mask,
+    so the fused attention kernels apply directly.
+
     Args:
         dim (int): Input dimensionality
         num_heads (int): Number of heads in Attention module (default: :obj:`8`)
         head_dim(int): Dimension of each attention head (default: :obj:`16`)
         dropout (float): Percentage of random deactivation (default: :obj:`0.`)
+        compute_dtype (torch.dtype, optional): The attention compute dtype,
+            e.g. :obj:`torch.bfloat16` (default: :obj:`None`)
     """
 
-    def __init__(self, dim, num_heads=8, head_dim=16, dropout=0.0):
+    def __init__(
+        self,
+        dim,
+        num_heads=8,
+        head_dim=16,
+        dropout=0.0,
+        compute_dtype: Optional[torch.dtype] = None,
+    ):
         super().__init__()
         inner_dim = head_dim * num_heads
         self.num_heads = num_heads
         self.scale = head_dim**-0.5
+        self.compute_dtype = compute_dtype
 
         self.to_qkv = torch.nn.Linear(dim, inner_dim * 3, bias=False)
         self.to_out = torch.nn.Linear(inner_dim, dim)
 
         self.dropout = torch.nn.Dropout(dropout)
 
-    def _rearrange_qkv(self, x: Tensor) -> Tensor:
-        # reshape b n (h d) -> b h n d
-        b, num_cols, dim = x.shape
-        d_head = dim // self.num_heads
-        x = x.reshape(b, num_cols, self.num_heads, d_head)
-        x = x.permute(0, 2, 1, 3)
-        return x
-
     def forward(self, x: Tensor):
         q, k, v = self.to_qkv(x).chunk(3, dim=-1)
-        q = self._rearrange_qkv(q)
-        k = self._rearrange_qkv(k)
-        v = self._rearrange_qkv(v)
-        sim = torch.einsum("b h i d, b h j d -> b h i j", q, k)
-        mask = self.get_attention_mask(input_shape=sim.size(), device=sim.device)
-        attn = (sim + mask) * self.scale
-        attn = attn.softmax(dim=-1)
-        dropped_attn = self.dropout(attn)
-
-        out = torch.einsum("b h i j, b h j d -> b h i d", dropped_attn, v)
-        # reshape b h n d -> b n (h d)
-        out = out.permute(0, 2, 1, 3)
-        out = out.reshape(out.size(0), out.size(1), -1)
-        return self.to_out(out)
+        out = scaled_dot_product_attention(
+            split_heads(q, self.num_heads),
+            split_heads(k, self.num_heads),
+            split_heads(v, self.num_heads),
+            is_causal=True,
+            dropout_p=self.dropout.p if self.training else 0.0,
+            compute_dtype=self.compute_dtype,
+        )
+        return self.to_out(merge_heads(out))
 
     def reset_parameters(self) -> None:
         self.to_qkv.reset_parameters()
         self.to_out.reset_parameters()
 
     def get_attention_mask(self, input_shape: Tuple, device):
-        bs, num_heads, seq_len, _ = input_shape
-        seq_ids = torch.arange(seq_len, device=device)
-        attention_mask = (
-            seq_ids[None, None, :].repeat(bs, seq_len, 1) <= seq_ids[None, :, None]
-        )
-        attention_mask = (1.0 - attention_mask.float()) * -1e4
-        attention_mask = attention_mask.unsqueeze(1).repeat(1, num_heads, 1, 1)
-        return attention_mask
+        r"""The additive form of the mask, broadcastable to `input_shape`."""
+        seq_len = input_shape[-1]
+        mask = causal_mask(seq_len, torch.device(device))
+        return (~mask).float().mul_(-1e4).view(1, 1, seq_len, seq_len)
 
 
 class ExcelFormerConv(torch.nn.Module):
@@ -112,6 +114,8 @@ class ExcelFormerConv(torch.nn.Module):
         metadata (Dict[rllm.types.ColType, List[Dict[str, Any]]], optional):
             Metadata for each column type, specifying the statistics and
             properties of the columns. (default: :obj:`None`).
+        compute_dtype (torch.dtype, optional): The attention compute dtype,
+            e.g. :obj:`torch.bfloat16` (default: :obj:`None`).
     """
 
     def __init__(
@@ -122,11 +126,16 @@ class ExcelFormerConv(torch.nn.Module):
         dropout: float = 0.5,
         use_pre_encoder: bool = False,
         metadata: Dict[ColType, List[Dict[str, Any]]] = None,
+        compute_dtype: Optional[torch.dtype] = None,
     ):
         super().__init__()
         self.layer_norm = torch.nn.LayerNorm(conv_dim)
         self.sp_attention = SemiPermeableAttention(
-            dim=conv_dim, num_heads=num_heads, head_dim=head_dim, dropout=dropout
+            dim=conv_dim,
+            num_heads=num_heads,
+            head_dim=head_dim,
+            dropout=dropout,
+            compute_dtype=compute_dtype,
         )
         self.glu_layer = GLULayer(in_dim=conv_dim, out_dim=conv_dim)
 
@@ -147,9 +156,11 @@ class ExcelFormerConv(torch.nn.Module):
         if self.pre_encoder:
             self.pre_encoder.reset_parameters()
 
-    def forward(self, x: Union[Dict, Tensor]) -> Tensor:
+    def forward(
+        self, x: Union[Dict, Tensor], index: Optional[Tensor] = None
+    ) -> Tensor:
         if self.pre_encoder:
-            x = self.pre_encoder(x)
+            x = self.pre_encoder(x, index=index)
         x = self.layer_norm(x)
         x = self.sp_attention(x)
         x = x + self.glu_layer(x)
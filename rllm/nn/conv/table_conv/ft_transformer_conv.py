@@ -7,6 +7,7 @@ from torch.nn import Parameter
 
 from rllm.types import ColType
 from rllm.nn.pre_encoder import FTTransformerPreEncoder
+from rllm.nn.conv.table_conv._attention import TableTransformerEncoderLayer
 
 
 class FTTransformerConv(torch.nn.Module):
@@ -33,6 +34,8 @@ class FTTransformerConv(torch.nn.Module):
         metadata (Optional[Dict[ColType, List[Dict[str, Any]]]]): Metadata for
             each column type, specifying the statistics and properties of the
             columns (default: :obj:`None`).
+        compute_dtype (torch.dtype, optional): The attention compute dtype,
+            e.g. :obj:`torch.bfloat16` (default: :obj:`None`).
     """
 
     def __init__(
@@ -45,17 +48,19 @@ class FTTransformerConv(torch.nn.Module):
         use_cls: bool = False,
         use_pre_encoder: bool = False,
         metadata: Dict[ColType, List[Dict[str, Any]]] = None,
+        compute_dtype: Optional[torch.dtype] = None,
     ):
         super().__init__()
         self.use_cls = use_cls
         self.metadata = metadata
-        encoder_layer = torch.nn.TransformerEncoderLayer(
+        encoder_layer = TableTransformerEncoderLayer(
             d_model=conv_dim,
             nhead=num_heads,
             dim_feedforward=feedforward_dim or conv_dim,
             dropout=dropout,
             activation=activation,
             batch_first=True,
+            compute_dtype=compute_dtype,
         )
         encoder_norm = torch.nn.LayerNorm(conv_dim)
         self.transformer = torch.nn.TransformerEncoder(
@@ -83,11 +88,15 @@ class FTTransformerConv(torch.nn.Module):
         if self.pre_encoder:
             self.pre_encoder.reset_parameters()
 
-    def forward(self, x: Union[Dict, Tensor]) -> Tensor:
+    def forward(
+        self, x: Union[Dict, Tensor], index: Optional[Tensor] = None
+    ) -> Tensor:
         r"""CLS-token augmented Transformer convolution.
 
         Args:
             x (Union[Dict, Tensor]): Input tensor of shape [batch_size, num_cols, dim]
+            index (Tensor, optional): Rows of the batch in the table cached
+                by :meth:`PreEncoder.cache`, to skip the pre-encoder.
 
         Returns:
             torch.Tensor: Output tensor of shape [batch_size, num_cols, dim]
@@ -96,7 +105,7 @@ class FTTransformerConv(torch.nn.Module):
             added CLS token column.
         """
         if self.pre_encoder is not None:
-            x = self.pre_encoder(x)
+            x = self.pre_encoder(x, index=index)
 
         B, _, _ = x.shape
         # [batch_size, num_cols, dim]
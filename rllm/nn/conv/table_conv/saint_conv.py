@@ -1,11 +1,12 @@
 from __future__ import annotations
-from typing import Union, Dict, List, Any
+from typing import Any, Dict, List, Optional, Union
 
 import torch
 from torch import Tensor
 
 from rllm.types import ColType
 from rllm.nn.pre_encoder import FTTransformerPreEncoder
+from rllm.nn.conv.table_conv._attention import TableTransformerEncoderLayer
 
 
 class SAINTConv(torch.nn.Module):
@@ -19,6 +20,16 @@ class SAINTConv(torch.nn.Module):
     complex relationships both within the features of a single sample and
     across different samples.
 
+    The exact row attention is quadratic in the batch size. For large
+    batches, :obj:`row_attention` selects a scalable variant:
+
+    - :obj:`"chunked"`: rows attend within groups of at most
+      :obj:`row_chunk_size` consecutive rows of the batch, which the data
+      loader shuffles every epoch.
+    - :obj:`"nystrom"`: rows attend to the whole batch through
+      :obj:`num_landmarks` landmarks, see
+      :func:`~rllm.nn.conv.table_conv._attention.nystrom_attention`.
+
     Args:
         conv_dim (int): Input/Output dimensionality.
         num_feats (int): Number of features.
@@ -29,6 +40,15 @@ class SAINTConv(torch.nn.Module):
         metadata (Dict[rllm.types.ColType, List[Dict[str, Any]]], optional):
             Metadata for each column type, specifying the statistics and
             properties of the columns. (default: :obj:`None`).
+        compute_dtype (torch.dtype, optional): The attention compute dtype,
+            e.g. :obj:`torch.bfloat16` (default: :obj:`None`).
+        row_attention (str, optional): The row attention, one of
+            :obj:`"full"`, :obj:`"chunked"` and :obj:`"nystrom"`
+            (default: :obj:`"full"`).
+        row_chunk_size (int, optional): The maximum rows per group of the
+            :obj:`"chunked"` row attention (default: :obj:`1024`).
+        num_landmarks (int, optional): The number of landmarks of the
+            :obj:`"nystrom"` row attention (default: :obj:`64`).
     """
 
     def __init__(
@@ -40,17 +60,26 @@ class SAINTConv(torch.nn.Module):
         activation: str = "relu",
         use_pre_encoder: bool = False,
         metadata: Dict[ColType, List[Dict[str, Any]]] = None,
+        compute_dtype: Optional[torch.dtype] = None,
+        row_attention: str = "full",
+        row_chunk_size: int = 1024,
+        num_landmarks: int = 64,
     ):
         super().__init__()
+        if row_attention not in ("full", "chunked", "nystrom"):
+            raise ValueError(f"Unknown row attention: {row_attention}")
+        self.row_attention = row_attention
+        self.row_chunk_size = row_chunk_size
 
         # Column Transformer
-        col_encoder_layer = torch.nn.TransformerEncoderLayer(
+        col_encoder_layer = TableTransformerEncoderLayer(
             d_model=conv_dim,
             nhead=num_heads,
             dim_feedforward=conv_dim,
             dropout=dropout,
             activation=activation,
             batch_first=True,
+            compute_dtype=compute_dtype,
         )
         col_encoder_norm = torch.nn.LayerNorm(conv_dim)
         self.col_transformer = torch.nn.TransformerEncoder(
@@ -60,13 +89,15 @@ class SAINTConv(torch.nn.Module):
         )
 
         # Row Transformer
-        row_encoder_layer = torch.nn.TransformerEncoderLayer(
+        row_encoder_layer = TableTransformerEncoderLayer(
             d_model=conv_dim * num_feats,
             nhead=num_heads,
             dim_feedforward=conv_dim * num_feats,
             dropout=dropout,
             activation=activation,
             batch_first=True,
+            compute_dtype=compute_dtype,
+            num_landmarks=num_landmarks if row_attention == "nystrom" else None,
         )
         row_encoder_norm = torch.nn.LayerNorm(conv_dim * num_feats)
         self.row_transformer = torch.nn.TransformerEncoder(
@@ -89,11 +120,29 @@ class SAINTConv(torch.nn.Module):
         if self.pre_encoder is not None:
             self.pre_encoder.reset_parameters()
 
-    def forward(self, x: Union[Dict, Tensor]):
+    def forward(self, x: Union[Dict, Tensor], index: Optional[Tensor] = None):
         if self.pre_encoder is not None:
-            x = self.pre_encoder(x)
+            x = self.pre_encoder(x, index=index)
         x = self.col_transformer(x)
         shape = x.shape
-        x = x.reshape(1, x.shape[0], -1)
-        x = self.row_transformer(x)
+        x = x.reshape(shape[0], -1)
+        if self.row_attention == "chunked":
+            x = self._chunked_row_transformer(x)
+        else:
+            x = self.row_transformer(x.unsqueeze(0)).squeeze(0)
         return x.reshape(shape)
+
+    def _chunked_row_transformer(self, x: Tensor) -> Tensor:
+        # Split the rows into equal groups, up to one row, so no group is
+        # left with a handful of rows. The groups of each size are run as
+        # one batch.
+        num_rows = x.size(0)
+        num_chunks = -(-num_rows // self.row_chunk_size)
+        small = num_rows // num_chunks
+        split = (num_rows - small * num_chunks) * (small + 1)
+        outs = []
+        for rows, size in ((x[:split], small + 1), (x[split:], small)):
+            if rows.size(0) > 0:
+                out = self.row_transformer(rows.reshape(-1, size, x.size(1)))
+                outs.append(out.reshape(-1, x.size(1)))
+        return torch.cat(outs) if len(outs) > 1 else outs[0]
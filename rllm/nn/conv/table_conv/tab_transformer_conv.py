@@ -1,11 +1,12 @@
 from __future__ import annotations
-from typing import Union, Dict, List, Any
+from typing import Any, Dict, List, Optional, Union
 
 import torch
 from torch import Tensor
 
 from rllm.types import ColType
 from rllm.nn.pre_encoder import TabTransformerPreEncoder
+from rllm.nn.conv.table_conv._attention import TableTransformerEncoderLayer
 
 
 class TabTransformerConv(torch.nn.Module):
@@ -25,6 +26,8 @@ class TabTransformerConv(torch.nn.Module):
         metadata (Dict[ColType, List[Dict[str, Any]]], optional):
             Metadata for each column type, specifying the statistics and
             properties of the columns. (default: :obj:`None`).
+        compute_dtype (torch.dtype, optional): The attention compute dtype,
+            e.g. :obj:`torch.bfloat16` (default: :obj:`None`).
     """
 
     def __init__(
@@ -35,15 +38,17 @@ class TabTransformerConv(torch.nn.Module):
         activation: str = "relu",
         use_pre_encoder: bool = False,
         metadata: Dict[ColType, List[Dict[str, Any]]] = None,
+        compute_dtype: Optional[torch.dtype] = None,
     ):
         super().__init__()
-        encoder_layer = torch.nn.TransformerEncoderLayer(
+        encoder_layer = TableTransformerEncoderLayer(
             d_model=conv_dim,
             nhead=num_heads,
             dim_feedforward=conv_dim,
             dropout=dropout,
             activation=activation,
             batch_first=True,
+            compute_dtype=compute_dtype,
         )
         encoder_norm = torch.nn.LayerNorm(conv_dim)
         self.transformer = torch.nn.TransformerEncoder(
@@ -66,9 +71,9 @@ class TabTransformerConv(torch.nn.Module):
         if self.pre_encoder is not None:
             self.pre_encoder.reset_parameters()
 
-    def forward(self, x: Union[Dict, Tensor]):
+    def forward(self, x: Union[Dict, Tensor], index: Optional[Tensor] = None):
         if self.pre_encoder is not None:
-            x = self.pre_encoder(x, return_dict=True)
+            x = self.pre_encoder(x, return_dict=True, index=index)
 
         x[ColType.CATEGORICAL] = self.transformer(x[ColType.CATEGORICAL])
 
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Union, Dict, List, Any
+from typing import Any, Dict, List, Optional, Union
 
 import torch
 from torch import Tensor
@@ -76,35 +76,99 @@ class TromptConv(torch.nn.Module):
         if self.pre_encoder is not None:
             self.pre_encoder.reset_parameters()
 
-    def forward(self, x: Union[Dict, Tensor], x_prompt: Tensor) -> Tensor:
+    def forward(
+        self,
+        x: Union[Dict, Tensor],
+        x_prompt: Tensor,
+        index: Optional[Tensor] = None,
+    ) -> Tensor:
+        r"""Trompt cell.
+
+        The expanded features of the paper, of shape
+        `[batch_size, num_prompts, in_dim, out_dim]`, are never built:
+        `relu(w * x) = relu(w) * relu(x) + relu(-w) * relu(-x)`, so the
+        group norm statistics and the importance-weighted sum over columns
+        reduce to products of `relu(x)` and `relu(-x)`. Peak memory scales
+        with `batch_size * in_dim * out_dim`.
+
+        Args:
+            x (Union[Dict, Tensor]): Input tensor of shape
+                [batch_size, in_dim, out_dim].
+            x_prompt (Tensor): Prompt tensor of shape
+                [batch_size, num_prompts, out_dim], or a view expanded
+                from [num_prompts, out_dim].
+            index (Tensor, optional): Rows of the batch in the table cached
+                by :meth:`PreEncoder.cache`, to skip the pre-encoder.
+
+        Returns:
+            torch.Tensor: Output tensor of shape
+            [batch_size, num_prompts, out_dim].
+        """
         if self.pre_encoder is not None:
-            x = self.pre_encoder(x)
+            x = self.pre_encoder(x, index=index)
 
         emb_column = self.ln_column(self.emb_column)
         emb_prompt = self.ln_prompt(self.emb_prompt)
 
-        # [num_prompts, out_dim] -> [batch_size, num_prompts, out_dim]
-        se_prompt = emb_prompt.unsqueeze(0).repeat(x.size(0), 1, 1)
-        # [batch_size, num_prompts, out_dim*2]
-        se_prompt_cat = torch.cat([se_prompt, x_prompt], dim=-1)
-        se_prompt_cat_hat = self.linear(se_prompt_cat) + se_prompt + x_prompt
+        # linear([se_prompt, x_prompt]) with se_prompt broadcast over the
+        # batch instead of repeated and concatenated.
+        dim = emb_prompt.size(-1)
+        weight = self.linear.weight
+        se_prompt_cat_hat = (
+            F.linear(emb_prompt, weight[:, :dim], self.linear.bias)
+            + F.linear(x_prompt, weight[:, dim:])
+            + emb_prompt
+            + x_prompt
+        )
 
-        # [in_dim, out_dim] -> [batch_size, in_dim, out_dim]
-        se_column = emb_column.unsqueeze(0).repeat(x_prompt.size(0), 1, 1)
-        m_importance = torch.einsum("ijl,ikl->ijk", se_prompt_cat_hat, se_column)
+        # [batch_size, num_prompts, in_dim]
+        m_importance = torch.einsum("bpd,cd->bpc", se_prompt_cat_hat, emb_column)
         m_importance = F.softmax(m_importance, dim=-1)
 
-        # [batch_size, num_prompts, in_dim, 1]
-        m_importance = m_importance.unsqueeze(dim=-1)
-
-        # [batch_size, in_dim, out_dim]
-        # -> [batch_size, num_prompts, in_dim, out_dim]
-        x_expand_weight = torch.einsum("ijl,k->ikjl", x, self.expand_weight)
-        x_expand_weight = F.relu(x_expand_weight)
-        x_expand_residual = x.unsqueeze(1).repeat(1, self.num_prompts, 1, 1)
-
-        # Residual connection
-        x = self.group_norm(x_expand_weight) + x_expand_residual
-
-        x = (x * m_importance).sum(dim=2)
-        return x
+        # relu(w_p * x) = pos_p * relu(x) + neg_p * relu(-x)
+        pos = F.relu(self.expand_weight)
+        neg = F.relu(-self.expand_weight)
+        x_pos = F.relu(x)
+        x_neg = F.relu(-x)
+
+        # Group norm statistics over (prompts of the group, in_dim, out_dim).
+        # relu(x) and relu(-x) are never both non-zero, so the second moment
+        # has no cross term.
+        group_norm = self.group_norm
+        num_groups = group_norm.num_groups
+        batch_size = x.size(0)
+        mean_pos = x_pos.mean(dim=(1, 2)).view(batch_size, 1)
+        mean_neg = x_neg.mean(dim=(1, 2)).view(batch_size, 1)
+        sq_pos = x_pos.pow(2).mean(dim=(1, 2)).view(batch_size, 1)
+        sq_neg = x_neg.pow(2).mean(dim=(1, 2)).view(batch_size, 1)
+
+        def group_mean(t: Tensor) -> Tensor:
+            # [num_prompts] -> [1, num_groups]
+            return t.view(num_groups, -1).mean(dim=-1).view(1, -1)
+
+        # [batch_size, num_groups]
+        mean = group_mean(pos) * mean_pos + group_mean(neg) * mean_neg
+        sq = group_mean(pos.pow(2)) * sq_pos + group_mean(neg.pow(2)) * sq_neg
+        inv_std = torch.rsqrt((sq - mean.pow(2)).clamp(min=0) + group_norm.eps)
+
+        # [batch_size, num_prompts]
+        group_size = self.num_prompts // num_groups
+        mean = mean.repeat_interleave(group_size, dim=1)
+        inv_std = inv_std.repeat_interleave(group_size, dim=1)
+        scale = inv_std
+        shift = -mean * inv_std
+        if group_norm.affine:
+            scale = scale * group_norm.weight
+            shift = shift * group_norm.weight + group_norm.bias
+
+        # The importance sums to one over in_dim, so the shift and the
+        # residual pass through the weighted sum unchanged.
+        m_pos = torch.bmm(m_importance, x_pos)
+        m_neg = torch.bmm(m_importance, x_neg)
+        out = (
+            (scale * pos).unsqueeze(-1) * m_pos
+            + (scale * neg).unsqueeze(-1) * m_neg
+            + shift.unsqueeze(-1)
+            + torch.bmm(m_importance, x)
+        )
+        return out
@@ -69,8 +69,7 @@ class EmbeddingEncoder(ColEncoder):
         na_mask = feat < 0
         # Increment the index by one not to conflict with the padding idx
         # Also add offset for each column to avoid embedding conflict
-        feat = feat + self.offset + 1
-        # Use 0th index for NaN
-        feat[na_mask] = 0
+        # Use 0th index for NaN, out of place so `feat` stays untouched
+        feat = (feat + self.offset + 1).masked_fill(na_mask, 0)
         # [batch_size, num_cols, dim]
         return self.emb(feat)
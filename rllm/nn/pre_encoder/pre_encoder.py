@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Tuple
+from itertools import chain
+from typing import Any, Dict, List, Optional, Tuple
 from abc import ABC
 
 import torch
@@ -27,6 +28,13 @@ class PreEncoder(torch.nn.Module, ABC):
             :class:`rllm.nn.encoder.ColEncoder` class. Only
             parent :class:`stypes <rllm.types.ColType>` are supported
             as keys.
+
+    For inference over a static table, :meth:`cache` encodes the whole
+    table once into a compact float16 or int8 cache, and a forward given
+    the row :obj:`index` of the batch reads from it instead of encoding.
+    The cache is only read while no gradient reaches the encoders, and is
+    dropped as soon as any encoder parameter or buffer changes, e.g. by
+    an optimizer step, :meth:`load_state_dict` or a device move.
     """
 
     def __init__(
@@ -39,6 +47,7 @@ class PreEncoder(torch.nn.Module, ABC):
 
         self.metadata = metadata
         self.pre_encoder_dict = torch.nn.ModuleDict()
+        self._cache: Optional[Dict[str, Any]] = None
 
         for col_type, col_pre_encoder in col_pre_encoder_dict.items():
             if col_type not in col_pre_encoder.supported_types:
@@ -59,11 +68,14 @@ class PreEncoder(torch.nn.Module, ABC):
         for pre_encoder in self.pre_encoder_dict.values():
             pre_encoder.reset_parameters()
 
-    def forward(
-        self,
-        feat_dict: Dict[ColType, Tensor],
-        return_dict: bool = False,
-    ) -> Tuple[Tensor, List[str]]:
+    def _fingerprint(self) -> Tuple:
+        # In-place updates bump `_version`, `.to()` changes `data_ptr`.
+        return tuple(
+            (id(t), t._version, t.data_ptr())
+            for t in chain(self.parameters(), self.buffers())
+        )
+
+    def _encode(self, feat_dict: Dict[ColType, Tensor]) -> Dict[ColType, Tensor]:
         feat_encoded = {}
         for col_type in feat_dict.keys():
             feat = feat_dict[col_type]
@@ -72,6 +84,119 @@ class PreEncoder(torch.nn.Module, ABC):
                 feat_encoded[col_type] = x
             else:
                 feat_encoded[col_type] = feat
+        return feat_encoded
+
+    @torch.no_grad()
+    def cache(
+        self,
+        feat_dict: Dict[ColType, Tensor],
+        dtype: torch.dtype = torch.float16,
+        batch_size: int = 65536,
+    ) -> None:
+        r"""Encode a whole table once and cache the result, see the class
+        description.
+
+        Args:
+            feat_dict (Dict[ColType, Tensor]): The features of the table,
+                e.g. :obj:`table.feat_dict`.
+            dtype (torch.dtype): :obj:`torch.float16`, :obj:`torch.bfloat16`
+                or :obj:`torch.int8`, quantized symmetrically with one scale
+                per column and channel. (default: :obj:`torch.float16`)
+            batch_size (int): The number of rows encoded at once.
+                (default: :obj:`65536`)
+        """
+        assert dtype in (torch.float16, torch.bfloat16, torch.int8), (
+            f"Unsupported cache dtype {dtype}."
+        )
+        self._cache = None
+        training = self.training
+        self.eval()
+        num_rows = next(iter(feat_dict.values())).size(0)
+
+        def batches():
+            for start in range(0, num_rows, batch_size):
+                yield start, self._encode({
+                    col_type: feat[start:start + batch_size]
+                    for col_type, feat in feat_dict.items()
+                })
+
+        scale = {}
+        if dtype == torch.int8:
+            # A first pass for the ranges.
+            for _, encoded in batches():
+                for col_type, x in encoded.items():
+                    if x.is_floating_point():
+                        amax = x.abs().amax(dim=0, keepdim=True)
+                        if col_type in scale:
+                            amax = torch.maximum(scale[col_type], amax)
+                        scale[col_type] = amax
+            scale = {k: (v / 127).clamp_(min=1e-12) for k, v in scale.items()}
+
+        data, out_dtype = {}, {}
+        for start, encoded in batches():
+            for col_type, x in encoded.items():
+                if col_type not in data:
+                    out_dtype[col_type] = x.dtype
+                    cache_dtype = dtype if x.is_floating_point() else x.dtype
+                    data[col_type] = x.new_empty(
+                        (num_rows,) + x.shape[1:], dtype=cache_dtype
+                    )
+                if col_type in scale:
+                    x = (x / scale[col_type]).round_().clamp_(-127, 127)
+                data[col_type][start:start + x.size(0)] = x
+
+        self.train(training)
+        self._cache = {
+            "data": data,
+            "scale": scale,
+            "dtype": out_dtype,
+            "fingerprint": self._fingerprint(),
+        }
+
+    def clear_cache(self) -> None:
+        r"""Drop the cache built by :meth:`cache`."""
+        self._cache = None
+
+    def _read_cache(self, index: Tensor) -> Optional[Dict[ColType, Tensor]]:
+        if self._cache is None:
+            return None
+        if self._cache["fingerprint"] != self._fingerprint():
+            self._cache = None
+            return None
+        if torch.is_grad_enabled() and any(
+            p.requires_grad for p in self.parameters()
+        ):
+            # The encoders are trained, the cache would cut their gradient.
+            return None
+        out = {}
+        for col_type, data in self._cache["data"].items():
+            x = data[index.to(data.device)].to(self._cache["dtype"][col_type])
+            if col_type in self._cache["scale"]:
+                x = x * self._cache["scale"][col_type]
+            out[col_type] = x
+        return out
+
+    def forward(
+        self,
+        feat_dict: Dict[ColType, Tensor],
+        return_dict: bool = False,
+        index: Optional[Tensor] = None,
+    ) -> Tuple[Tensor, List[str]]:
+        r"""Encode the features.
+
+        Args:
+            feat_dict (Dict[ColType, Tensor]): The features of the batch.
+            return_dict (bool): Whether to return the encoded features per
+                column type instead of concatenated. (default: :obj:`False`)
+            index (Tensor, optional): The rows of the batch in the table
+                passed to :meth:`cache`. If given and the cache is valid,
+                the features are read from the cache. (default: :obj:`None`)
+        """
+        feat_encoded = None
+        if index is not None:
+            feat_encoded = self._read_cache(index)
+        if feat_encoded is None:
+            feat_encoded = self._encode(feat_dict)
 
         if return_dict:
             return feat_encoded
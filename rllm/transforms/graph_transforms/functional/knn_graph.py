@@ -1,11 +1,15 @@
-from typing import Dict, Optional
+import math
+from typing import Callable, Dict, Optional, Tuple
 
-import sklearn
-import sklearn.neighbors
+import torch
 from torch import Tensor
 
+from rllm.utils._sort import lexsort
 from rllm.utils.sparse import sparse_mx_to_torch_sparse_tensor
 
+L2_METRICS = ["l2", "euclidean"]
+TORCH_METRICS = L2_METRICS + ["cosine"]
+
 
 def knn_graph(
     x: Tensor,
@@ -16,6 +20,9 @@ def knn_graph(
     metric_params: Optional[Dict] = None,
     include_self: Optional[bool] = False,
     n_jobs: int = 1,
+    backend: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    approx_params: Optional[Dict] = None,
 ):
     r"""Creates a k-NN graph based on node features
     Args:
@@ -40,17 +47,290 @@ def knn_graph(
         include_self (bool, optinal): If set to True, the graph will
             contain self-loops. (default: False)
         n_jobs (int): Number of workers to use for computation. (default: 1)
+        backend (str[`exact`, `approx`, `sklearn`], optional):
+            `exact` computes the distances to all nodes with a blocked
+            matmul on the device of :obj:`x`, `approx` searches
+            candidates with random projections refined by NN-descent,
+            see :func:`approx_knn`, and `sklearn` calls
+            `sklearn.neighbors.kneighbors_graph`. The torch backends
+            support the Euclidean and cosine metrics. If None, use
+            `exact` for them and `sklearn` otherwise. (default: None)
+        batch_size (int, optional): The number of query rows per block
+            of the `exact` backend, by default as many as fit in about
+            :math:`2^{25}` distances.
+        approx_params (dict, optional): Keyword arguments of
+            :func:`approx_knn`. (default: None)
     """
+    if metric == "minkowski" and p == 2:
+        metric = "euclidean"
+    if backend is None:
+        backend = "exact" if metric in TORCH_METRICS else "sklearn"
+
+    if backend == "sklearn":
+        import sklearn.neighbors
+
+        adj = sklearn.neighbors.kneighbors_graph(
+            X=x,
+            n_neighbors=num_neighbors,
+            mode=mode,
+            metric=metric,
+            p=p,
+            metric_params=metric_params,
+            include_self=include_self,
+            n_jobs=n_jobs,
+        )
+        adj_sp = sparse_mx_to_torch_sparse_tensor(adj)
+        return adj_sp
 
-    adj = sklearn.neighbors.kneighbors_graph(
-        X=x,
-        n_neighbors=num_neighbors,
-        mode=mode,
-        metric=metric,
-        p=p,
-        metric_params=metric_params,
-        include_self=include_self,
-        n_jobs=n_jobs,
+    assert metric in TORCH_METRICS, (
+        f"The '{backend}' backend only supports {TORCH_METRICS} metrics, "
+        f"got '{metric}'. Please use `backend='sklearn'`."
     )
-    adj_sp = sparse_mx_to_torch_sparse_tensor(adj)
-    return adj_sp
+    x = torch.as_tensor(x)
+    if not x.is_floating_point():
+        x = x.float()
+
+    # The node itself is the nearest neighbor, add it after the search.
+    k = num_neighbors - 1 if include_self else num_neighbors
+    if backend == "exact":
+        index, dist = exact_knn(x, k, metric=metric, batch_size=batch_size)
+    elif backend == "approx":
+        index, dist = approx_knn(x, k, metric=metric, **(approx_params or {}))
+    else:
+        raise ValueError(f"Unknown knn backend '{backend}'")
+
+    num_nodes = x.size(0)
+    if include_self:
+        loop = torch.arange(num_nodes, device=x.device).view(-1, 1)
+        index = torch.cat([loop, index], dim=1)
+        dist = torch.cat([dist.new_zeros(num_nodes, 1), dist], dim=1)
+
+    row = torch.arange(num_nodes, device=x.device).repeat_interleave(index.size(1))
+    col = index.flatten()
+    if mode == "connectivity":
+        value = torch.ones(col.numel(), dtype=x.dtype, device=x.device)
+    elif mode == "distance":
+        value = dist.flatten()
+    else:
+        raise ValueError(f"Unknown knn mode '{mode}'")
+
+    # Drop missing neighbors, e.g. of graphs with at most k nodes.
+    mask = col >= 0
+    return torch.sparse_coo_tensor(
+        torch.stack([row[mask], col[mask]]), value[mask], (num_nodes, num_nodes)
+    ).coalesce()
+
+
+def _prepare(x: Tensor, metric: str) -> Tuple[Tensor, Optional[Tensor]]:
+    r"""Return the features and squared norms to rank distances with."""
+    if metric == "cosine":
+        return torch.nn.functional.normalize(x, dim=-1), None
+    return x, (x * x).sum(dim=-1)
+
+
+def _finalize(dist: Tensor, metric: str) -> Tensor:
+    r"""Turn the ranking scores back into distances."""
+    if metric == "cosine":
+        return dist
+    return dist.clamp_(min=0.0).sqrt_()
+
+
+def exact_knn(
+    x: Tensor,
+    k: int,
+    metric: str = "euclidean",
+    batch_size: Optional[int] = None,
+) -> Tuple[Tensor, Tensor]:
+    r"""The exact k nearest neighbors of every row of :obj:`x`, except
+    itself, by blocks of query rows against all rows.
+
+    Args:
+        x (Tensor): The node features of shape :obj:`(N, F)`.
+        k (int): The number of neighbors.
+        metric (str): `euclidean` (or `l2`) or `cosine`.
+            (default: `euclidean`)
+        batch_size (int, optional): The number of query rows per block,
+            by default as many as fit in about :math:`2^{25}` distances.
+
+    Returns:
+        (Tensor, Tensor): The neighbor indices and distances, both of
+        shape :obj:`(N, k)` and sorted by distance. Missing neighbors
+        have index :obj:`-1`.
+    """
+    num_nodes = x.size(0)
+    feat, sq_norm = _prepare(x, metric)
+    if batch_size is None:
+        batch_size = max(1, 2**25 // max(num_nodes, 1))
+    num_found = min(k, num_nodes - 1)
+
+    index = torch.full((num_nodes, k), -1, dtype=torch.long, device=x.device)
+    dist = torch.full((num_nodes, k), float("inf"), dtype=x.dtype, device=x.device)
+    for start in range(0, num_nodes, batch_size):
+        end = min(start + batch_size, num_nodes)
+        block = feat[start:end] @ feat.t()
+        if metric == "cosine":
+            block = 1.0 - block
+        else:
+            # |q - x|^2 = |q|^2 + |x|^2 - 2 q x
+            block = sq_norm[start:end].view(-1, 1) + sq_norm.view(1, -1) - 2 * block
+        rows = torch.arange(end - start, device=x.device)
+        block[rows, rows + start] = float("inf")
+
+        block_dist, block_index = block.topk(num_found, dim=1, largest=False)
+        index[start:end, :num_found] = block_index
+        dist[start:end, :num_found] = block_dist
+
+    return index, _finalize(dist, metric)
+
+
+def _pair_distance(
+    feat: Tensor,
+    sq_norm: Optional[Tensor],
+    start: int,
+    candidate: Tensor,
+) -> Tensor:
+    r"""The ranking scores between the rows from :obj:`start` on and their
+    :obj:`candidate` rows, of shape :obj:`(B, C)`."""
+    query = feat[start:start + candidate.size(0)]
+    dot = torch.bmm(feat[candidate], query.unsqueeze(-1)).squeeze(-1)
+    if sq_norm is None:
+        return 1.0 - dot
+    query_norm = sq_norm[start:start + candidate.size(0)]
+    return query_norm.view(-1, 1) + sq_norm[candidate] - 2 * dot
+
+
+def _merge(
+    index: Tensor,
+    dist: Tensor,
+    start: int,
+    candidate: Tensor,
+    cand_dist: Tensor,
+) -> Tuple[Tensor, Tensor]:
+    r"""Keep the :obj:`k` nearest distinct neighbors of the rows from
+    :obj:`start` on among the current ones and the candidates."""
+    k = index.size(1)
+    index = torch.cat([index, candidate], dim=1)
+    dist = torch.cat([dist, cand_dist], dim=1)
+
+    # Self pairs and duplicates are pushed to infinity.
+    rows = torch.arange(start, start + index.size(0), device=index.device)
+    dist = dist.masked_fill(index == rows.view(-1, 1), float("inf"))
+    index, perm = index.sort(dim=1)
+    dist = dist.gather(1, perm)
+    dup = torch.zeros_like(index, dtype=torch.bool)
+    dup[:, 1:] = index[:, 1:] == index[:, :-1]
+    dist = dist.masked_fill(dup, float("inf"))
+
+    dist, perm = dist.topk(k, dim=1, largest=False)
+    return index.gather(1, perm), dist
+
+
+def _update(
+    feat: Tensor,
+    sq_norm: Optional[Tensor],
+    index: Tensor,
+    dist: Tensor,
+    candidate_fn: Callable[[int, int], Tensor],
+    batch_size: int,
+) -> None:
+    r"""Merge the candidates of every block of rows into :obj:`index` and
+    :obj:`dist`, in place."""
+    for start in range(0, index.size(0), batch_size):
+        end = min(start + batch_size, index.size(0))
+        candidate = candidate_fn(start, end)
+        cand_dist = _pair_distance(feat, sq_norm, start, candidate)
+        index[start:end], dist[start:end] = _merge(
+            index[start:end], dist[start:end], start, candidate, cand_dist
+        )
+
+
+def approx_knn(
+    x: Tensor,
+    k: int,
+    metric: str = "euclidean",
+    num_trees: int = 8,
+    window: Optional[int] = None,
+    num_iters: int = 2,
+    batch_size: int = 1024,
+    seed: Optional[int] = None,
+) -> Tuple[Tensor, Tensor]:
+    r"""Approximate k nearest neighbors of every row of :obj:`x`, except
+    itself, with no index structure beyond sorting.
+
+    Each of :obj:`num_trees` rounds hashes the rows by the signs of random
+    projections, sorts them by hash and compares every row with the
+    :obj:`window` rows around it in that order. The candidates are then
+    refined by :obj:`num_iters` rounds of NN-descent from `"Efficient
+    K-Nearest Neighbor Graph Construction for Generic Similarity
+    Measures" <https://dl.acm.org/doi/10.1145/1963405.1963487>`_, which
+    compares every row with the neighbors of its neighbors.
+
+    Args:
+        x (Tensor): The node features of shape :obj:`(N, F)`.
+        k (int): The number of neighbors.
+        metric (str): `euclidean` (or `l2`) or `cosine`.
+            (default: `euclidean`)
+        num_trees (int): The number of random projection rounds.
+            (default: `8`)
+        window (int, optional): The number of rows compared on each side
+            in the sorted order. (default: :obj:`k`)
+        num_iters (int): The number of NN-descent rounds. (default: `2`)
+        batch_size (int): The number of rows per block of distance
+            computations. (default: `1024`)
+        seed (int, optional): The seed of the random projections.
+
+    Returns:
+        (Tensor, Tensor): The neighbor indices and distances, both of
+        shape :obj:`(N, k)` and sorted by distance. Missing neighbors
+        have index :obj:`-1`.
+    """
+    num_nodes, num_feats = x.size(0), x.size(1)
+    feat, sq_norm = _prepare(x, metric)
+    window = k if window is None else window
+    generator = torch.Generator(device=x.device)
+    if seed is not None:
+        generator.manual_seed(seed)
+    else:
+        generator.seed()
+
+    index = torch.full((num_nodes, k), -1, dtype=torch.long, device=x.device)
+    dist = torch.full((num_nodes, k), float("inf"), dtype=x.dtype, device=x.device)
+    if num_nodes < 2:
+        return index, dist
+
+    # Buckets of about `window` rows.
+    num_bits = min(62, max(1, math.ceil(math.log2(num_nodes / max(window, 1)))))
+    bit_weight = 2 ** torch.arange(num_bits, device=x.device)
+    offsets = torch.cat([
+        torch.arange(-window, 0, device=x.device),
+        torch.arange(1, window + 1, device=x.device),
+    ])
+    for _ in range(num_trees):
+        planes = torch.randn(
+            num_feats, num_bits + 1, generator=generator, device=x.device
+        ).to(x.dtype)
+        proj = feat @ planes
+        code = ((proj[:, :-1] > 0).long() * bit_weight).sum(dim=1)
+        # Sort by hash, and inside a bucket by one more projection.
+        order = lexsort([proj[:, -1], code])
+        pos = torch.empty_like(order)
+        pos[order] = torch.arange(num_nodes, device=x.device)
+
+        def around(start: int, end: int) -> Tensor:
+            around = pos[start:end].view(-1, 1) + offsets.view(1, -1)
+            return order[around.clamp_(0, num_nodes - 1)]
+
+        _update(feat, sq_norm, index, dist, around, batch_size)
+
+    rows = torch.arange(num_nodes, device=x.device).view(-1, 1)
+    for _ in range(num_iters):
+        # Missing neighbors point to the row itself.
+        known = torch.where(index >= 0, index, rows)
+
+        def neighbors_of_neighbors(start: int, end: int) -> Tensor:
+            return known[known[start:end]].view(end - start, -1)
+
+        _update(feat, sq_norm, index, dist, neighbors_of_neighbors, batch_size)
+
+    index = index.masked_fill(torch.isinf(dist), -1)
+    return index, _finalize(dist, metric)
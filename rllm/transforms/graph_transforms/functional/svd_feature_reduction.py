@@ -2,7 +2,14 @@ import torch
 from torch import Tensor
 
 
-def svd_feature_reduction(X: Tensor, out_dim: int):
+def svd_feature_reduction(
+    X: Tensor,
+    out_dim: int,
+    method: str = "full",
+    niter: int = 2,
+    oversample: int = 10,
+    chunk_size: int = 65536,
+):
     r"""Dimensionality reduction of node features via Singular Value
     Decomposition (SVD).
 
@@ -10,8 +17,68 @@ def svd_feature_reduction(X: Tensor, out_dim: int):
         x (Tensor): Node feature matrix.
         out_dim (int): The dimensionlity of node features after
             reduction.
+        method (str): How to compute the top :obj:`out_dim` components:
+
+            1. :obj:`"full"`: A thin SVD of :obj:`X`.
+            2. :obj:`"randomized"`: A randomized SVD with :obj:`niter`
+               power iterations, via :func:`torch.svd_lowrank`.
+            3. :obj:`"streaming"`: The same randomized SVD computed on
+               chunks of :obj:`chunk_size` rows, e.g. of a tensor over a
+               memory-mapped array. Besides one chunk, only
+               :math:`O((N + F) \cdot out\_dim)` buffers are kept.
+
+            (default: :obj:`"full"`)
+        niter (int): The number of power iterations of the randomized
+            methods. (default: :obj:`2`)
+        oversample (int): The number of extra random directions of the
+            randomized methods. (default: :obj:`10`)
+        chunk_size (int): The number of rows per chunk of the
+            :obj:`"streaming"` method. (default: :obj:`65536`)
     """
-    if X.size(-1) > out_dim:
-        U, S, _ = torch.linalg.svd(X)
-        X = torch.mm(U[:, :out_dim], torch.diag(S[:out_dim]))
-    return X
+    if X.size(-1) <= out_dim:
+        return X
+
+    if method == "full":
+        U, S, _ = torch.linalg.svd(X, full_matrices=False)
+    elif method == "randomized":
+        q = min(out_dim + oversample, *X.shape)
+        U, S, _ = torch.svd_lowrank(X, q=q, niter=niter)
+    elif method == "streaming":
+        return _streaming_svd_reduction(X, out_dim, niter, oversample, chunk_size)
+    else:
+        raise ValueError(f"Unknown SVD method '{method}'")
+    return U[:, :out_dim] * S[:out_dim]
+
+
+def _streaming_svd_reduction(
+    X: Tensor,
+    out_dim: int,
+    niter: int,
+    oversample: int,
+    chunk_size: int,
+) -> Tensor:
+    num_rows, num_feats = X.shape
+    device = X.device
+    dtype = X.dtype if X.is_floating_point() else torch.get_default_dtype()
+    q = min(out_dim + oversample, num_rows, num_feats)
+
+    def chunks():
+        for start in range(0, num_rows, chunk_size):
+            yield start, X[start:start + chunk_size].to(device, dtype)
+
+    # Range finder of the row space: Q spans (X^T X)^(niter + 1) Omega.
+    Q = torch.randn(num_feats, q, dtype=dtype, device=device)
+    for _ in range(niter + 1):
+        Q = torch.linalg.qr(Q).Q
+        Z = torch.zeros_like(Q)
+        for _, chunk in chunks():
+            Z += chunk.t() @ (chunk @ Q)
+        Q = Z
+    Q = torch.linalg.qr(Q).Q
+
+    # X ~ (X Q) Q^T, so the top components of X are those of X Q.
+    B = torch.empty(num_rows, q, dtype=dtype, device=device)
+    for start, chunk in chunks():
+        B[start:start + chunk.size(0)] = chunk @ Q
+    U, S, _ = torch.linalg.svd(B, full_matrices=False)
+    return U[:, :out_dim] * S[:out_dim]
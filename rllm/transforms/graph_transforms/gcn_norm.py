@@ -1,12 +1,7 @@
-from functools import lru_cache
-
 from torch import Tensor
 
 from rllm.transforms.graph_transforms import EdgeTransform
-from rllm.transforms.graph_transforms.functional import (
-    add_remaining_self_loops,
-    symmetric_norm,
-)
+from rllm.utils.graph_utils import gcn_norm
 
 
 class GCNNorm(EdgeTransform):
@@ -17,12 +12,13 @@ class GCNNorm(EdgeTransform):
     .. math::
         \mathbf{\hat{A}} = \mathbf{\hat{D}}^{-1/2} (\mathbf{A} + \mathbf{I})
         \mathbf{\hat{D}}^{-1/2}
+
+    The result is cached per adjacency, so normalizing the same adj on
+    every forward pass is free.
     """
 
     def __init__(self):
         pass
 
-    @lru_cache()
     def forward(self, adj: Tensor) -> Tensor:
-        adj = add_remaining_self_loops(adj)
-        return symmetric_norm(adj)
+        return gcn_norm(adj)
@@ -1,12 +1,15 @@
-from typing import Any, Dict
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
-import scipy.sparse as sp
 import torch
 from torch import Tensor
 
 from rllm.transforms.graph_transforms import EdgeTransform
-from rllm.utils.sparse import sparse_mx_to_torch_sparse_tensor
+from rllm.utils._sort import lexsort
+from rllm.utils.graph_utils import normalize_adj
+from rllm.utils.sparse import is_torch_sparse_tensor
 
 
 class GDC(EdgeTransform):
@@ -41,6 +44,18 @@ class GDC(EdgeTransform):
             parameters.
             (default: :obj:`dict(method='threshold', avg_degree=64)`)
 
+        exact (bool, optional): If set to :obj:`False`, the diffusion is
+            approximated on the sparse graph, see
+            :meth:`approx_diffusion_matrix`, and sparsified row by row
+            while it is computed, so no :math:`N \times N` matrix is
+            ever built. (default: :obj:`True`)
+
+        chunk_size (int, optional): The number of rows diffused at once
+            if :obj:`exact=False`. (default: :obj:`1024`)
+
+        num_workers (int, optional): The number of threads processing
+            chunks of rows if :obj:`exact=False`. (default: :obj:`1`)
+
     """
 
     def __init__(
@@ -53,6 +68,9 @@ class GDC(EdgeTransform):
             method="threshold",
             avg_degree=64,
         ),
+        exact: bool = True,
+        chunk_size: int = 1024,
+        num_workers: int = 1,
     ) -> None:
         super().__init__()
         self.self_loop_weight = self_loop_weight
@@ -60,6 +78,9 @@ class GDC(EdgeTransform):
         self.normalize_out = normalize_out
         self.diffusion = diffusion
         self.sparsification = sparsification
+        self.exact = exact
+        self.chunk_size = chunk_size
+        self.num_workers = num_workers
 
     @torch.no_grad()
     def forward(self, adj: Tensor) -> Tensor:
@@ -69,17 +90,23 @@ class GDC(EdgeTransform):
         # 1.get the transition matrix
         trans_matrix = self.get_transition_matrix(adj, self.normalize_in)
 
-        # 2.Sum over T^k, generalized graph diffusion
-        diff_matrix = self.diffusion_matrix(trans_matrix, **self.diffusion)
+        if self.exact:
+            # 2.Sum over T^k, generalized graph diffusion
+            diff_matrix = self.diffusion_matrix(trans_matrix, **self.diffusion)
 
-        # 3.sparsify the graph
-        diff_matrix_sparsified = self.sparsify_matrix(
-            diff_matrix, **self.sparsification
-        )
+            # 3.sparsify the graph
+            diff_matrix_sparsified = self.sparsify_matrix(
+                diff_matrix, **self.sparsification
+            ).to_sparse_coo()
+        else:
+            # 2.&3. diffuse and sparsify chunks of rows
+            diff_matrix_sparsified = self.approx_diffusion_matrix(
+                trans_matrix, **self.diffusion
+            )
 
         # 4.get transition matrix on ~s
         adj = self.get_transition_matrix(
-            diff_matrix_sparsified.to_sparse_coo(), self.normalize_out
+            diff_matrix_sparsified, self.normalize_out
         )
 
         return adj
@@ -89,11 +116,18 @@ class GDC(EdgeTransform):
         adj: Tensor,
         weight: float = 1.0,
     ) -> Tensor:
-        adj = torch.eye(adj.size(0)) * weight + adj
-        indices = torch.nonzero(adj, as_tuple=False)
-        values = adj[indices[:, 0], indices[:, 1]]
-        sparse_tensor = torch.sparse_coo_tensor(indices.t(), values, adj.size())
-        return sparse_tensor
+        if is_torch_sparse_tensor(adj):
+            adj = adj.to_sparse_coo().coalesce()
+        else:
+            adj = adj.to_sparse_coo()
+        indices, values = adj.indices(), adj.values()
+        if not values.is_floating_point():
+            values = values.to(torch.get_default_dtype())
+
+        loop_index = torch.arange(adj.size(0), device=adj.device)
+        indices = torch.cat([indices, loop_index.repeat(2, 1)], dim=1)
+        values = torch.cat([values, values.new_full(loop_index.size(), weight)])
+        return torch.sparse_coo_tensor(indices, values, adj.size()).coalesce()
 
     def get_transition_matrix(
         self,
@@ -111,44 +145,10 @@ class GDC(EdgeTransform):
                 3. :obj:`"row"`: Row-wise normalization
                 4. :obj:`None`: No normalization.
 
+                See :func:`rllm.utils.normalize_adj`.
+
         """
-        adj = adj.coalesce()
-        indices = adj.indices()
-
-        # D
-        adj_data = adj.values()
-        adj_sp = sp.csr_matrix((adj_data, (indices[0], indices[1])), shape=adj.shape)
-
-        if normalize == "sym":
-            # D-1/2
-            deg = np.array(adj_sp.sum(axis=1)).flatten()
-            deg[deg == 0] = 1e-10
-            deg_sqrt_inv = np.power(deg, -0.5)
-            deg_sqrt_inv[deg_sqrt_inv == 100000.0] = 0.0
-            deg_sqrt_inv = sp.diags(deg_sqrt_inv)
-            adj = sp.coo_matrix(deg_sqrt_inv * adj_sp * deg_sqrt_inv)
-
-        elif normalize == "col":
-            deg = np.array(adj_sp.sum(axis=1)).flatten()
-            deg[deg == 0] = 1e-10
-            deg_sqrt_inv = np.power(deg, -1)
-            deg_sqrt_inv[deg_sqrt_inv == float(1e10)] = 0.0
-            deg_sqrt_inv = sp.diags(deg_sqrt_inv)
-            adj = sp.coo_matrix(adj_sp * deg_sqrt_inv)
-
-        elif normalize == "row":
-            deg = np.array(adj_sp.sum(axis=0)).flatten()
-            deg[deg == 0] = 1e-10
-            deg_sqrt_inv = np.power(deg, -1)
-            deg_sqrt_inv[deg_sqrt_inv == float(1e10)] = 0.0
-            deg_sqrt_inv = sp.diags(deg_sqrt_inv)
-            adj = sp.coo_matrix(deg_sqrt_inv * adj_sp)
-
-        elif normalize is None:
-            pass
-        else:
-            pass
-        return sparse_mx_to_torch_sparse_tensor(adj)
+        return normalize_adj(adj, mode=normalize, cached=False)
 
     def diffusion_matrix(  # noqa: D417
         self,
@@ -184,15 +184,133 @@ class GDC(EdgeTransform):
 
         elif method == "heat":
             # exp(t (A - I_n))
-            diff_matrix = self.add_weighted_self_loop(adj, -1)
-            diff_matrix = kwargs["t"] * diff_matrix
-            diff_matrix = diff_matrix.exp()
+            diff_matrix = self.add_weighted_self_loop(adj, -1).to_dense()
+            diff_matrix = torch.linalg.matrix_exp(kwargs["t"] * diff_matrix)
 
         else:
             raise ValueError(f"Exact GDC diffusion '{method}' unknown")
 
         return diff_matrix
 
+    def approx_diffusion_matrix(  # noqa: D417
+        self,
+        adj: Tensor,
+        method: str,
+        **kwargs,
+    ) -> Tensor:
+        r"""Approximate the diffusion of the given sparse graph, sparsified
+        with :obj:`self.sparsification`.
+
+        Rows are computed in chunks of :obj:`chunk_size` seeds on the
+        sparse graph, and each chunk is sparsified before the next one,
+        so memory stays linear in the number of kept entries. Mass below
+        :obj:`eps` is dropped during the computation. For
+        :obj:`"topk"` with :obj:`dim=0`, the rows of the diffusion on the
+        transposed graph are computed and transposed back.
+
+        Args:
+            adj (Tensor): The sparse transition matrix.
+            method (str): Diffusion method:
+
+                1. :obj:`"ppr"`: Use personalized PageRank as diffusion.
+                   Additionally expects the parameters:
+
+                   - **alpha** (*float*) - Return probability in PPR.
+
+                   - **eps** (*float*, optional) - Residual threshold,
+                     relative to the node degree.
+                     (default: :obj:`1e-4`)
+
+                   - **solver** (*str*, optional) - :obj:`"push"` for
+                     the local push method of `"Local Graph Partitioning
+                     using PageRank Vectors"
+                     <https://ieeexplore.ieee.org/document/4031383>`_,
+                     pushing all residuals above the threshold at once,
+                     or :obj:`"power"` for a truncated power iteration.
+                     (default: :obj:`"push"`)
+
+                2. :obj:`"heat"`: Use heat kernel diffusion, by a
+                   truncated power iteration.
+                   Additionally expects the parameters:
+
+                   - **t** (*float*) - Time of diffusion.
+
+                   - **eps** (*float*, optional) - Threshold of dropped
+                     mass. (default: :obj:`1e-4`)
+
+                For both, **num_iters** (*int*, optional) bounds the
+                number of iterations, by default until the remaining
+                coefficients sum to less than :obj:`eps`.
+        """
+        sparsification = dict(self.sparsification)
+        sparse_method = sparsification.pop("method")
+        if sparse_method not in ["threshold", "topk"]:
+            raise ValueError(f"GDC sparsification '{sparse_method}' unknown")
+        transpose = sparse_method == "topk" and sparsification["dim"] == 0
+        if transpose:
+            adj = adj.t()
+
+        num_nodes = adj.size(0)
+        adj = adj.to_sparse_coo().coalesce().to_sparse_csr()
+        csr = (adj.crow_indices(), adj.col_indices(), adj.values())
+        eps = kwargs.get("eps", 1e-4)
+
+        if method == "ppr":
+            alpha = kwargs["alpha"]
+            solver = kwargs.get("solver", "push")
+            if solver not in ["push", "power"]:
+                raise ValueError(f"Approximate PPR solver '{solver}' unknown")
+            num_iters = kwargs.get(
+                "num_iters", math.ceil(math.log(eps) / math.log(1 - alpha))
+            )
+            coeffs = [alpha * (1 - alpha) ** k for k in range(num_iters + 1)]
+        elif method == "heat":
+            solver = "power"
+            coeffs = _heat_coeffs(kwargs["t"], eps, kwargs.get("num_iters"))
+        else:
+            raise ValueError(f"Approximate GDC diffusion '{method}' unknown")
+
+        def diffuse_chunk(start: int) -> Tuple[Tensor, Tensor, Tensor]:
+            seeds = torch.arange(
+                start, min(start + self.chunk_size, num_nodes), device=adj.device
+            )
+            if solver == "push":
+                row, col, value = _push_ppr(seeds, csr, alpha, eps, num_iters)
+            else:
+                row, col, value = _power_diffusion(seeds, csr, coeffs, eps)
+
+            # Sparsify while the chunk is small.
+            if sparse_method == "topk":
+                row, col, value = _topk_per_row(row, col, value, sparsification["k"])
+            elif "eps" in sparsification:
+                mask = value >= sparsification["eps"]
+                row, col, value = row[mask], col[mask], value[mask]
+            return row + start, col, value
+
+        starts = range(0, num_nodes, self.chunk_size)
+        if self.num_workers > 1:
+            with ThreadPoolExecutor(self.num_workers) as executor:
+                chunks = list(executor.map(diffuse_chunk, starts))
+        else:
+            chunks = [diffuse_chunk(start) for start in starts]
+
+        row = torch.cat([chunk[0] for chunk in chunks])
+        col = torch.cat([chunk[1] for chunk in chunks])
+        value = torch.cat([chunk[2] for chunk in chunks])
+
+        if sparse_method == "threshold" and "eps" not in sparsification:
+            threshold = self.__calculate_eps__(
+                value, sparsification["avg_degree"], num_nodes
+            )
+            mask = value >= threshold
+            row, col, value = row[mask], col[mask], value[mask]
+
+        if transpose:
+            row, col = col, row
+        return torch.sparse_coo_tensor(
+            torch.stack([row, col]), value, (num_nodes, num_nodes)
+        ).coalesce()
+
     def sparsify_matrix(  # noqa: D417
         self,
         mx: Tensor,
@@ -258,19 +376,151 @@ class GDC(EdgeTransform):
         self,
         adj: Tensor,
         avg_degree: int,
+        num_nodes: Optional[int] = None,
     ) -> float:
         r"""Get threshold necessary to achieve a given average degree.
 
         Args:
-            adj (Tensor): The adjacency matrix.
+            adj (Tensor): The adjacency matrix, or the edge weights.
             avg_degree (int): Target average degree.
+            num_nodes (int, optional): Number of nodes, by default
+                :obj:`adj.size(0)`.
 
         """
+        num_nodes = adj.size(0) if num_nodes is None else num_nodes
         edge_weights = adj.flatten()
         sorted_edges = torch.sort(edge_weights.flatten(), descending=True).values
-        if avg_degree * adj.size(0) > len(sorted_edges):
+        if avg_degree * num_nodes >= len(sorted_edges):
             return -np.inf
 
-        left = sorted_edges[avg_degree * adj.size(0) - 1]
-        right = sorted_edges[avg_degree * adj.size(0)]
+        left = sorted_edges[avg_degree * num_nodes - 1]
+        right = sorted_edges[avg_degree * num_nodes]
         return float(left + right) / 2.0
+
+
+def _coalesce(
+    row: Tensor, col: Tensor, value: Tensor, size: Tuple[int, int]
+) -> Tuple[Tensor, Tensor, Tensor]:
+    out = torch.sparse_coo_tensor(torch.stack([row, col]), value, size).coalesce()
+    row, col = out.indices()
+    return row, col, out.values()
+
+
+def _spread(
+    row: Tensor,
+    col: Tensor,
+    value: Tensor,
+    csr: Tuple[Tensor, Tensor, Tensor],
+    num_rows: int,
+) -> Tuple[Tensor, Tensor, Tensor]:
+    r"""One step of the rows :obj:`(row, col, value)` times the transition
+    matrix :obj:`csr`, gathering the out-edges of every entry."""
+    crow, ccol, cval = csr
+    start = crow[col]
+    count = crow[col + 1] - start
+    entry = torch.repeat_interleave(count)
+    offset = torch.arange(entry.numel(), device=row.device)
+    offset -= (count.cumsum(0) - count)[entry]
+    edge = start[entry] + offset
+    size = (num_rows, crow.numel() - 1)
+    return _coalesce(row[entry], ccol[edge], value[entry] * cval[edge], size)
+
+
+def _push_ppr(
+    seeds: Tensor,
+    csr: Tuple[Tensor, Tensor, Tensor],
+    alpha: float,
+    eps: float,
+    num_iters: int,
+) -> Tuple[Tensor, Tensor, Tensor]:
+    r"""Approximate PPR rows of :obj:`seeds` by pushing, for all seeds at
+    once, every residual above :obj:`eps` times the node degree."""
+    crow = csr[0]
+    deg = (crow[1:] - crow[:-1]).clamp(min=1).to(csr[2].dtype)
+    row = torch.arange(seeds.numel(), device=seeds.device)
+    col = seeds
+    value = torch.ones(seeds.numel(), dtype=csr[2].dtype, device=seeds.device)
+
+    # Local push converges within ~log(eps) / log(1 - alpha) rounds, the
+    # bound is only a safeguard.
+    out: List[Tuple[Tensor, Tensor, Tensor]] = []
+    for _ in range(10 * max(num_iters, 1)):
+        mask = value >= eps * deg[col]
+        if not bool(mask.any()):
+            break
+        out.append((row[mask], col[mask], alpha * value[mask]))
+        pushed = _spread(
+            row[mask], col[mask], (1 - alpha) * value[mask], csr, seeds.numel()
+        )
+        mask = ~mask
+        row = torch.cat([row[mask], pushed[0]])
+        col = torch.cat([col[mask], pushed[1]])
+        value = torch.cat([value[mask], pushed[2]])
+        row, col, value = _coalesce(row, col, value, (seeds.numel(), deg.numel()))
+
+    if len(out) == 0:
+        return row[:0], col[:0], value[:0]
+    return _coalesce(
+        torch.cat([o[0] for o in out]),
+        torch.cat([o[1] for o in out]),
+        torch.cat([o[2] for o in out]),
+        (seeds.numel(), deg.numel()),
+    )
+
+
+def _power_diffusion(
+    seeds: Tensor,
+    csr: Tuple[Tensor, Tensor, Tensor],
+    coeffs: List[float],
+    eps: float,
+) -> Tuple[Tensor, Tensor, Tensor]:
+    r"""Approximate the rows of :obj:`seeds` of
+    :math:`\sum_k \theta_k \mathbf{T}^k` by a truncated power iteration,
+    dropping walk probabilities below :obj:`eps` after every step."""
+    size = (seeds.numel(), csr[0].numel() - 1)
+    row = torch.arange(seeds.numel(), device=seeds.device)
+    col = seeds
+    value = torch.ones(seeds.numel(), dtype=csr[2].dtype, device=seeds.device)
+
+    out = [(row, col, coeffs[0] * value)]
+    for coeff in coeffs[1:]:
+        row, col, value = _spread(row, col, value, csr, seeds.numel())
+        mask = value.abs() >= eps
+        row, col, value = row[mask], col[mask], value[mask]
+        if row.numel() == 0:
+            break
+        out.append((row, col, coeff * value))
+
+    return _coalesce(
+        torch.cat([o[0] for o in out]),
+        torch.cat([o[1] for o in out]),
+        torch.cat([o[2] for o in out]),
+        size,
+    )
+
+
+def _heat_coeffs(t: float, eps: float, num_iters: Optional[int]) -> List[float]:
+    r"""Poisson weights :math:`e^{-t} t^k / k!` of the heat kernel, up to
+    :obj:`num_iters` or until the tail is below :obj:`eps`."""
+    coeffs = [math.exp(-t)]
+    while True:
+        if num_iters is not None:
+            if len(coeffs) > num_iters:
+                break
+        elif 1 - sum(coeffs) < eps:
+            break
+        coeffs.append(coeffs[-1] * t / len(coeffs))
+    return coeffs
+
+
+def _topk_per_row(
+    row: Tensor, col: Tensor, value: Tensor, k: int
+) -> Tuple[Tensor, Tensor, Tensor]:
+    r"""Keep the :obj:`k` largest entries of every row."""
+    perm = lexsort([-value, row])
+    row, col, value = row[perm], col[perm], value[perm]
+    count = torch.bincount(row)
+    rank = torch.arange(row.numel(), device=row.device)
+    rank -= (count.cumsum(0) - count)[row]
+    mask = rank < k
+    return row[mask], col[mask], value[mask]
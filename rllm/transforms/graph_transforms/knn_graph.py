@@ -31,6 +31,14 @@ class KNNGraph(EdgeTransform):  # TODO: add force_undirected option.
         include_self (bool, optinal):
             If set to True, the graph will contain self-loops. (default: False)
         n_jobs (int): Number of workers to use for computation. (default: 1)
+        backend (str[`exact`, `approx`, `sklearn`], optional):
+            The search backend, see
+            :func:`~rllm.transforms.graph_transforms.functional.knn_graph`.
+            (default: None)
+        batch_size (int, optional): The number of query rows per block
+            of the `exact` backend. (default: None)
+        approx_params (dict, optional): Keyword arguments of the `approx`
+            backend. (default: None)
     """
 
     def __init__(
@@ -42,6 +50,9 @@ class KNNGraph(EdgeTransform):  # TODO: add force_undirected option.
         metric_params: Optional[dict] = None,
         include_self: Optional[bool] = False,
         n_jobs: int = 1,
+        backend: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        approx_params: Optional[dict] = None,
     ):
         self.num_neighbors = num_neighbors
         self.mode = mode
@@ -50,6 +61,9 @@ class KNNGraph(EdgeTransform):  # TODO: add force_undirected option.
         self.metric_params = metric_params
         self.include_self = include_self
         self.n_jobs = n_jobs
+        self.backend = backend
+        self.batch_size = batch_size
+        self.approx_params = approx_params
 
     @lru_cache()
     def forward(self, x: Tensor) -> Tensor:
@@ -62,5 +76,8 @@ class KNNGraph(EdgeTransform):  # TODO: add force_undirected option.
             self.metric_params,
             self.include_self,
             self.n_jobs,
+            backend=self.backend,
+            batch_size=self.batch_size,
+            approx_params=self.approx_params,
         )
         return knn_adj
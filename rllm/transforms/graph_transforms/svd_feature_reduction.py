@@ -13,14 +13,39 @@ class SVDFeatureReduction(NodeTransform):
     Args:
         out_dim (int): The dimensionlity of node features after
             reduction.
+        method (str): :obj:`"full"`, :obj:`"randomized"` or
+            :obj:`"streaming"`, see
+            :func:`~rllm.transforms.graph_transforms.functional.svd_feature_reduction`.
+            (default: :obj:`"full"`)
+        niter (int): The number of power iterations of the randomized
+            methods. (default: :obj:`2`)
+        oversample (int): The number of extra random directions of the
+            randomized methods. (default: :obj:`10`)
+        chunk_size (int): The number of rows per chunk of the
+            :obj:`"streaming"` method. (default: :obj:`65536`)
     """
 
     def __init__(
         self,
         out_dim: int,
+        method: str = "full",
+        niter: int = 2,
+        oversample: int = 10,
+        chunk_size: int = 65536,
     ):
         self.out_dim = out_dim
+        self.method = method
+        self.niter = niter
+        self.oversample = oversample
+        self.chunk_size = chunk_size
 
     @lru_cache()
     def forward(self, x: Tensor) -> Tensor:
-        return svd_feature_reduction(x, self.out_dim)
+        return svd_feature_reduction(
+            x,
+            self.out_dim,
+            method=self.method,
+            niter=self.niter,
+            oversample=self.oversample,
+            chunk_size=self.chunk_size,
+        )
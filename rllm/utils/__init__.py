@@ -8,15 +8,21 @@ from .sparse import (
 )
 from .undirected import is_undirected, to_undirected
 from .seg_reduce import (
+    seg_reduce,
     seg_sum,
     seg_softmax,
     seg_softmax_,
+    seg_logsumexp,
 )
 
 from .graph_utils import (
     adj2edge_index,
     sort_edge_index,
     index2ptr,
+    sample_per_segment,
+    sample_edges_per_node,
+    normalize_adj,
+    gcn_norm,
     _to_csc
 )
 
@@ -36,11 +42,17 @@ __all__ = [
     'set_values',
     "adj2edge_index",
     "_to_csc",
+    "seg_reduce",
     "seg_sum",
     'seg_softmax',
     'seg_softmax_',
+    "seg_logsumexp",
     "sort_edge_index",
     "index2ptr",
+    "sample_per_segment",
+    "sample_edges_per_node",
+    "normalize_adj",
+    "gcn_norm",
     "lexsort",
     "remap_keys",
     "CastMixin",
@@ -0,0 +1,64 @@
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable
+
+import torch
+from torch import Tensor
+
+
+def _is_compiling() -> bool:
+    r"""Whether the code is being traced by `torch.compile`."""
+    compiler = getattr(torch, "compiler", None)
+    if compiler is not None and hasattr(compiler, "is_compiling"):
+        return compiler.is_compiling()
+    return False
+
+
+class EdgeFormatCache:
+    r"""A bounded cache for edge format conversions, e.g. sparse adj to
+    edge_index. Entries are keyed on the identity and the version counter
+    of the input tensor, so an in-place update or a new adjacency is a
+    miss, and inputs are only weakly referenced, so the cache never keeps
+    an adjacency alive by itself.
+
+    Inference tensors have no version counter and conversions made under
+    :func:`torch.inference_mode` would be unusable by autograd later, so
+    both bypass the cache.
+
+    Args:
+        maxsize (int): The maximum number of cached conversions.
+            (default: :obj:`16`)
+    """
+
+    def __init__(self, maxsize: int = 16):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(
+        self,
+        tensor: Tensor,
+        func: Callable[[Tensor], Any],
+        tag: Any = None,
+    ) -> Any:
+        r"""Return `func(tensor)`, computed at most once per tensor version.
+        `tag` tells apart different conversions of the same tensor.
+        """
+        if _is_compiling() or tensor.is_inference():
+            return func(tensor)
+
+        key = (id(tensor), getattr(tensor, "_version", 0), tag)
+        entry = self._data.get(key, None)
+        if entry is not None and entry[0]() is tensor:
+            self._data.move_to_end(key)
+            return entry[1]
+
+        out = func(tensor)
+        if torch.is_inference_mode_enabled():
+            return out
+        self._data[key] = (weakref.ref(tensor), out)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return out
+
+    def clear(self) -> None:
+        self._data.clear()
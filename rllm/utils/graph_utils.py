@@ -6,7 +6,13 @@ import numpy as np
 import scipy.sparse as sp
 
 from rllm.utils._sort import lexsort
-from rllm.utils.sparse import is_torch_sparse_tensor, sparse_mx_to_torch_sparse_tensor
+from rllm.utils._cache import EdgeFormatCache
+from rllm.utils.seg_reduce import _ptr2index
+from rllm.utils.sparse import (
+    is_torch_sparse_tensor,
+    set_values,
+    sparse_mx_to_torch_sparse_tensor,
+)
 
 # Filter the csr warning
 import warnings
@@ -117,7 +123,149 @@ def construct_graph(
     return sparse_mx_to_torch_sparse_tensor(adj_sp).to(device)
 
 
-def gcn_norm(adj: Tensor):
+def _split_sparse(adj: Tensor) -> Tuple[Tensor, Tensor, Tensor]:
+    r"""Return the row, col and values of a sparse adj, in storage order."""
+    if adj.layout == torch.sparse_coo:
+        row, col = adj.indices()
+    elif adj.layout == torch.sparse_csr:
+        col = adj.col_indices()
+        row = _ptr2index(adj.crow_indices(), col.numel())
+    elif adj.layout == torch.sparse_csc:
+        row = adj.row_indices()
+        col = _ptr2index(adj.ccol_indices(), row.numel())
+    else:
+        raise ValueError(f"Unsupported sparse tensor layout: {adj.layout}")
+    return row, col, adj.values()
+
+
+def _inv_deg(deg: Tensor, power: float) -> Tensor:
+    deg_inv = deg.pow(power)
+    return deg_inv.masked_fill_(torch.isinf(deg_inv), 0.0)
+
+
+def _norm_adj(
+    adj: Tensor,
+    mode: Optional[str],
+    self_loop_weight: Optional[float],
+) -> Tensor:
+    if mode not in ("sym", "row", "col", None):
+        raise ValueError(f"Unknown normalization mode: {mode}")
+
+    if not is_torch_sparse_tensor(adj):
+        if not adj.is_floating_point():
+            adj = adj.to(torch.get_default_dtype())
+        if self_loop_weight is not None:
+            adj = adj.clone()
+            adj.fill_diagonal_(self_loop_weight)
+        if mode == "sym":
+            row_inv = _inv_deg(adj.sum(dim=1), -0.5)
+            col_inv = row_inv
+            if adj.size(0) != adj.size(1):
+                col_inv = _inv_deg(adj.sum(dim=0), -0.5)
+            return row_inv.view(-1, 1) * adj * col_inv.view(1, -1)
+        if mode == "row":
+            return _inv_deg(adj.sum(dim=1), -1.0).view(-1, 1) * adj
+        if mode == "col":
+            return adj * _inv_deg(adj.sum(dim=0), -1.0).view(1, -1)
+        return adj
+
+    layout = adj.layout
+    num_rows, num_cols = adj.shape[0], adj.shape[1]
+    if layout == torch.sparse_coo:
+        adj = adj.coalesce()
+    row, col, value = _split_sparse(adj)
+    if not value.is_floating_point():
+        value = value.to(torch.get_default_dtype())
+
+    if self_loop_weight is not None:
+        # Same as `add_remaining_self_loops`, the result is rebuilt below.
+        mask = row != col
+        loop = torch.arange(min(num_rows, num_cols), device=row.device)
+        row = torch.cat([row[mask], loop])
+        col = torch.cat([col[mask], loop])
+        value = torch.cat([value[mask], value.new_full(loop.size(), self_loop_weight)])
+
+    if mode == "sym":
+        deg = value.new_zeros(num_rows).index_add_(0, row, value)
+        row_inv = _inv_deg(deg, -0.5)
+        if num_rows == num_cols:
+            col_inv = row_inv
+        else:
+            deg = value.new_zeros(num_cols).index_add_(0, col, value)
+            col_inv = _inv_deg(deg, -0.5)
+        value = row_inv[row] * value * col_inv[col]
+    elif mode == "row":
+        deg = value.new_zeros(num_rows).index_add_(0, row, value)
+        value = _inv_deg(deg, -1.0)[row] * value
+    elif mode == "col":
+        deg = value.new_zeros(num_cols).index_add_(0, col, value)
+        value = value * _inv_deg(deg, -1.0)[col]
+
+    if self_loop_weight is not None:
+        out = torch.sparse_coo_tensor(
+            torch.stack([row, col]), value, adj.shape
+        ).coalesce()
+        if layout == torch.sparse_csr:
+            out = out.to_sparse_csr()
+        elif layout == torch.sparse_csc:
+            out = out.to_sparse_csc()
+        return out
+
+    # Same pattern, reuse the index tensors of the input.
+    if layout == torch.sparse_coo:
+        return torch.sparse_coo_tensor(
+            adj.indices(), value, adj.shape, is_coalesced=True
+        )
+    return set_values(adj, value)
+
+
+# Shared by all callers, so an adj is normalized once per version.
+_norm_cache = EdgeFormatCache()
+
+
+def normalize_adj(
+    adj: Tensor,
+    mode: Optional[str] = "sym",
+    self_loop_weight: Optional[float] = None,
+    cached: bool = True,
+) -> Tensor:
+    r"""Normalize an adjacency matrix on its own device.
+
+    The degrees are weighted by the edge values and computed with
+    `index_add`, the output keeps the layout (dense, `torch.sparse_coo`,
+    `torch.sparse_csr` or `torch.sparse_csc`) and floating dtype of the
+    input, and zero degrees are scaled to zero.
+
+    Args:
+        adj (Tensor): The adjacency matrix.
+        mode (str, optional): The normalization scheme:
+
+            1. :obj:`"sym"`: :math:`\mathbf{D}^{-1/2} \mathbf{A}
+               \mathbf{D}^{-1/2}`, with row degrees.
+            2. :obj:`"row"`: :math:`\mathbf{D}^{-1} \mathbf{A}`,
+               with row degrees.
+            3. :obj:`"col"`: :math:`\mathbf{A} \mathbf{D}^{-1}`,
+               with column degrees.
+            4. :obj:`None`: No normalization.
+
+            (default: :obj:`"sym"`)
+        self_loop_weight (float, optional): If set, replace the self-loops
+            of :obj:`adj` by loops of this weight before normalizing.
+            (default: :obj:`None`)
+        cached (bool): If set to `True`, the result is cached for the
+            identity and version of :obj:`adj`, so normalizing the same
+            adj again is free. (default: :obj:`True`)
+    """
+    if not cached:
+        return _norm_adj(adj, mode, self_loop_weight)
+    return _norm_cache.get(
+        adj,
+        lambda adj: _norm_adj(adj, mode, self_loop_weight),
+        tag=("norm", mode, self_loop_weight),
+    )
+
+
+def gcn_norm(adj: Tensor, add_self_loops: bool = True, cached: bool = True):
     r"""Normalize the sparse adjacency matrix from the `"Semi-supervised
     Classification with Graph Convolutional Networks"
     <https://arxiv.org/abs/1609.02907>`__ .
@@ -130,39 +278,16 @@ def gcn_norm(adj: Tensor):
         adj (Tensor): the sparse adjacency matrix,
             whose layout could be `torch.sparse_coo`, `torch.sparse_csr`
             and `torch.sparse_csc`.
+        add_self_loops (bool): If set to `False`, normalize
+            :math:`\mathbf{A}` as is. (default: :obj:`True`)
+        cached (bool): See :func:`normalize_adj`. (default: :obj:`True`)
     """
-    shape = adj.shape
-    device = adj.device
-
-    if is_torch_sparse_tensor(adj):
-        adj = adj.coalesce()
-        indices = adj.indices()
-
-        mask = indices[0] != indices[1]
-        loop_index = torch.arange(0, shape[0], dtype=torch.long, device=device)
-        loop_index = loop_index.unsqueeze(0).repeat(2, 1)
-
-        indices_sl = torch.cat([indices[:, mask], loop_index], dim=1)
-        indices = indices[:, mask]
-
-        # D
-        adj_data = np.ones([indices.shape[1]], dtype=np.float32)
-        adj_sp = sp.csr_matrix((adj_data, (indices[0], indices[1])), shape=shape)
-
-        adj_sl_data = np.ones([indices_sl.shape[1]], dtype=np.float32)
-        adj_sl_sp = sp.csr_matrix(
-            (adj_sl_data, (indices_sl[0], indices_sl[1])), shape=shape
-        )
-
-        # D-1/2
-        deg = np.array(adj_sl_sp.sum(axis=1)).flatten()
-        deg_sqrt_inv = np.power(deg, -0.5)
-        deg_sqrt_inv[deg_sqrt_inv == float("inf")] = 0.0
-        deg_sqrt_inv = sp.diags(deg_sqrt_inv)
-
-        # filters
-        filters = sp.coo_matrix(deg_sqrt_inv * adj_sp * deg_sqrt_inv)
-        return sparse_mx_to_torch_sparse_tensor(filters).to(device)
+    return normalize_adj(
+        adj,
+        mode="sym",
+        self_loop_weight=1.0 if add_self_loops else None,
+        cached=cached,
+    )
 
 
 def sort_edge_index(
@@ -238,6 +363,78 @@ def index2ptr(index: Tensor, num_nodes: Optional[int] = None) -> Tensor:
     return ptr.cumsum(0)
 
 
+def sample_per_segment(
+    segment_ids: Tensor,
+    k: int,
+    num_segs: Optional[int] = None,
+    generator: Optional[torch.Generator] = None,
+) -> Tensor:
+    r"""Randomly select up to `k` elements of every segment, i.e. a
+    segment-wise top-k over random keys. All segments are handled by
+    a single sort, in `O(N log N)` for `N` elements.
+
+    Args:
+        segment_ids (Tensor): A one-dimensional tensor that indicates the
+            segment of every element.
+        k (int): The maximum number of elements kept per segment.
+        num_segs (int, optional): Total segments. Inferred from
+            `segment_ids` if None. (default: `None`)
+        generator (torch.Generator, optional): The random generator.
+            (default: `None`)
+
+    Returns:
+        mask: A boolean tensor of the shape of `segment_ids`, set for the
+        selected elements.
+
+    Example:
+        >>> segment_ids = torch.tensor([0, 0, 0, 1, 2, 2])
+        >>> sample_per_segment(segment_ids, 2).sum()
+        tensor(5)
+    """
+    num_elems = segment_ids.numel()
+    device = segment_ids.device
+    if num_segs is None:
+        num_segs = int(segment_ids.max()) + 1 if num_elems > 0 else 0
+    keys = torch.rand(num_elems, generator=generator, device=device)
+    # Sort by segment, then by the random key.
+    perm = lexsort([keys, segment_ids])
+    sorted_ids = segment_ids[perm]
+    ptr = index2ptr(sorted_ids, num_segs)
+    rank = torch.arange(num_elems, device=device) - ptr[sorted_ids]
+    mask = torch.zeros(num_elems, dtype=torch.bool, device=device)
+    mask[perm[rank < k]] = True
+    return mask
+
+
+def sample_edges_per_node(
+    edge_index: Tensor,
+    max_degree: int,
+    num_nodes: Optional[int] = None,
+    generator: Optional[torch.Generator] = None,
+) -> Tensor:
+    r"""Cap the degree of an undirected edge list. Every node randomly
+    keeps up to `max_degree` of its incident edges, and an edge is kept
+    if either of its endpoints keeps it.
+
+    Args:
+        edge_index (Tensor): The edges of shape `(2, E)`, each undirected
+            edge listed once.
+        max_degree (int): The maximum number of edges each node keeps.
+        num_nodes (int, optional): The number of nodes.
+            If None, infer from edge_index. (default: `None`)
+        generator (torch.Generator, optional): The random generator.
+            (default: `None`)
+
+    Returns:
+        mask: A boolean tensor of shape `(E,)`, set for the kept edges.
+    """
+    num_edges = edge_index.size(1)
+    keep = sample_per_segment(
+        edge_index.reshape(-1), max_degree, num_nodes, generator=generator
+    )
+    return keep[:num_edges] | keep[num_edges:]
+
+
 def _to_csc(
     input: Tensor,
     device: Optional[torch.device] = None,
@@ -1,8 +1,83 @@
+from typing import Optional
+
 import torch
 from torch import Tensor
 
 
-def seg_sum(data: Tensor, segment_ids: Tensor, num_segments: int):
+def _ptr2index(ptr: Tensor, num_elems: int) -> Tensor:
+    r"""Expand a sorted `ptr` of shape `(S + 1,)` to segment ids."""
+    deg = ptr[1:] - ptr[:-1]
+    return torch.repeat_interleave(
+        torch.arange(deg.numel(), device=ptr.device), deg, output_size=num_elems
+    )
+
+
+def _broadcast(src: Tensor, ref: Tensor) -> Tensor:
+    return src.view((-1,) + (1,) * (ref.dim() - 1))
+
+
+def seg_reduce(
+    data: Tensor,
+    segment_ids: Optional[Tensor] = None,
+    num_segs: Optional[int] = None,
+    reduce: str = "sum",
+    ptr: Optional[Tensor] = None,
+) -> Tensor:
+    r"""Reduces the elements of `data` along the first dimension within
+    each segment. The result keeps the dtype of `data` and supports
+    autograd.
+
+    If `ptr` is given, `data` must be sorted by segment and the reduction
+    runs directly on the segment offsets by :func:`torch.segment_reduce`.
+    Otherwise, `segment_ids` is scattered with a one-dimensional index,
+    so no index of the shape of `data` is ever expanded.
+
+    Args:
+        data (Tensor): A tensor of shape `(E, *)`.
+        segment_ids (Tensor, optional): A one-dimensional tensor that
+            indicates the segment of every element of `data`.
+            (default: `None`)
+        num_segs (int, optional): Total segments. Inferred from `ptr` or
+            `segment_ids` if None. (default: `None`)
+        reduce (str): The reduction, one of `"sum"`, `"mean"`, `"max"`
+            and `"min"`. Empty segments give zero. (default: `"sum"`)
+        ptr (Tensor, optional): The sorted offsets of shape
+            `(num_segs + 1,)`. (default: `None`)
+
+    Returns:
+        output: Tensor of shape `(num_segs, *)`.
+    """
+    assert reduce in ("sum", "mean", "max", "min"), f"Unknown reduce {reduce}."
+    if ptr is not None:
+        out = torch.segment_reduce(data, reduce, offsets=ptr, axis=0, unsafe=True)
+        if reduce != "sum":
+            # `mean` gives nan and `max`/`min` give -inf/inf for empty segments.
+            empty = _broadcast((ptr[1:] - ptr[:-1]) == 0, out)
+            out = out.masked_fill(empty, 0)
+        return out
+
+    assert segment_ids is not None, "Either `segment_ids` or `ptr` is required."
+    if num_segs is None:
+        num_segs = int(segment_ids.max()) + 1 if segment_ids.numel() > 0 else 0
+    out = data.new_zeros((num_segs,) + tuple(data.shape[1:]))
+    if reduce in ("sum", "mean"):
+        out = out.index_add(0, segment_ids, data)
+        if reduce == "mean":
+            count = torch.bincount(segment_ids, minlength=num_segs)
+            out = out / _broadcast(count.clamp(min=1).to(data.dtype), out)
+        return out
+    return out.index_reduce(
+        0, segment_ids, data, "amax" if reduce == "max" else "amin",
+        include_self=False
+    )
+
+
+def seg_sum(
+    data: Tensor,
+    segment_ids: Optional[Tensor],
+    num_segments: Optional[int] = None,
+    ptr: Optional[Tensor] = None,
+):
     r"""Computes the sum of elements in `data` for each segment
     specified by `segment_ids`.
 
@@ -11,64 +86,103 @@ def seg_sum(data: Tensor, segment_ids: Tensor, num_segments: int):
         segment_ids (Tensor): A one-dimensional tensor that indicates the
             segmentation in data.
         num_segments (int): Total segments.
+        ptr (Tensor, optional): The sorted segment offsets, see
+            :func:`seg_reduce`. (default: `None`)
 
     Returns:
-        output: sum calculated by segment_ids with the same shape as data.
+        output: sum calculated by segment_ids, of shape
+        `(num_segments, *)`.
     """
-    output = torch.zeros(
-        (num_segments, data.size(1)), device=data.device, dtype=data.dtype
-    )
-    return torch.scatter_reduce(
-        output,
-        dim=0,
-        index=segment_ids.unsqueeze(1).expand(-1, data.size(1)),
-        src=data,
-        reduce="sum",
-    )
+    return seg_reduce(data, segment_ids, num_segments, reduce="sum", ptr=ptr)
+
 
+def seg_logsumexp(
+    data: Tensor,
+    segment_ids: Optional[Tensor],
+    num_segs: Optional[int] = None,
+    ptr: Optional[Tensor] = None,
+):
+    r"""Computes the log-sum-exp of elements in `data` for each segment
+    specified by `segment_ids`. Empty segments give `-inf`.
 
-def seg_softmax(data: Tensor, segment_ids: Tensor, num_segs: int):
+    Args:
+        data (Tensor): A tensor, typically two-dimensional.
+        segment_ids (Tensor): A one-dimensional tensor that indicates the
+            segmentation in data.
+        num_segs (int): Total segments.
+        ptr (Tensor, optional): The sorted segment offsets, see
+            :func:`seg_reduce`. (default: `None`)
+
+    Returns:
+        output: log-sum-exp of shape `(num_segs, *)`.
+    """
+    if segment_ids is None:
+        segment_ids = _ptr2index(ptr, data.size(0))
+    with torch.no_grad():
+        # The shift cancels out, so it needs no gradient.
+        max_values = seg_reduce(data, segment_ids, num_segs, "max", ptr)
+    exp = torch.exp(data - max_values[segment_ids])
+    out = seg_reduce(exp, segment_ids, num_segs, "sum", ptr)
+    return torch.log(out) + max_values
+
+
+class SegSoftmax(torch.autograd.Function):
+    r"""Segment softmax, which saves only its output for backward."""
+
+    @staticmethod
+    def forward(ctx, data, segment_ids, num_segs, ptr):
+        max_values = seg_reduce(data, segment_ids, num_segs, "max", ptr)
+        out = torch.exp(data - max_values[segment_ids])
+        denominator = seg_reduce(out, segment_ids, num_segs, "sum", ptr)
+        # Non-empty segments hold `exp(0) = 1`, so no epsilon is needed.
+        out = (out / denominator[segment_ids]).to(data.dtype)
+        ctx.save_for_backward(out, segment_ids)
+        ctx.num_segs = num_segs
+        ctx.ptr = ptr
+        return out
+
+    @staticmethod
+    def backward(ctx, grad_out):
+        out, segment_ids = ctx.saved_tensors
+        dot = seg_reduce(grad_out * out, segment_ids, ctx.num_segs, "sum", ctx.ptr)
+        return out * (grad_out - dot[segment_ids]), None, None, None
+
+
+def seg_softmax(
+    data: Tensor,
+    segment_ids: Optional[Tensor],
+    num_segs: Optional[int] = None,
+    ptr: Optional[Tensor] = None,
+):
     r"""Computes the softmax scores of elements in `data` for each segment
     specified by `segment_ids`.
 
+    Only the scores are saved for backward, and the scores keep the
+    dtype of `data`, e.g. under fp16/bf16 autocast.
+
     Args:
         data (Tensor): A tensor, typically two-dimensional.
         segment_ids (Tensor): A one-dimensional tensor that indicates the
             segmentation in data.
         num_segments (int): Total segments.
+        ptr (Tensor, optional): The sorted segment offsets, see
+            :func:`seg_reduce`. If given, `segment_ids` may be None.
+            (default: `None`)
 
     Returns:
         score: softmax score, which has the same shape as data.
     """
-    max_values = torch.zeros(
-        num_segs, data.size(1), device=data.device, dtype=data.dtype
-    )
-    max_values = torch.scatter_reduce(
-        max_values,
-        dim=0,
-        index=segment_ids.unsqueeze(1).expand(-1, data.size(1)),
-        src=data,
-        reduce="amax",
-    )
-    gathered_max_values = max_values[segment_ids]
-    exp = torch.exp(data - gathered_max_values)
-
-    denominator = torch.zeros(num_segs, data.size(1), device=data.device)
-    denominator = torch.scatter_reduce(
-        denominator,
-        dim=0,
-        index=segment_ids.unsqueeze(1).expand(-1, data.size(1)),
-        src=exp,
-        reduce="sum",
-    )
-    gathered_denominator = denominator[segment_ids]
-    score = exp / (gathered_denominator + 1e-16)
-    return score
+    if segment_ids is None:
+        segment_ids = _ptr2index(ptr, data.size(0))
+    if num_segs is None and ptr is None:
+        num_segs = int(segment_ids.max()) + 1 if segment_ids.numel() > 0 else 0
+    return SegSoftmax.apply(data, segment_ids, num_segs, ptr)
 
 
 def seg_softmax_(data: Tensor, segment_ids: Tensor, num_segs: int):
     r"""Computes the softmax scores of elements in `data` for each segment
-    specified by `segment_ids`.
+    specified by `segment_ids`, one segment at a time. A slow reference
+    for :func:`seg_softmax`.
 
     Args:
         data (Tensor): A tensor, typically two-dimensional.
@@ -0,0 +1,69 @@
+import pandas as pd
+import torch
+
+from rllm.data import (
+    fkey_to_index,
+    relation_to_edge_index,
+    build_homo_graph,
+    build_hetero_graph,
+)
+
+
+def test_fkey_to_index():
+    index = fkey_to_index([30, 10, 40], pkeys=[10, 20, 30])
+    assert torch.equal(index, torch.tensor([2, 0, -1]))
+
+
+def test_relation_to_edge_index():
+    df = pd.DataFrame({"UserID": [1, 2, 9], "MovieID": [20, 10, 10]})
+    edge_index = relation_to_edge_index(
+        df, "UserID", "MovieID", src_pkeys=[1, 2], tgt_pkeys=[10, 20]
+    )
+    assert torch.equal(edge_index, torch.tensor([[0, 1], [1, 0]]))
+
+
+def test_build_homo_graph():
+    df_1 = pd.DataFrame({"src": [0, 0, 0, 1], "tgt": [2, 3, 4, 2]})
+    df_2 = pd.DataFrame({"src": [1], "tgt": [4]})
+    graph = build_homo_graph([df_1, df_2], n_all=5)
+    adj = graph.adj.to_dense()
+    assert graph.num_nodes == 5
+    assert int(adj.sum()) == 10
+    assert torch.equal(adj, adj.t())
+
+    generator = torch.Generator().manual_seed(0)
+    graph = build_homo_graph(
+        [df_1, df_2], n_all=5, edge_per_node=1, generator=generator
+    )
+    adj = graph.adj.to_dense()
+    assert torch.equal(adj, adj.t())
+    # Node 3 keeps its only edge, whatever node 0 keeps.
+    assert adj[0, 3] == 1
+    assert bool((adj.sum(dim=1) >= 1).all())
+
+
+def test_build_hetero_graph():
+    rates = pd.DataFrame({"user": [0, 0, 0, 1], "movie": [0, 1, 2, 2]})
+    follows = torch.tensor([[0, 1], [1, 0]])
+    data = build_hetero_graph(
+        {("user", "rates", "movie"): rates, ("user", "follows", "user"): follows},
+        num_nodes_dict={"user": 2, "movie": 3},
+        x_dict={"movie": torch.randn(3, 4)},
+    )
+    assert data["user"].num_nodes == 2
+    assert data["movie"].x.shape == (3, 4)
+    adj = data["user", "rates", "movie"].adj
+    assert adj.shape == (2, 3) and adj._nnz() == 4
+    rev = data["movie", "rev_rates", "user"].adj
+    assert torch.equal(rev.to_dense(), adj.to_dense().t())
+    assert data["user", "follows", "user"].adj.shape == (2, 2)
+
+    data = build_hetero_graph(
+        {("user", "rates", "movie"): rates},
+        num_nodes_dict={"user": 2, "movie": 3},
+        edge_per_node=1,
+        add_reverse=False,
+    )
+    assert ("movie", "rev_rates", "user") not in data.edge_types
+    # Every movie keeps one rating and user 0 keeps one.
+    assert 3 <= data["user", "rates", "movie"].adj._nnz() <= 4
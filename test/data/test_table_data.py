@@ -1,5 +1,6 @@
 import os
 import os.path as osp
+import pickle
 
 import numpy as np
 import pandas as pd
@@ -7,6 +8,7 @@ import torch
 
 from rllm.types import ColType
 from rllm.datasets import TML1MDataset
+from rllm.datasets.dataset import _is_processed
 from rllm.data.table_data import TableData
 
 
@@ -66,6 +68,29 @@ def test_categorical_target_order():
     assert torch.equal(dataset.y, torch.tensor([0, 1, 1, 1]))
 
 
+def test_generate_feat_dict():
+    df = pd.DataFrame({
+        "cat": ["b", None, "a", "b"],
+        "num": np.array([1.5, np.nan, 0.0, 2.0], dtype=np.float32),
+        "cat_int": [3, -1, 1, 3],
+        "target": [0.1, 0.2, 0.3, 0.4],
+    })
+    col_types = {"cat": ColType.CATEGORICAL,
+                 "num": ColType.NUMERICAL,
+                 "cat_int": ColType.CATEGORICAL,
+                 "target": ColType.NUMERICAL}
+    table = TableData(df, col_types, target_col="target")
+
+    cat = table[ColType.CATEGORICAL]
+    assert cat.dtype == torch.int32
+    assert torch.equal(cat, torch.tensor([[1, 1], [-1, -1], [0, 0], [1, 1]],
+                                         dtype=torch.int32))
+    num = table[ColType.NUMERICAL]
+    assert num.dtype == torch.float32 and num.shape == (4, 1)
+    assert torch.isnan(num[1, 0]) and num[3, 0] == 2.0
+    assert table.y.dtype == torch.float32 and table.y.shape == (4,)
+
+
 def test_compatiblity():
     root = osp.dirname(osp.dirname(osp.dirname(__file__)))
     data_path = osp.join(root, "data")
@@ -83,3 +108,41 @@ def test_compatiblity():
     os.remove(osp.join(cache_dir, "user_table.pt"))
     os.rmdir(cache_dir)
     assert user_table.table_name == "user_table"
+
+
+def test_columnar(tmp_path):
+    df = pd.DataFrame({"cat_1": [0, 1, 2, 3],
+                       "num_1": [0.5, 1.5, 2.5, 3.5],
+                       "target": [0, 1, 1, 0]})
+    col_types = {"cat_1": ColType.CATEGORICAL,
+                 "num_1": ColType.NUMERICAL,
+                 "target": ColType.CATEGORICAL}
+    table = TableData(df, col_types, target_col="target")
+    table.train_mask = torch.tensor([True, True, False, False])
+
+    path = osp.join(tmp_path, "table")
+    table.save_columnar(path)
+    assert _is_processed(path)
+    loaded = TableData.load(path)
+
+    assert len(loaded) == 4
+    assert loaded.target_col == "target"
+    assert loaded.col_types == table.col_types
+    assert loaded.metadata == table.metadata
+    for col_type, feat in table.feat_dict.items():
+        assert torch.equal(loaded.feat_dict[col_type], feat)
+    assert torch.equal(loaded.y, table.y)
+    assert torch.equal(loaded.train_mask, table.train_mask)
+
+    # The dataframe is read on first access.
+    assert "_df_loader" in loaded.__dict__
+    # Loaded tables pickle, e.g. to spawned DataLoader workers.
+    copied = pickle.loads(pickle.dumps(loaded))
+    pd.testing.assert_frame_equal(copied.df, table.df)
+    pd.testing.assert_frame_equal(loaded.df, table.df)
+    assert "_df_loader" not in loaded.__dict__
+
+    # Without `meta.json`, e.g. after an interrupted save, the directory
+    # does not count as processed.
+    os.remove(osp.join(path, "meta.json"))
+    assert not _is_processed(path)
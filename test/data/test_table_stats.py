@@ -0,0 +1,27 @@
+import pytest
+import torch
+
+from rllm.data import TableStats
+from rllm.types import ColType, StatType
+
+
+def test_numerical_stats():
+    x = torch.randn(100, 3)
+    x[::7, 1] = float("nan")
+
+    for chunks in [[x], x.split(13)]:
+        stats_list = TableStats.from_chunks(chunks, ColType.NUMERICAL, 3)
+        for i, stats in enumerate(stats_list):
+            for stat_type in StatType.stats_for_col_type(ColType.NUMERICAL):
+                expected = StatType.compute(x[:, i], stat_type)
+                assert stats[stat_type] == pytest.approx(expected, abs=1e-5)
+
+
+def test_categorical_stats():
+    x = torch.tensor([[0, 2], [1, -1], [1, 2], [-1, 0], [1, 4]])
+
+    stats = TableStats(ColType.CATEGORICAL, num_cols=2)
+    stats.update(x[:2]).update(x[2:])
+    stats_list = stats.compute()
+    assert stats_list[0] == {StatType.COUNT: 2, StatType.MOST_FREQUENT: 1}
+    assert stats_list[1] == {StatType.COUNT: 5, StatType.MOST_FREQUENT: 2}
@@ -0,0 +1,32 @@
+import pickle
+
+import torch
+
+from rllm.data import GraphData
+from rllm.dataloader import GraphStore, NeighborLoader
+
+
+def test_graph_store(tmp_path):
+    edge_index = torch.tensor([
+        [0, 0, 1, 2, 2, 3, 4, 4, 5],
+        [1, 2, 3, 3, 4, 4, 5, 6, 6]
+    ])
+    x = torch.randn(7, 4)
+    data = GraphData(x=x, edge_index=edge_index, num_nodes=7).to("cpu")
+
+    store = GraphStore(data, node_attrs=["x"])
+    assert store.num_nodes == 7
+    assert torch.equal(store.col_ptr, torch.tensor([0, 0, 1, 2, 4, 6, 7, 9]))
+    assert store.row.is_shared()
+    assert torch.equal(store.index_select("x", torch.tensor([3, 1])), x[[3, 1]])
+
+    mmap_store = GraphStore(data, node_attrs=["x"], path=str(tmp_path))
+    restored = pickle.loads(pickle.dumps(mmap_store))
+    assert torch.equal(restored.col_ptr, store.col_ptr)
+    assert torch.equal(restored.row, store.row)
+    assert torch.equal(restored.index_select("x", torch.tensor([6])), x[[6]])
+
+    loader = NeighborLoader(mmap_store, num_neighbors=[2], batch_size=2)
+    batch, n_id, adjs = next(iter(loader))
+    assert batch == 2
+    assert len(adjs) == 1
@@ -0,0 +1,39 @@
+import torch
+
+from rllm.data import HeteroGraphData
+from rllm.dataloader import HeteroNeighborLoader
+
+
+def test_hetero_neighbor_loader():
+    data = HeteroGraphData()
+    data["paper"].x = torch.randn(4, 8)
+    data["author"].x = torch.randn(3, 8)
+    data["author", "paper"].edge_index = torch.tensor([
+        [0, 1, 1, 2],
+        [0, 0, 1, 3],
+    ])
+    data["paper", "author"].edge_index = torch.tensor([
+        [0, 0, 1, 3],
+        [0, 1, 1, 2],
+    ])
+
+    loader = HeteroNeighborLoader(
+        data,
+        num_neighbors=[-1, -1],
+        seed_type="paper",
+        seeds=torch.tensor([0, 3]),
+        batch_size=2,
+    )
+    batch, n_id_dict, x_dict, edge_index_dict = next(iter(loader))
+
+    assert batch == 2
+    assert torch.equal(n_id_dict["paper"][:2], torch.tensor([0, 3]))
+    assert torch.equal(n_id_dict["author"].sort().values, torch.tensor([0, 1, 2]))
+    assert torch.equal(x_dict["author"], data["author"].x[n_id_dict["author"]])
+
+    for (src_type, dst_type), edge_index in edge_index_dict.items():
+        src = n_id_dict[src_type][edge_index[0]]
+        dst = n_id_dict[dst_type][edge_index[1]]
+        edges = data[src_type, dst_type].edge_index
+        for s, d in zip(src.tolist(), dst.tolist()):
+            assert bool(((edges[0] == s) & (edges[1] == d)).any())
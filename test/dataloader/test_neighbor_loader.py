@@ -1,6 +1,8 @@
 import torch
 
-from rllm.dataloader import NeighborLoader
+from rllm.data import GraphData
+from rllm.dataloader import NeighborLoader, sample_neighbors
+from rllm.utils import index2ptr
 
 
 def test_neighbor_loader():
@@ -35,3 +37,97 @@ def test_neighbor_loader():
 
     assert torch.all(res == batch)
     assert len(e_ids) == len(o_eid)
+
+
+def test_sample_neighbors():
+    # CSC of edges 0->1, 0->2, 1->2, 2->3, 1->3, 0->3
+    col_ptr = torch.tensor([0, 0, 1, 3, 6])
+    row = torch.tensor([0, 0, 1, 2, 1, 0])
+    seeds = torch.tensor([3, 0, 2])
+
+    src, dst, eid = sample_neighbors(col_ptr, row, seeds, -1)
+    assert torch.equal(dst, torch.tensor([3, 3, 3, 2, 2]))
+    assert torch.equal(src, torch.tensor([2, 1, 0, 0, 1]))
+    assert torch.equal(row[eid], src)
+
+    src, dst, eid = sample_neighbors(col_ptr, row, seeds, 2)
+    assert torch.equal(dst, torch.tensor([3, 3, 2, 2]))
+    assert src[:2].unique().numel() == 2
+    assert torch.equal(src[2:].sort().values, torch.tensor([0, 1]))
+    assert torch.equal(row[eid], src)
+
+    src, dst, _ = sample_neighbors(col_ptr, row, seeds, 4, replace=True)
+    assert torch.equal(dst, torch.tensor([3] * 4 + [2] * 4))
+    assert bool(torch.isin(src[:4], torch.tensor([0, 1, 2])).all())
+    assert bool(torch.isin(src[4:], torch.tensor([0, 1])).all())
+
+
+def test_neighbor_loader_collate():
+    edge_index = torch.tensor([
+        [0, 0, 1, 2, 2, 3, 4, 4, 5],
+        [1, 2, 3, 3, 4, 4, 5, 6, 6]
+    ])
+    data = GraphData(edge_index=edge_index, num_nodes=7).to("cpu")
+
+    loader = NeighborLoader(data, num_neighbors=[-1, -1], batch_size=2)
+    batch, n_id, adjs = loader.collate_fn([torch.tensor(6), torch.tensor(4)])
+    assert batch == 2
+    # first-seen order: batch, hop-1 nodes, hop-2 nodes
+    assert torch.equal(n_id[:2], torch.tensor([6, 4]))
+    assert torch.equal(n_id[2:5].sort().values, torch.tensor([2, 3, 5]))
+    assert torch.equal(n_id[5:].sort().values, torch.tensor([0, 1]))
+    for adj in adjs:
+        assert adj.shape == (7, 7)
+    src, dst = adjs[0].coalesce().indices()
+    assert torch.equal(n_id[dst].sort().values, torch.tensor([4, 4, 6, 6]))
+
+    loader = NeighborLoader(
+        data, num_neighbors=[-1, -1], batch_size=2, block=True
+    )
+    batch, n_id, adjs = loader.collate_fn([torch.tensor(6), torch.tensor(4)])
+    assert adjs[0].layout == torch.sparse_csc
+    assert adjs[0].shape == (5, 2)
+    assert adjs[1].shape == (7, 5)
+    assert torch.equal(adjs[0].ccol_indices(), torch.tensor([0, 2, 4]))
+
+
+def test_temporal_neighbor_loader():
+    # node 0 is linked from 1, 2, 3 at time 1, 2, 3; node 1 from 4 at time 5
+    edge_index = torch.tensor([
+        [3, 1, 2, 4],
+        [0, 0, 0, 1],
+    ])
+    data = GraphData(
+        edge_index=edge_index,
+        edge_time=torch.tensor([3, 1, 2, 5]),
+        num_nodes=5,
+    ).to("cpu")
+
+    col_ptr, row = index2ptr(torch.tensor([0, 0, 0, 1]), 5), torch.tensor([1, 2, 3, 4])
+    row_time = torch.tensor([1, 2, 3, 5])
+    src, _, _ = sample_neighbors(
+        col_ptr, row, torch.tensor([0, 0]), -1,
+        seed_time=torch.tensor([2, 0]), row_time=row_time,
+    )
+    assert torch.equal(src.sort().values, torch.tensor([1, 2]))
+    src, _, _ = sample_neighbors(
+        col_ptr, row, torch.tensor([0]), 1,
+        seed_time=torch.tensor([3]), row_time=row_time,
+        temporal_strategy="last",
+    )
+    assert torch.equal(src, torch.tensor([3]))
+
+    loader = NeighborLoader(
+        data,
+        num_neighbors=[-1, -1],
+        seeds=torch.tensor([0, 0]),
+        seed_time=torch.tensor([2, 3]),
+        edge_time="edge_time",
+        batch_size=2,
+    )
+    batch, n_id, adjs = next(iter(loader))
+    assert batch == 2
+    # each seed keeps its own subgraph, node 1 never reaches node 4
+    assert torch.equal(n_id[:2], torch.tensor([0, 0]))
+    assert torch.equal(n_id[2:].sort().values, torch.tensor([1, 1, 2, 2, 3]))
+    assert adjs[1]._nnz() == 0
@@ -0,0 +1,179 @@
+import io
+import json
+import threading
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import torch
+
+from rllm.types import ColType
+from rllm.data import GraphData, TableData
+from rllm.nn.conv.graph_conv import GCNConv
+from rllm.inference import (
+    GraphRunner,
+    TableRunner,
+    make_http_server,
+    serve_jsonl,
+)
+
+
+class TableModel(torch.nn.Module):
+    def __init__(self, in_dim, out_dim):
+        super().__init__()
+        self.lin = torch.nn.Linear(in_dim, out_dim)
+
+    def forward(self, x):
+        return self.lin(x[ColType.NUMERICAL])
+
+
+class GraphModel(torch.nn.Module):
+    def __init__(self, in_dim, out_dim):
+        super().__init__()
+        self.conv = GCNConv(in_dim, out_dim)
+
+    def forward(self, x, adj):
+        if isinstance(adj, list):
+            adj = adj[0]
+        return self.conv(x, adj)
+
+
+class FailingModel(TableModel):
+    def forward(self, x):
+        raise RuntimeError("mat1 and mat2 shapes cannot be multiplied")
+
+
+def make_table(num_rows=20):
+    df = pd.DataFrame(
+        {
+            "num_1": np.random.random(num_rows),
+            "num_2": np.random.random(num_rows),
+            "label": np.arange(num_rows) % 2,
+        },
+        dtype=np.float32,
+    )
+    col_types = {
+        "num_1": ColType.NUMERICAL,
+        "num_2": ColType.NUMERICAL,
+        "label": ColType.CATEGORICAL,
+    }
+    return TableData(df, col_types, target_col="label")
+
+
+def make_graph():
+    edge_index = torch.tensor([
+        [0, 0, 1, 2, 2, 3, 4, 4, 5],
+        [1, 2, 3, 3, 4, 4, 5, 6, 6],
+    ])
+    adj = torch.sparse_coo_tensor(
+        edge_index, torch.ones(edge_index.size(1)), (7, 7)
+    )
+    graph = GraphData(x=torch.randn(7, 4), adj=adj)
+    graph.num_nodes = 7
+    return graph
+
+
+def test_table_runner():
+    table = make_table()
+    model = TableModel(2, 3)
+    calls = []
+
+    def transform(data):
+        calls.append(1)
+        return data
+
+    runner = TableRunner(model, table, transform=transform, batch_size=4)
+    ids = torch.tensor([5, 0, 19, 7, 3, 11])
+    out = runner.score(ids)
+    with torch.no_grad():
+        expected = model(table.feat_dict)[ids]
+    assert torch.allclose(out, expected, atol=1e-6)
+
+    labels = runner.score(ids.tolist(), output="label")
+    assert torch.equal(labels, expected.argmax(dim=-1))
+    assert len(calls) == 1
+
+    stats = runner.stats()
+    assert stats["requests"] == 2 and stats["rows"] == 12
+    assert stats["p50_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+
+
+def test_graph_runner():
+    graph = make_graph()
+    model = GraphModel(4, 2)
+    full = GraphRunner(model, graph)
+    sampled = GraphRunner(model, graph, num_neighbors=[10], batch_size=2)
+
+    ids = torch.tensor([6, 3, 4, 0, 1])
+    out_full = full.score(ids)
+    with torch.no_grad():
+        expected = model(graph.x, graph.adj)[ids]
+    assert torch.allclose(out_full, expected, atol=1e-6)
+    # Every neighbor fits in the sample, so both paths agree.
+    assert torch.allclose(sampled.score(ids), expected, atol=1e-6)
+
+    # The full pass is recomputed once the parameters change.
+    with torch.no_grad():
+        model.conv.bias.add_(1.0)
+    assert torch.allclose(full.score(ids), out_full + 1, atol=1e-5)
+
+
+def test_serve_jsonl():
+    runner = TableRunner(TableModel(2, 3), make_table())
+    requests = io.StringIO(
+        '{"ids": [1, 2], "output": "proba"}\n'
+        "\n"
+        '{"ids": [100]}\n'
+        "not json\n"
+        '{"stats": true}\n'
+    )
+    output = io.StringIO()
+    serve_jsonl(runner, requests, output)
+
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert len(responses) == 4
+    assert responses[0]["ids"] == [1, 2]
+    assert np.allclose(np.sum(responses[0]["scores"], axis=1), 1.0)
+    assert "error" in responses[1] and "error" in responses[2]
+    assert responses[3]["stats"]["requests"] == 1
+
+
+def test_serve_jsonl_model_error():
+    runner = TableRunner(FailingModel(2, 3), make_table())
+    requests = io.StringIO(
+        '{"ids": [1, 2]}\n'
+        '{"ids": [3]}\n'
+        '{"stats": true}\n'
+    )
+    output = io.StringIO()
+    serve_jsonl(runner, requests, output)
+
+    # A failing model answers every request instead of stopping the loop.
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert len(responses) == 3
+    assert responses[0]["error"].startswith("RuntimeError")
+    assert responses[1]["error"].startswith("RuntimeError")
+    assert responses[2]["stats"]["requests"] == 0
+
+
+def test_http_server():
+    runner = TableRunner(TableModel(2, 3), make_table())
+    server = make_http_server(runner, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        request = urllib.request.Request(
+            f"{url}/score",
+            data=json.dumps({"ids": [0, 3], "output": "label"}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request) as response:
+            body = json.loads(response.read())
+        assert body["ids"] == [0, 3] and len(body["scores"]) == 2
+
+        with urllib.request.urlopen(f"{url}/stats") as response:
+            assert json.loads(response.read())["requests"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
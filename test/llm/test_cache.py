@@ -0,0 +1,47 @@
+import os.path as osp
+import time
+
+from rllm.llm import InMemoryCache, SQLiteCache
+from rllm.llm.llm_module.cache import make_cache_key
+
+
+def test_make_cache_key():
+    key = make_cache_key({"model": "a"}, "complete", "hi", temperature=0)
+    assert key == make_cache_key({"model": "a"}, "complete", "hi", temperature=0)
+    assert key != make_cache_key({"model": "b"}, "complete", "hi", temperature=0)
+    assert key != make_cache_key({"model": "a"}, "complete", "hi", temperature=1)
+    assert key != make_cache_key({"model": "a"}, "chat", "hi", temperature=0)
+
+
+def test_in_memory_cache():
+    cache = InMemoryCache(max_size=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.stats == {"hits": 1, "misses": 1, "size": 2}
+
+    cache = InMemoryCache(ttl=0.05)
+    cache.set("a", [0.5, 1.0])
+    assert cache.get("a") == [0.5, 1.0]
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+
+def test_sqlite_cache(tmp_path):
+    path = osp.join(tmp_path, "cache.db")
+    cache = SQLiteCache(path, max_size=2)
+    cache.set("a", "1")
+    cache.set("b", [1.0, 2.0])
+    cache.get("a")
+    cache.set("c", "3")
+    assert len(cache) == 2
+    cache.close()
+
+    # Entries survive a restart.
+    cache = SQLiteCache(path)
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+    cache.close()
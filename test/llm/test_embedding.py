@@ -0,0 +1,67 @@
+import os.path as osp
+
+import numpy as np
+import pytest
+
+from rllm.llm import EmbeddingStore, embed_texts
+
+
+class FakeEmbedder:
+    """Embeds a text as `[len(text), number of calls so far]`."""
+
+    def __init__(self, fail_after=None):
+        self.texts = []
+        self.fail_after = fail_after
+
+    def embedding(self, inputs):
+        if self.fail_after is not None and len(self.texts) >= self.fail_after:
+            raise RuntimeError("provider down")
+        self.texts.extend(inputs)
+        return [[float(len(text)), 1.0] for text in inputs]
+
+
+def test_embed_texts_dedup():
+    texts = ["a", "bb", "a", "ccc", "bb"]
+    embedder = FakeEmbedder()
+    out = embed_texts(embedder, texts, batch_size=2)
+    assert sorted(embedder.texts) == ["a", "bb", "ccc"]
+    assert out[:, 0].tolist() == [1, 2, 1, 3, 2]
+
+
+def test_embed_texts_resume(tmp_path):
+    path = osp.join(tmp_path, "embeddings.npy")
+    texts = [str(i) * (i + 1) for i in range(10)]
+
+    from rllm.llm import BatchExecutor
+    executor = BatchExecutor(max_concurrency=1, max_retries=0)
+    with pytest.raises(RuntimeError):
+        embed_texts(FakeEmbedder(fail_after=4), texts, path=path,
+                    batch_size=2, executor=executor, dtype=np.float16)
+    assert osp.exists(path + ".done.npy")
+    assert EmbeddingStore(path, 10, np.float16).pending.tolist() == list(range(4, 10))
+
+    embedder = FakeEmbedder()
+    out = embed_texts(embedder, texts, path=path, batch_size=2,
+                      executor=executor, dtype=np.float16)
+    assert embedder.texts == texts[4:]
+    assert not osp.exists(path + ".done.npy")
+
+    out = np.load(path)
+    assert out.dtype == np.float16 and out.shape == (10, 2)
+    assert out[:, 0].tolist() == [i + 1 for i in range(10)]
+
+
+def test_embed_texts_stale(tmp_path):
+    path = osp.join(tmp_path, "embeddings.npy")
+    embed_texts(FakeEmbedder(), ["a", "bb", "ccc"], path=path)
+
+    # Same texts: the finished store is reused.
+    embedder = FakeEmbedder()
+    embed_texts(embedder, ["a", "bb", "ccc"], path=path)
+    assert embedder.texts == []
+
+    # Other texts of the same length: rebuilt, not reused.
+    embedder = FakeEmbedder()
+    out = embed_texts(embedder, ["dddd", "a", "ee"], path=path)
+    assert embedder.texts == ["dddd", "a", "ee"]
+    assert out[:, 0].tolist() == [4, 1, 2]
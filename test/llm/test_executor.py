@@ -0,0 +1,84 @@
+import asyncio
+import time
+from typing import Sequence
+
+import pytest
+
+from rllm.llm import BatchExecutor, PromptTemplate, TokenBucket
+from rllm.llm.llm_module.general_llm import LLM
+from rllm.llm.types import (
+    ChatMessage,
+    ChatResponse,
+    CompletionResponse,
+    LLMMetadata,
+)
+
+
+class FakeLLM(LLM):
+    """A completion model echoing the prompt after a fixed latency."""
+
+    def __init__(self, latency: float = 0.05, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.num_calls = 0
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(model_name="fake")
+
+    def chat(self, messages: Sequence[ChatMessage], **kwargs) -> ChatResponse:
+        raise NotImplementedError
+
+    def complete(self, prompt, formatted=False, **kwargs) -> CompletionResponse:
+        self.num_calls += 1
+        time.sleep(self.latency)
+        return CompletionResponse(text=prompt)
+
+    async def acomplete(self, prompt, formatted=False, **kwargs):
+        self.num_calls += 1
+        await asyncio.sleep(self.latency)
+        return CompletionResponse(text=prompt)
+
+
+def test_batch_predict_in_order_and_concurrent():
+    llm = FakeLLM(latency=0.05)
+    prompt = PromptTemplate("name {i}")
+    executor = BatchExecutor(max_concurrency=10, batch_size=4)
+
+    start = time.perf_counter()
+    outputs = llm.batch_predict(prompt, ({"i": i} for i in range(40)), executor)
+    elapsed = time.perf_counter() - start
+
+    assert outputs == [f"name {i}" for i in range(40)]
+    assert llm.predict(prompt, i=0) == "name 0"
+    # 40 serial calls take 2s.
+    assert elapsed < 1.0
+
+
+def test_retry():
+    failures = {"left": 2}
+
+    async def flaky(item):
+        if failures["left"] > 0:
+            failures["left"] -= 1
+            raise RuntimeError("rate limited")
+        return item * 2
+
+    executor = BatchExecutor(max_retries=2, backoff=0.01)
+    assert executor.run(flaky, [1, 2, 3]) == [2, 4, 6]
+
+    failures["left"] = 10
+    with pytest.raises(RuntimeError):
+        BatchExecutor(max_retries=1, backoff=0.01).run(flaky, [1])
+
+
+def test_token_bucket():
+    async def consume():
+        bucket = TokenBucket(rate=100, capacity=10)
+        start = time.perf_counter()
+        for _ in range(3):
+            await bucket.acquire(10)
+        return time.perf_counter() - start
+
+    # The first 10 are free, the next 20 take 0.2s.
+    assert 0.15 < asyncio.run(consume()) < 0.5
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from rllm.llm import PromptTemplate
+from rllm.llm.prompt.utils import generate_sample_description
+
+
+def test_format_batch():
+    df = pd.DataFrame({"name": ["a", "b", "c"], "age": [30, 41, None]})
+    prompt = PromptTemplate(
+        "{scenario}:\n{sample_description}\nscore={score:.2f} {tag!r}",
+        function_mappings={
+            "sample_description": generate_sample_description,
+            "tag": lambda row, **kwargs: row["name"].upper(),
+        },
+    )
+    kwargs = {"scenario": "people", "score": 0.5}
+
+    expected = [prompt.format(row=row, **kwargs) for _, row in df.iterrows()]
+    outputs = prompt.format_batch(df, batch_size=2, **kwargs)
+    assert not isinstance(outputs, list)
+    assert list(outputs) == expected
+
+    # Numeric rows are upcast as in `df.iterrows()`, e.g. `3.0`, and
+    # missing values render as `nan`.
+    df = pd.DataFrame({
+        "count": [3, 4],
+        "score": np.array([0.1, np.nan], dtype=np.float32),
+    })
+    prompt = PromptTemplate(
+        "{sample_description}",
+        function_mappings={"sample_description": generate_sample_description},
+    )
+    expected = [prompt.format(row=row) for _, row in df.iterrows()]
+    assert list(prompt.format_batch(df)) == expected
@@ -0,0 +1,90 @@
+import torch
+from rllm.nn.conv.graph_conv import GCNConv, MessagePassing, SAGEConv
+from rllm.nn.conv.graph_conv.message_passing import EdgeFormatCache
+
+
+def test_arg_plan():
+    plan = GCNConv.__arg_plan__('aggregate')
+    assert [name for name, _ in plan] == ['edge_index', 'dim', 'dim_size']
+    assert GCNConv.__arg_plan__('aggregate') is plan
+    assert '_arg_plans' in GCNConv.__dict__
+
+
+def test_edge_format_cache():
+    cache = EdgeFormatCache(maxsize=2)
+    calls = []
+
+    def convert(t):
+        calls.append(t)
+        return t.sum()
+
+    a, b, c = torch.ones(3), torch.ones(4), torch.ones(5)
+    cache.get(a, convert)
+    cache.get(a, convert)
+    assert len(calls) == 1
+
+    # in-place updates bump the version counter
+    a.add_(1)
+    assert cache.get(a, convert) == 6
+    assert len(calls) == 2
+
+    cache.get(b, convert)
+    cache.get(c, convert)
+    assert len(cache._data) == 2
+
+
+def test_sparse_csc_input():
+    x = torch.randn(3, 4)
+    adj = torch.tensor([[0.0, 1.0, 0.0], [1.0, 0.0, 1.0], [0.0, 1.0, 0.0]])
+    conv = GCNConv(4, 2)
+    out_coo = conv(x, adj.to_sparse())
+    out_csc = conv(x, adj.to_sparse_csc())
+    assert torch.allclose(out_coo, out_csc)
+
+
+def test_fused_spmm_aggregate():
+    x = torch.randn(5, 4, requires_grad=True)
+    edge_index = torch.tensor([
+        [0, 1, 2, 3, 4, 4],
+        [1, 0, 1, 2, 2, 0],
+    ])
+    edge_weight = torch.rand(6)
+
+    for aggr in ['sum', 'mean']:
+        conv = MessagePassing(aggr=aggr)
+        assert conv.if_fuse
+        out = conv.propagate(x, edge_index, edge_weight=edge_weight)
+        out.sum().backward()
+        grad, x.grad = x.grad, None
+
+        conv.if_fuse = False
+        expected = conv.propagate(x, edge_index, edge_weight=edge_weight)
+        expected.sum().backward()
+        assert torch.allclose(out, expected, atol=1e-6)
+        assert torch.allclose(grad, x.grad, atol=1e-6)
+        x.grad = None
+
+    # bipartite: 5 source nodes, 3 destination nodes
+    conv = MessagePassing(aggr='sum')
+    out = conv.propagate(x, edge_index, dim_size=3)
+    assert out.shape == (3, 4)
+
+
+def test_inference_mode():
+    x = torch.randn(5, 4)
+    adj = torch.tensor([
+        [0, 1, 2, 3, 4, 4],
+        [1, 0, 1, 2, 2, 0],
+    ])
+    adj = torch.sparse_coo_tensor(adj, torch.ones(6), (5, 5))
+    for conv in [GCNConv(4, 2), SAGEConv(4, 2)]:
+        conv.eval()
+        with torch.inference_mode():
+            out = conv(x, adj)
+        with torch.no_grad():
+            expected = conv(x, adj)
+        assert torch.allclose(out, expected, atol=1e-6)
+
+        # Nothing converted under inference mode is reused by autograd.
+        conv.train()
+        conv(x, adj).sum().backward()
@@ -0,0 +1,106 @@
+import torch
+
+from rllm.nn.conv.table_conv import ExcelFormerConv, SAINTConv
+from rllm.nn.conv.table_conv.excelformer_conv import SemiPermeableAttention
+from rllm.nn.conv.table_conv._attention import (
+    TableTransformerEncoderLayer,
+    causal_mask,
+    nystrom_attention,
+)
+
+
+def _reference_sp_attention(attn, x):
+    # The einsum implementation with an explicit additive mask.
+    B, C, _ = x.shape
+    H = attn.num_heads
+    q, k, v = attn.to_qkv(x).chunk(3, dim=-1)
+    q, k, v = (t.reshape(B, C, H, -1).permute(0, 2, 1, 3) for t in (q, k, v))
+    sim = torch.einsum("b h i d, b h j d -> b h i j", q, k)
+    mask = attn.get_attention_mask(sim.size(), sim.device)
+    out = torch.einsum(
+        "b h i j, b h j d -> b h i d", ((sim + mask) * attn.scale).softmax(-1), v
+    )
+    return attn.to_out(out.permute(0, 2, 1, 3).reshape(B, C, -1))
+
+
+def test_causal_mask():
+    mask = causal_mask(4, torch.device("cpu"))
+    assert mask is causal_mask(4, torch.device("cpu"))
+    assert torch.equal(mask, torch.ones(4, 4).tril().bool())
+
+
+def test_semi_permeable_attention():
+    x = torch.randn(6, 5, 32)
+    attn = SemiPermeableAttention(dim=32, num_heads=4, head_dim=8).eval()
+    out = attn(x)
+    assert out.shape == (6, 5, 32)
+    assert torch.allclose(out, _reference_sp_attention(attn, x), atol=1e-5)
+
+    # Column 0 only sees itself.
+    x_2 = x.clone()
+    x_2[:, 1:] = torch.randn(6, 4, 32)
+    assert torch.allclose(attn(x_2)[:, 0], out[:, 0], atol=1e-5)
+
+    attn.compute_dtype = torch.bfloat16
+    out_bf16 = attn(x)
+    assert out_bf16.dtype == torch.float32
+    assert torch.allclose(out_bf16, out, atol=5e-2)
+
+
+def test_table_transformer_encoder_layer():
+    x = torch.randn(4, 7, 16)
+    kwargs = dict(d_model=16, nhead=4, dim_feedforward=16, dropout=0.0,
+                  batch_first=True)
+    layer = TableTransformerEncoderLayer(**kwargs)
+    ref = torch.nn.TransformerEncoderLayer(**kwargs)
+    ref.load_state_dict(layer.state_dict())
+    assert torch.allclose(layer(x), ref(x), atol=1e-5)
+
+    out = layer(x)
+    out.sum().backward()
+    assert layer.self_attn.in_proj_weight.grad is not None
+
+
+def test_convs_compute_dtype():
+    x = torch.randn(8, 5, 16)
+    conv = ExcelFormerConv(16, num_heads=2, head_dim=8,
+                           compute_dtype=torch.bfloat16)
+    assert conv(x).shape == (8, 5, 16)
+    conv = SAINTConv(16, num_feats=5, num_heads=2, dropout=0.0,
+                     compute_dtype=torch.bfloat16)
+    assert conv(x).shape == (8, 5, 16)
+
+
+def test_nystrom_attention():
+    # With one landmark per row, the approximation is exact. Keys equal
+    # to nearly orthogonal queries keep the kernel well conditioned, so
+    # the iterative inverse converges.
+    q = 4 * torch.eye(8) + 0.5 * torch.randn(2, 2, 8, 8)
+    v = 2 * torch.randn(2, 2, 8, 8)
+    out = nystrom_attention(q, q, v, num_landmarks=8)
+    ref = torch.nn.functional.scaled_dot_product_attention(q, q, v)
+    assert torch.allclose(out, ref, atol=1e-3)
+
+    q, k, v = torch.randn(3, 2, 2, 40, 8).unbind(0)
+    out = nystrom_attention(q, k, v, num_landmarks=8)
+    assert out.shape == (2, 2, 40, 8)
+    assert bool(torch.isfinite(out).all())
+
+
+def test_saint_row_attention():
+    x = torch.randn(50, 3, 8)
+    conv = SAINTConv(8, num_feats=3, num_heads=2, dropout=0.0,
+                     row_attention="chunked", row_chunk_size=16)
+    # 50 rows are split into groups of 13, 13, 12 and 12.
+    out = conv(x)
+    assert out.shape == (50, 3, 8)
+    # Rows only see their own group.
+    x_2 = x.clone()
+    x_2[26:] = torch.randn(24, 3, 8)
+    assert torch.allclose(conv(x_2)[:26], out[:26], atol=1e-5)
+
+    conv = SAINTConv(8, num_feats=3, num_heads=2, dropout=0.0,
+                     row_attention="nystrom", num_landmarks=4)
+    out = conv(x)
+    assert out.shape == (50, 3, 8)
+    out.sum().backward()
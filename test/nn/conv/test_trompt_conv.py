@@ -0,0 +1,46 @@
+import torch
+import torch.nn.functional as F
+
+from rllm.nn.conv.table_conv import TromptConv
+
+
+def _reference_forward(conv, x, x_prompt):
+    # The Trompt cell with the expanded features materialized.
+    emb_column = conv.ln_column(conv.emb_column)
+    emb_prompt = conv.ln_prompt(conv.emb_prompt)
+    se_prompt = emb_prompt.unsqueeze(0).repeat(x.size(0), 1, 1)
+    se_prompt_cat = torch.cat([se_prompt, x_prompt], dim=-1)
+    se_prompt_cat_hat = conv.linear(se_prompt_cat) + se_prompt + x_prompt
+    se_column = emb_column.unsqueeze(0).repeat(x_prompt.size(0), 1, 1)
+    m_importance = torch.einsum("ijl,ikl->ijk", se_prompt_cat_hat, se_column)
+    m_importance = F.softmax(m_importance, dim=-1).unsqueeze(dim=-1)
+    x_expand_weight = F.relu(torch.einsum("ijl,k->ikjl", x, conv.expand_weight))
+    x_expand_residual = x.unsqueeze(1).repeat(1, conv.num_prompts, 1, 1)
+    x = conv.group_norm(x_expand_weight) + x_expand_residual
+    return (x * m_importance).sum(dim=2)
+
+
+def test_trompt_conv():
+    batch_size, num_cols, dim, num_prompts = 6, 5, 8, 4
+    x = torch.randn(batch_size, num_cols, dim)
+    x_prompt = torch.randn(batch_size, num_prompts, dim)
+    conv = TromptConv(in_dim=num_cols, out_dim=dim, num_prompts=num_prompts)
+    # Mixed signs exercise both relu branches.
+    with torch.no_grad():
+        conv.expand_weight.uniform_(-1, 1)
+        conv.group_norm.weight.uniform_(0.5, 1.5)
+        conv.group_norm.bias.uniform_(-0.5, 0.5)
+
+    out = conv(x, x_prompt)
+    assert out.shape == (batch_size, num_prompts, dim)
+    ref = _reference_forward(conv, x, x_prompt)
+    assert torch.allclose(out, ref, atol=1e-4)
+
+    # A broadcast prompt gives the same result as a repeated one.
+    x_prompt = torch.randn(num_prompts, dim)
+    out = conv(x, x_prompt.expand(batch_size, -1, -1))
+    ref = _reference_forward(conv, x, x_prompt.repeat(batch_size, 1, 1))
+    assert torch.allclose(out, ref, atol=1e-4)
+
+    out.sum().backward()
+    assert conv.expand_weight.grad is not None
@@ -13,6 +13,7 @@
 
 import numpy as np
 import pandas as pd
+import torch
 
 from rllm.types import ColType
 from rllm.data.table_data import TableData
@@ -96,3 +97,49 @@ def test_ft_transformer_pre_encoder():
         feat_dict[ColType.NUMERICAL].size(1) + feat_dict[ColType.CATEGORICAL].size(1),
         1,
     )
+
+
+def test_pre_encoder_cache():
+    nodes = 20
+    df = pd.DataFrame(
+        {
+            "num_1": np.random.random(nodes),
+            "num_2": np.random.random(nodes),
+            "cat_1": np.arange(nodes) % 4,
+            "cat_2": np.arange(nodes) % 3,
+        },
+        dtype=np.float32,
+    )
+    col_types = {
+        "num_1": ColType.NUMERICAL,
+        "num_2": ColType.NUMERICAL,
+        "cat_1": ColType.CATEGORICAL,
+        "cat_2": ColType.CATEGORICAL,
+    }
+    dataset = TableData(df, col_types, target_col="cat_2")
+    feat_dict = dataset.get_feat_dict()
+    pre_encoder = FTTransformerPreEncoder(out_dim=8, metadata=dataset.metadata)
+    ref = pre_encoder(feat_dict)
+
+    index = torch.tensor([3, 0, 7])
+    batch = {col_type: feat[index] for col_type, feat in feat_dict.items()}
+    for dtype, atol in [(torch.float16, 1e-2), (torch.int8, 5e-2)]:
+        pre_encoder.cache(feat_dict, dtype=dtype, batch_size=7)
+        with torch.no_grad():
+            # A batch of zeros shows the cache is read.
+            zeros = {k: torch.zeros_like(v) for k, v in batch.items()}
+            out = pre_encoder(zeros, index=index)
+        assert torch.allclose(out, ref[index], atol=atol)
+
+    # The encoder is trained, so the cache is bypassed.
+    out = pre_encoder(batch, index=index)
+    assert torch.allclose(out, ref[index])
+    out.sum().backward()
+
+    # Any parameter update invalidates the cache.
+    with torch.no_grad():
+        for p in pre_encoder.parameters():
+            p.add_(1.0)
+        out = pre_encoder(batch, index=index)
+        assert torch.allclose(out, pre_encoder(batch))
+    assert pre_encoder._cache is None
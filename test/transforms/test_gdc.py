@@ -0,0 +1,53 @@
+import torch
+
+from rllm.transforms.graph_transforms import GDC
+
+
+def _graph(num_nodes=20):
+    torch.manual_seed(0)
+    dense = (torch.rand(num_nodes, num_nodes) < 0.2).float()
+    dense = ((dense + dense.t()) > 0).float()
+    dense.fill_diagonal_(0)
+    return dense.to_sparse_coo()
+
+
+def test_approx_diffusion_matches_exact():
+    gdc = GDC(
+        exact=False,
+        chunk_size=7,
+        sparsification=dict(method="threshold", eps=0.0),
+    )
+    adj = gdc.add_weighted_self_loop(_graph())
+    trans = gdc.get_transition_matrix(adj, "sym")
+
+    exact = gdc.diffusion_matrix(trans, method="ppr", alpha=0.15)
+    for solver in ["push", "power"]:
+        approx = gdc.approx_diffusion_matrix(
+            trans, method="ppr", alpha=0.15, eps=1e-7, solver=solver
+        )
+        assert torch.allclose(approx.to_dense(), exact, atol=1e-4)
+
+    exact = gdc.diffusion_matrix(trans, method="heat", t=2.0)
+    approx = gdc.approx_diffusion_matrix(trans, method="heat", t=2.0, eps=1e-7)
+    assert torch.allclose(approx.to_dense(), exact, atol=1e-4)
+
+
+def test_approx_diffusion_topk():
+    adj = _graph()
+    gdc = GDC(exact=False, chunk_size=8)
+    trans = gdc.get_transition_matrix(gdc.add_weighted_self_loop(adj), "sym")
+    exact = gdc.diffusion_matrix(trans, method="ppr", alpha=0.15)
+
+    for dim in [0, 1]:
+        gdc.sparsification = dict(method="topk", k=3, dim=dim)
+        out = gdc.approx_diffusion_matrix(
+            trans, method="ppr", alpha=0.15, eps=1e-7
+        ).to_dense()
+        assert bool(((out != 0).sum(dim=dim) <= 3).all())
+        kept = out != 0
+        top = exact.topk(3, dim=dim).values.min(dim=dim, keepdim=True)
+        assert torch.allclose(out[kept], exact[kept], atol=1e-4)
+        assert bool((exact[kept] >= (top.values - 1e-4).expand_as(exact)[kept]).all())
+
+    out = GDC(exact=False, sparsification=dict(method="topk", k=4, dim=1))(adj)
+    assert out.is_sparse and out.shape == adj.shape
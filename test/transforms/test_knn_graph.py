@@ -0,0 +1,63 @@
+import torch
+
+from rllm.transforms.graph_transforms.functional import knn_graph
+from rllm.transforms.graph_transforms.functional.knn_graph import (
+    approx_knn,
+    exact_knn,
+)
+
+
+def _brute_force(x, k, metric):
+    if metric == "cosine":
+        x = torch.nn.functional.normalize(x, dim=-1)
+        dist = 1.0 - x @ x.t()
+    else:
+        dist = torch.cdist(x, x)
+    dist.fill_diagonal_(float("inf"))
+    return dist.topk(k, dim=1, largest=False)
+
+
+def test_exact_knn():
+    torch.manual_seed(0)
+    x = torch.randn(50, 8)
+    for metric in ["euclidean", "cosine"]:
+        dist, index = _brute_force(x, 5, metric)
+        out_index, out_dist = exact_knn(x, 5, metric=metric, batch_size=7)
+        assert torch.equal(out_index, index)
+        assert torch.allclose(out_dist, dist, atol=1e-4)
+
+    # Fewer nodes than neighbors.
+    index, dist = exact_knn(x[:3], 5)
+    assert bool((index[:, 2:] == -1).all())
+    assert bool(torch.isinf(dist[:, 2:]).all())
+
+
+def test_approx_knn_recall():
+    torch.manual_seed(0)
+    centers = torch.randn(20, 16) * 5
+    x = centers.repeat_interleave(50, dim=0) + torch.randn(1000, 16)
+    _, index = _brute_force(x, 10, "euclidean")
+    out_index, _ = approx_knn(x, 10, seed=0)
+
+    hits = (out_index.unsqueeze(-1) == index.unsqueeze(1)).any(dim=-1)
+    assert hits.float().mean() > 0.85
+
+
+def test_knn_graph():
+    torch.manual_seed(0)
+    x = torch.randn(30, 4)
+    _, index = _brute_force(x, 3, "euclidean")
+
+    for backend in ["exact", "approx"]:
+        adj = knn_graph(x, num_neighbors=3, backend=backend)
+        assert adj.layout == torch.sparse_coo
+        assert adj.shape == (30, 30)
+        assert adj._nnz() == 90
+    row, col = knn_graph(x, num_neighbors=3).indices()
+    assert torch.equal(col.view(30, 3).sort(dim=1).values, index.sort(dim=1).values)
+
+    adj = knn_graph(x, num_neighbors=3, mode="distance", include_self=True)
+    dense = adj.to_dense()
+    assert bool((adj.values() >= 0).all())
+    assert torch.equal((dense != 0).sum(dim=1), torch.full((30,), 2))
+    assert adj._nnz() == 90
@@ -0,0 +1,26 @@
+import torch
+
+from rllm.transforms.graph_transforms import SVDFeatureReduction
+from rllm.transforms.graph_transforms.functional import svd_feature_reduction
+
+
+def test_svd_feature_reduction():
+    torch.manual_seed(0)
+    # Rank 4, so every method recovers the same components.
+    x = torch.randn(200, 4) @ torch.randn(4, 32)
+
+    for method in ["full", "randomized", "streaming"]:
+        out = svd_feature_reduction(x, 4, method=method, chunk_size=64)
+        assert out.shape == (200, 4)
+        # Equal up to the signs of the components.
+        assert torch.allclose(out @ out.t(), x @ x.t(), atol=1e-2)
+
+    ref = svd_feature_reduction(x, 2)
+    out = svd_feature_reduction(x, 2, method="streaming", chunk_size=64)
+    assert torch.allclose(out.abs(), ref.abs(), atol=1e-2)
+
+    # Nothing to reduce.
+    assert svd_feature_reduction(x, 64) is x
+
+    out = SVDFeatureReduction(4, method="randomized").forward(x)
+    assert out.shape == (200, 4)
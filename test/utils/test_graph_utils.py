@@ -1,6 +1,14 @@
 import torch
 
-from rllm.utils import sort_edge_index, index2ptr, _to_csc
+from rllm.utils import (
+    sort_edge_index,
+    index2ptr,
+    sample_per_segment,
+    sample_edges_per_node,
+    normalize_adj,
+    gcn_norm,
+    _to_csc,
+)
 
 
 def test_sort_edge_index():
@@ -26,6 +34,31 @@ def test_index2ptr():
     assert torch.equal(r, torch.tensor([0, 1, 3, 5, 6]))
 
 
+def test_sample_per_segment():
+    segment_ids = torch.tensor([2, 0, 0, 1, 0, 2, 0])
+    mask = sample_per_segment(segment_ids, 2)
+    count = torch.bincount(segment_ids[mask], minlength=3)
+    assert torch.equal(count, torch.tensor([2, 1, 2]))
+
+    mask = sample_per_segment(segment_ids, 10)
+    assert bool(mask.all())
+
+
+def test_sample_edges_per_node():
+    # A star around node 0 with a tail 5 - 6.
+    edge_index = torch.tensor([[0, 0, 0, 0, 5],
+                               [1, 2, 3, 4, 6]])
+    mask = sample_edges_per_node(edge_index, 1, num_nodes=7)
+    # Every leaf keeps its only edge, so nothing is dropped.
+    assert bool(mask.all())
+
+    edge_index = torch.tensor([[0, 0, 0, 0],
+                               [1, 1, 1, 1]])
+    mask = sample_edges_per_node(edge_index, 2)
+    # Both endpoints keep 2 edges of their own, which may differ.
+    assert 2 <= int(mask.sum()) <= 4
+
+
 def test_to_csc():
     edge_index = torch.tensor([
         [0, 0, 0, 1, 1, 1, 2, 2, 2],
@@ -35,3 +68,49 @@ def test_to_csc():
     col_ptr, row, _ = _to_csc(edge_index)
     assert torch.equal(col_ptr, torch.tensor([0, 3, 6, 9]))
     assert torch.equal(row, torch.tensor([0, 1, 2, 0, 1, 2, 0, 1, 2]))
+
+
+def test_normalize_adj():
+    dense = torch.tensor([[0., 2., 1.],
+                          [2., 0., 0.],
+                          [1., 0., 1.]])
+    adj = dense.to_sparse_coo()
+
+    deg = dense.sum(dim=1)
+    expected = {
+        "sym": dense / (deg.sqrt().view(-1, 1) * deg.sqrt().view(1, -1)),
+        "row": dense / deg.view(-1, 1),
+        "col": dense / dense.sum(dim=0).view(1, -1),
+        None: dense,
+    }
+    for mode, out in expected.items():
+        assert torch.allclose(normalize_adj(adj, mode).to_dense(), out)
+        assert torch.allclose(normalize_adj(dense, mode), out)
+
+    # Layout and dtype are kept.
+    for layout_adj in [adj.to_sparse_csr(), adj.to_sparse_csc()]:
+        out = normalize_adj(layout_adj.to(torch.float64), "sym", cached=False)
+        assert out.layout == layout_adj.layout
+        assert out.dtype == torch.float64
+        assert torch.allclose(out.to_dense().float(), expected["sym"])
+
+    # Isolated nodes are scaled to zero.
+    out = normalize_adj(torch.zeros(2, 2).to_sparse_coo(), "sym")
+    assert torch.equal(out.to_dense(), torch.zeros(2, 2))
+
+    # Results are cached per adj version.
+    assert normalize_adj(adj, "sym") is normalize_adj(adj, "sym")
+    assert normalize_adj(adj, "sym") is not normalize_adj(adj, "row")
+
+
+def test_gcn_norm():
+    adj = torch.tensor([[0., 1.],
+                        [1., 1.]]).to_sparse_csr()
+    out = gcn_norm(adj)
+    assert out.layout == torch.sparse_csr
+    assert torch.allclose(out.to_dense(), torch.full((2, 2), 0.5))
+
+    out = gcn_norm(adj, add_self_loops=False)
+    assert torch.allclose(
+        out.to_dense(), torch.tensor([[0., 0.5 ** 0.5], [0.5 ** 0.5, 0.5]])
+    )
@@ -0,0 +1,54 @@
+import torch
+
+from rllm.utils import seg_logsumexp, seg_reduce, seg_softmax, seg_softmax_
+
+
+def test_seg_softmax():
+    data = torch.tensor([[1, 2, 3], [4, 5, 6], [7, 8, 9], [10, 11, 12]], dtype=torch.float)
+    segment_ids = torch.tensor([0, 0, 1, 1], dtype=torch.long)
+    num_segs = 2
+    score = seg_softmax(data, segment_ids, num_segs)
+    score_ = seg_softmax_(data, segment_ids, num_segs)
+    assert torch.equal(score, score_)
+
+
+def test_seg_reduce():
+    data = torch.randn(6, 3)
+    segment_ids = torch.tensor([0, 0, 1, 3, 3, 3])
+    ptr = torch.tensor([0, 2, 3, 3, 6])
+
+    for reduce, fn in [
+        ("sum", lambda x: x.sum(0)),
+        ("mean", lambda x: x.mean(0)),
+        ("max", lambda x: x.max(0)[0]),
+        ("min", lambda x: x.min(0)[0]),
+    ]:
+        expected = torch.stack([
+            fn(data[segment_ids == i]) if (segment_ids == i).any()
+            else torch.zeros(3)
+            for i in range(4)
+        ])
+        out = seg_reduce(data, segment_ids, 4, reduce=reduce)
+        assert torch.allclose(out, expected, atol=1e-6)
+        out = seg_reduce(data, reduce=reduce, ptr=ptr)
+        assert torch.allclose(out, expected, atol=1e-6)
+
+    out = seg_logsumexp(data, segment_ids, 4)
+    assert torch.allclose(out[0], data[:2].logsumexp(0))
+    assert torch.isinf(out[2]).all()
+
+
+def test_seg_softmax_ptr_and_grad():
+    data = torch.randn(6, 2, dtype=torch.double, requires_grad=True)
+    segment_ids = torch.tensor([0, 0, 1, 3, 3, 3])
+    ptr = torch.tensor([0, 2, 3, 3, 6])
+
+    score = seg_softmax(data, segment_ids, 4)
+    assert torch.allclose(score, seg_softmax(data, None, ptr=ptr))
+    assert torch.allclose(score, seg_softmax_(data, segment_ids, 4))
+    assert torch.autograd.gradcheck(
+        lambda x: seg_softmax(x, segment_ids, 4), (data,)
+    )
+
+    data = torch.randn(6, 2, dtype=torch.bfloat16)
+    assert seg_softmax(data, segment_ids, 4).dtype == torch.bfloat16